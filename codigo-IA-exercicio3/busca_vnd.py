@@ -0,0 +1,286 @@
+import time
+
+
+# Busca local reutilizável pelos três algoritmos meméticos: Variable
+# Neighbourhood Descent (VND) com lista tabu e critério de aspiração.
+#
+# O motor é genérico. Cada vizinhança implementa:
+#   movimentos(estado)       -> iterável de movimentos
+#   valor(estado, movimento) -> valor do vizinho (menor é melhor), sem alterar o estado
+#   aplicar(estado, movimento)
+#   destinos(estado, movimento) -> pares (tarefa, máquina) que o movimento cria
+#   origens(estado, movimento)  -> pares (tarefa, máquina) que o movimento desfaz;
+#                                  ficam tabu como destino depois de aplicado
+# e o estado implementa valor() e copiar().
+# Uma vizinhança pode, em vez de movimentos/valor, implementar
+#   valores(estado) -> (makespans, quadrados, movimento)
+# avaliando todos os vizinhos de uma vez (ver vetorizado.py), já em ordem
+# crescente de valor; movimento(i) monta o i-ésimo vizinho e o valor dele
+# é (makespans[i], quadrados[i]).
+
+
+class BuscaVND:
+    """
+    VND com tabu: explora as vizinhanças em ordem, voltando à primeira sempre
+    que encontra melhoria. Quando nenhuma melhora, aplica o melhor movimento
+    não tabu (mesmo que piore) e proíbe desfazê-lo por `tenure` iterações.
+    Movimentos tabu são aceitos se levarem a uma solução melhor que a melhor
+    já encontrada (aspiração).
+
+    Args:
+        vizinhancas (list): vizinhanças na ordem em que são exploradas.
+        tenure (int): iterações que um par (tarefa, máquina de origem) fica tabu.
+        max_sem_melhoria (int): passos tabu sem melhorar a melhor solução antes de parar;
+            0 transforma a busca em VND puro.
+        contador (ContadorAvaliacoes): se informado, soma as avaliações de vizinhos.
+        max_iteracoes (int): teto de explorações de vizinhança por execução.
+        primeira_melhoria (bool): interrompe a exploração no primeiro vizinho que
+            melhora a solução atual em vez de procurar o melhor da vizinhança.
+    """
+
+    def __init__(self, vizinhancas, tenure=7, max_sem_melhoria=5, contador=None, max_iteracoes=500,
+                 primeira_melhoria=False):
+        self.vizinhancas = vizinhancas
+        self.primeira_melhoria = primeira_melhoria
+        self.max_iteracoes = max_iteracoes
+        self.tenure = tenure
+        self.max_sem_melhoria = max_sem_melhoria
+        self.contador = contador
+        self.estatisticas = {
+            v.nome: {"tempo": 0.0, "avaliacoes": 0, "melhorias": 0} for v in vizinhancas
+        }
+
+    def _explorar(self, vizinhanca, estado, tabu, iteracao, melhor_valor, valor_atual):
+        """Melhor movimento permitido da vizinhança e o melhor não tabu."""
+        estatisticas = self.estatisticas[vizinhanca.nome]
+        inicio = time.perf_counter()
+        melhor = (None, None)
+        melhor_permitido = (None, None)
+        avaliacoes_antes = estatisticas["avaliacoes"]
+        ordenado = hasattr(vizinhanca, "valores")
+        for movimento, valor in self._vizinhos(vizinhanca, estado, estatisticas):
+            if valor is None:
+                continue
+            eh_tabu = any(tabu.get(par, -1) > iteracao for par in vizinhanca.destinos(estado, movimento))
+            if eh_tabu and not valor < melhor_valor:
+                continue
+            if melhor[1] is None or valor < melhor[1]:
+                melhor = (movimento, valor)
+            if not eh_tabu and (melhor_permitido[1] is None or valor < melhor_permitido[1]):
+                melhor_permitido = (movimento, valor)
+            if self.primeira_melhoria and valor < valor_atual:
+                break
+            # Em lote os vizinhos vêm ordenados: achados os dois, os demais são piores
+            if ordenado and melhor_permitido[0] is not None:
+                break
+        estatisticas["tempo"] += time.perf_counter() - inicio
+        if self.contador is not None:
+            self.contador.total += estatisticas["avaliacoes"] - avaliacoes_antes
+        return melhor, melhor_permitido
+
+    def _vizinhos(self, vizinhanca, estado, estatisticas):
+        if not hasattr(vizinhanca, "valores"):
+            for movimento in vizinhanca.movimentos(estado):
+                valor = vizinhanca.valor(estado, movimento)
+                if valor is not None:
+                    estatisticas["avaliacoes"] += 1
+                yield movimento, valor
+            return
+        # Lote já ordenado por valor: o primeiro vizinho aceito é o melhor
+        makespans, quadrados, movimento = vizinhanca.valores(estado)
+        estatisticas["avaliacoes"] += len(makespans)
+        for i in range(len(makespans)):
+            yield movimento(i), (float(makespans[i]), float(quadrados[i]))
+
+    def _aplicar(self, vizinhanca, estado, movimento, tabu, iteracao):
+        origens = list(vizinhanca.origens(estado, movimento))
+        vizinhanca.aplicar(estado, movimento)
+        for par in origens:
+            tabu[par] = iteracao + self.tenure
+
+    def executar(self, estado):
+        """Refina `estado` no lugar e retorna uma cópia da melhor solução encontrada."""
+        tabu = {}
+        valor_atual = estado.valor()
+        melhor_estado = estado.copiar()
+        melhor_valor = valor_atual
+        iteracao = 0
+        sem_melhoria = 0
+        k = 0
+        passo_tabu = (None, None, None)
+
+        while iteracao < self.max_iteracoes:
+            iteracao += 1
+            vizinhanca = self.vizinhancas[k]
+            (movimento, valor), (permitido, valor_permitido) = self._explorar(
+                vizinhanca, estado, tabu, iteracao, melhor_valor, valor_atual
+            )
+            if movimento is not None and valor < valor_atual:
+                self._aplicar(vizinhanca, estado, movimento, tabu, iteracao)
+                self.estatisticas[vizinhanca.nome]["melhorias"] += 1
+                valor_atual = valor
+                if valor_atual < melhor_valor:
+                    melhor_valor = valor_atual
+                    melhor_estado = estado.copiar()
+                    sem_melhoria = 0
+                k = 0
+                passo_tabu = (None, None, None)
+                continue
+
+            if permitido is not None and (passo_tabu[2] is None or valor_permitido < passo_tabu[2]):
+                passo_tabu = (vizinhanca, permitido, valor_permitido)
+
+            k += 1
+            if k < len(self.vizinhancas):
+                continue
+
+            # Ótimo local em todas as vizinhanças: passo tabu ou fim
+            if sem_melhoria >= self.max_sem_melhoria or passo_tabu[0] is None:
+                break
+            vizinhanca, movimento, valor = passo_tabu
+            self._aplicar(vizinhanca, estado, movimento, tabu, iteracao)
+            valor_atual = valor
+            sem_melhoria += 1
+            k = 0
+            passo_tabu = (None, None, None)
+
+        return melhor_estado
+
+    def relatorio(self):
+        linhas = []
+        for nome, e in self.estatisticas.items():
+            taxa = e["melhorias"] / e["tempo"] if e["tempo"] else 0.0
+            linhas.append(
+                f"{nome}: {e['tempo']:.3f}s, {e['avaliacoes']} avaliações, "
+                f"{e['melhorias']} melhorias ({taxa:.1f} melhorias/s)"
+            )
+        return "\n".join(linhas)
+
+
+# Estado e vizinhanças para atribuição tarefa -> máquina sem precedência
+# (tarefa3IA-facil.py e tarefa3IA-medio.py). Um movimento é uma lista de
+# mudanças (tarefa, nova máquina); o valor é (makespan, soma dos quadrados
+# das cargas), que desempata platôs de makespan favorecendo cargas equilibradas.
+
+
+class EstadoCargas:
+    def __init__(self, solucao, tempo, num_maquinas):
+        # tempo[t][m]: tempo de execução da tarefa t na máquina m
+        self.solucao = solucao[:]
+        self.tempo = tempo
+        self.cargas = [0.0] * num_maquinas
+        for t, m in enumerate(self.solucao):
+            self.cargas[m] += tempo[t][m]
+
+    def valor(self):
+        return max(self.cargas), sum(c * c for c in self.cargas)
+
+    def copiar(self):
+        novo = EstadoCargas.__new__(EstadoCargas)
+        novo.solucao = self.solucao[:]
+        novo.tempo = self.tempo
+        novo.cargas = self.cargas[:]
+        return novo
+
+    def criticas(self):
+        makespan = max(self.cargas)
+        return [m for m, carga in enumerate(self.cargas) if carga == makespan]
+
+    def tarefas_por_maquina(self):
+        por_maquina = [[] for _ in self.cargas]
+        for t, m in enumerate(self.solucao):
+            por_maquina[m].append(t)
+        return por_maquina
+
+    def valor_apos(self, mudancas):
+        """Valor após as mudanças calculado por deltas nas máquinas afetadas, O(k + m)."""
+        delta = {}
+        for t, m in mudancas:
+            origem = self.solucao[t]
+            delta[origem] = delta.get(origem, 0.0) - self.tempo[t][origem]
+            delta[m] = delta.get(m, 0.0) + self.tempo[t][m]
+        makespan = 0.0
+        quadrados = 0.0
+        for m, carga in enumerate(self.cargas):
+            carga += delta.get(m, 0.0)
+            if carga > makespan:
+                makespan = carga
+            quadrados += carga * carga
+        return makespan, quadrados
+
+    def aplicar(self, mudancas):
+        for t, m in mudancas:
+            origem = self.solucao[t]
+            self.cargas[origem] -= self.tempo[t][origem]
+            self.cargas[m] += self.tempo[t][m]
+            self.solucao[t] = m
+
+
+class _VizinhancaCargas:
+    nome = ""
+
+    def valor(self, estado, movimento):
+        return estado.valor_apos(movimento)
+
+    def aplicar(self, estado, movimento):
+        estado.aplicar(movimento)
+
+    def destinos(self, estado, movimento):
+        return movimento
+
+    def origens(self, estado, movimento):
+        return [(t, estado.solucao[t]) for t, _ in movimento]
+
+
+class VizinhancaMover(_VizinhancaCargas):
+    """Move uma tarefa de uma máquina crítica para outra máquina."""
+
+    nome = "mover"
+
+    def movimentos(self, estado):
+        num_maquinas = len(estado.cargas)
+        for a in estado.criticas():
+            for t, m in enumerate(estado.solucao):
+                if m != a:
+                    continue
+                for b in range(num_maquinas):
+                    if b != a:
+                        yield [(t, b)]
+
+
+class VizinhancaTrocar(_VizinhancaCargas):
+    """Troca uma tarefa de uma máquina crítica com uma tarefa de outra máquina."""
+
+    nome = "trocar"
+
+    def movimentos(self, estado):
+        por_maquina = estado.tarefas_por_maquina()
+        for a in estado.criticas():
+            for t in por_maquina[a]:
+                for b, tarefas_b in enumerate(por_maquina):
+                    if b == a:
+                        continue
+                    for u in tarefas_b:
+                        yield [(t, b), (u, a)]
+
+
+class VizinhancaTrocaDupla(_VizinhancaCargas):
+    """Troca um par de tarefas de uma máquina crítica por uma tarefa de outra máquina."""
+
+    nome = "troca_dupla"
+
+    def movimentos(self, estado):
+        por_maquina = estado.tarefas_por_maquina()
+        for a in estado.criticas():
+            tarefas_a = por_maquina[a]
+            for i in range(len(tarefas_a)):
+                for j in range(i + 1, len(tarefas_a)):
+                    for b, tarefas_b in enumerate(por_maquina):
+                        if b == a:
+                            continue
+                        for u in tarefas_b:
+                            yield [(tarefas_a[i], b), (tarefas_a[j], b), (u, a)]
+
+
+def vizinhancas_cargas():
+    return [VizinhancaMover(), VizinhancaTrocar(), VizinhancaTrocaDupla()]
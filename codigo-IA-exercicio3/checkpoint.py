@@ -0,0 +1,72 @@
+import hashlib
+import os
+import pickle
+import zlib
+
+
+# Checkpoints das execuções longas do algoritmo memético. O estado (população,
+# fitness, estado do gerador aleatório, histórico...) é serializado com pickle,
+# comprimido com zlib e gravado de forma atômica: um arquivo temporário é
+# escrito e depois renomeado, então uma interrupção no meio da escrita nunca
+# corrompe o último checkpoint válido. Cada checkpoint guarda também a
+# impressão digital da instância, conferida ao retomar.
+
+VERSAO = 1
+_ASSINATURA = b"MEMCKPT"
+
+
+def salvar_checkpoint(caminho, estado):
+    """
+    Grava `estado` (dict) em `caminho`.
+
+    Args:
+        caminho (str): arquivo de destino.
+        estado (dict): estado da execução; precisa ser serializável com pickle.
+    """
+    dados = zlib.compress(pickle.dumps(estado, protocol=pickle.HIGHEST_PROTOCOL), 6)
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(_ASSINATURA)
+        arquivo.write(bytes([VERSAO]))
+        arquivo.write(dados)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def impressao_instancia(*dados):
+    """Impressão digital (SHA-256) dos dados da instância e dos parâmetros da execução."""
+    return hashlib.sha256(repr(dados).encode("utf-8")).hexdigest()
+
+
+def carregar_checkpoint(caminho, instancia=None):
+    """
+    Lê um checkpoint gravado por `salvar_checkpoint`.
+
+    Args:
+        caminho (str): arquivo do checkpoint.
+        instancia (str): impressão digital esperada (`impressao_instancia`); se
+            informada e diferente da gravada em estado["instancia"], o checkpoint
+            é de outra instância e não é retomado.
+
+    Returns:
+        dict: o estado salvo, ou None se o arquivo não existir.
+    """
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    if not conteudo.startswith(_ASSINATURA):
+        raise ValueError(f"'{caminho}' não é um checkpoint do algoritmo memético")
+    versao = conteudo[len(_ASSINATURA)]
+    if versao != VERSAO:
+        raise ValueError(f"Versão de checkpoint {versao} não suportada (esperada {VERSAO})")
+    estado = pickle.loads(zlib.decompress(conteudo[len(_ASSINATURA) + 1:]))
+    if instancia is not None and estado.get("instancia") != instancia:
+        raise ValueError(f"'{caminho}' é de outra instância ou configuração; remova o arquivo para começar do zero")
+    return estado
+
+
+def remover_checkpoint(caminho):
+    if caminho and os.path.exists(caminho):
+        os.remove(caminho)
@@ -0,0 +1,136 @@
+import heapq
+import random
+
+
+# Operadores de crossover para permutações de tarefas. A pertinência é
+# testada com bitmaps (bytearray indexado pelo id da tarefa) em vez de
+# `t in lista`, então cada operador custa O(n). As tarefas são inteiros
+# não negativos; `tamanho` é maior id + 1.
+
+
+def _tamanho(sequencia):
+    return max(sequencia) + 1 if sequencia else 0
+
+
+def ox(pai1, pai2, rng=random):
+    """
+    Order Crossover (OX).
+
+    O filho copia um trecho contínuo de `pai1` nas mesmas posições e preenche
+    o restante com as tarefas de `pai2` na ordem em que aparecem a partir do
+    fim do trecho.
+    """
+    n = len(pai1)
+    if n < 2:
+        return pai1[:]
+    a, b = sorted(rng.sample(range(n + 1), 2))
+    usado = bytearray(_tamanho(pai1))
+    filho = [None] * n
+    for i in range(a, b):
+        filho[i] = pai1[i]
+        usado[pai1[i]] = 1
+
+    pos = b % n
+    for k in range(n):
+        t = pai2[(b + k) % n]
+        if not usado[t]:
+            filho[pos] = t
+            usado[t] = 1
+            pos = (pos + 1) % n
+    return filho
+
+
+def pmx(pai1, pai2, rng=random):
+    """
+    Partially Mapped Crossover (PMX).
+
+    O trecho de `pai1` é copiado e as demais posições vêm de `pai2`; conflitos
+    são resolvidos seguindo o mapeamento do trecho, usando um vetor de posições
+    de `pai1` para não fazer buscas lineares.
+    """
+    n = len(pai1)
+    if n < 2:
+        return pai1[:]
+    a, b = sorted(rng.sample(range(n + 1), 2))
+    tamanho = _tamanho(pai1)
+    posicao_pai1 = [0] * tamanho
+    for i, t in enumerate(pai1):
+        posicao_pai1[t] = i
+    no_trecho = bytearray(tamanho)
+    for i in range(a, b):
+        no_trecho[pai1[i]] = 1
+
+    filho = pai2[:]
+    filho[a:b] = pai1[a:b]
+    for i in list(range(a)) + list(range(b, n)):
+        t = pai2[i]
+        while no_trecho[t]:
+            t = pai2[posicao_pai1[t]]
+        filho[i] = t
+    return filho
+
+
+def ppx(pai1, pai2, rng=random):
+    """
+    Precedence Preserving Crossover (PPX).
+
+    Para cada posição sorteia um dos pais e pega a primeira tarefa dele ainda
+    não usada. Se os dois pais respeitam as precedências o filho também
+    respeita. Cada pai é percorrido uma única vez com um ponteiro.
+    """
+    n = len(pai1)
+    usado = bytearray(_tamanho(pai1))
+    pais = (pai1, pai2)
+    ponteiros = [0, 0]
+    filho = []
+    for _ in range(n):
+        escolhido = rng.random() < 0.5
+        pai = pais[escolhido]
+        i = ponteiros[escolhido]
+        while usado[pai[i]]:
+            i += 1
+        t = pai[i]
+        ponteiros[escolhido] = i + 1
+        usado[t] = 1
+        filho.append(t)
+    return filho
+
+
+def reparar_precedencia(sequencia, predecessoras):
+    """
+    Torna uma sequência viável em relação ao DAG de precedência.
+
+    Ordenação topológica de Kahn que, entre as tarefas prontas, escolhe sempre
+    a que aparece primeiro em `sequencia`. Sequências já viáveis saem
+    inalteradas. Custo O(n log n + arestas).
+
+    Args:
+        sequencia (list): permutação das tarefas.
+        predecessoras (dict): tarefa -> lista de tarefas que precisam terminar antes.
+    """
+    tamanho = _tamanho(sequencia)
+    posicao = [0] * tamanho
+    for i, t in enumerate(sequencia):
+        posicao[t] = i
+
+    pendentes = [0] * tamanho
+    sucessoras = [[] for _ in range(tamanho)]
+    for t in sequencia:
+        for p in predecessoras[t]:
+            pendentes[t] += 1
+            sucessoras[p].append(t)
+
+    prontas = [posicao[t] for t in sequencia if pendentes[t] == 0]
+    heapq.heapify(prontas)
+    reparada = []
+    while prontas:
+        t = sequencia[heapq.heappop(prontas)]
+        reparada.append(t)
+        for s in sucessoras[t]:
+            pendentes[s] -= 1
+            if pendentes[s] == 0:
+                heapq.heappush(prontas, posicao[s])
+    return reparada
+
+
+OPERADORES = {"ox": ox, "pmx": pmx, "ppx": ppx}
@@ -0,0 +1,138 @@
+import sys
+import time
+
+from limites import limite_maquinas_identicas, limite_maquinas_uniformes
+from sementes import lpt, menor_termino
+
+
+# Modo exato para instâncias pequenas: branch-and-bound em profundidade para
+# P||Cmax e Q||Cmax. Quando termina dentro do limite de nós, a solução
+# retornada é comprovadamente ótima.
+
+# Acima destes números de tarefas os scripts usam o algoritmo memético direto.
+# Em máquinas uniformes a simetria é menor e a árvore cresce mais rápido.
+MAX_TAREFAS_EXATO = 30
+MAX_TAREFAS_EXATO_UNIFORMES = 15
+
+
+def branch_and_bound(tempos, num_maquinas=None, velocidades=None, limite_nos=100_000, prazo=None):
+    """
+    Branch-and-bound para minimizar o makespan em máquinas idênticas ou uniformes.
+
+    - As tarefas são atribuídas em ordem LPT (maiores primeiro);
+    - a solução incumbente inicial vem de LPT / earliest-finish-time;
+    - cada nó é podado quando o trabalho restante não cabe na folga das máquinas
+      abaixo do makespan incumbente;
+    - máquinas com mesma velocidade e mesma carga são simétricas e só uma é expandida;
+    - uma tabela de transposição guarda os multiconjuntos (velocidade, carga) já
+      explorados em cada profundidade, que não podem melhorar a incumbente.
+
+    Args:
+        tempos (list): tempo de processamento de cada tarefa.
+        num_maquinas (int): número de máquinas idênticas (se `velocidades` for None).
+        velocidades (list): velocidade de cada máquina (Q||Cmax).
+        limite_nos (int): número máximo de nós antes de desistir da prova de otimalidade.
+        prazo (float): instante (time.perf_counter) em que a busca desiste, como
+            ao esgotar `limite_nos`; None para não limitar o tempo.
+
+    Returns:
+        tuple: (vetor tarefa -> máquina, makespan, otimo), onde `otimo` indica se
+        a busca terminou e a solução é comprovadamente ótima.
+    """
+    identicas = velocidades is None
+    if identicas:
+        velocidades = [1] * num_maquinas
+        incumbente = lpt(tempos, num_maquinas)
+        limite = limite_maquinas_identicas(tempos, num_maquinas)
+    else:
+        incumbente = menor_termino(tempos, velocidades)
+        limite = limite_maquinas_uniformes(tempos, velocidades)
+
+    m = len(velocidades)
+    n = len(tempos)
+    cargas = [0] * m
+    for tarefa, maquina in enumerate(incumbente):
+        cargas[maquina] += tempos[tarefa]
+    if identicas:
+        melhor = max(cargas)
+    else:
+        melhor = max(carga / velocidades[maquina] for maquina, carga in enumerate(cargas))
+    if melhor <= limite:
+        return incumbente, melhor, True
+
+    ordem = sorted(range(n), key=lambda t: -tempos[t])
+    p = [tempos[t] for t in ordem]
+    restante = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        restante[i] = restante[i + 1] + p[i]
+
+    trabalho = [0] * m
+    atribuicao = [0] * n
+    estado = {"melhor": melhor, "solucao": None, "nos": 0}
+    visitados = set()
+
+    def busca(i, maior):
+        """Retorna True quando a busca deve terminar (limite inferior atingido)."""
+        if i == n:
+            if maior < estado["melhor"]:
+                estado["melhor"] = maior
+                estado["solucao"] = atribuicao[:]
+            return estado["melhor"] <= limite
+
+        estado["nos"] += 1
+        if estado["nos"] > limite_nos:
+            raise _LimiteNos()
+        # O relógio é consultado a cada 1024 nós
+        if prazo is not None and not estado["nos"] & 1023 and time.perf_counter() >= prazo:
+            raise _LimiteNos()
+
+        # O trabalho restante precisa caber na folga das máquinas abaixo da incumbente
+        folga = sum(max(0, estado["melhor"] * velocidades[j] - trabalho[j]) for j in range(m))
+        if folga <= restante[i]:
+            return False
+
+        chave = (i, tuple(sorted(zip(velocidades, trabalho))))
+        if chave in visitados:
+            return False
+        visitados.add(chave)
+
+        # Explora primeiro as máquinas onde a tarefa termina mais cedo
+        candidatas = sorted(range(m), key=lambda j: (trabalho[j] + p[i]) / velocidades[j])
+        tentados = set()
+        for j in candidatas:
+            simetria = (velocidades[j], trabalho[j])
+            if simetria in tentados:
+                continue
+            tentados.add(simetria)
+
+            termino = trabalho[j] + p[i] if identicas else (trabalho[j] + p[i]) / velocidades[j]
+            if termino >= estado["melhor"]:
+                break
+            trabalho[j] += p[i]
+            atribuicao[i] = j
+            if busca(i + 1, max(maior, termino)):
+                return True
+            trabalho[j] -= p[i]
+        return False
+
+    limite_recursao = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limite_recursao, n + 100))
+    try:
+        busca(0, 0)
+        otimo = True
+    except _LimiteNos:
+        otimo = False
+    finally:
+        sys.setrecursionlimit(limite_recursao)
+
+    if estado["solucao"] is None:
+        return incumbente, melhor, otimo
+
+    solucao = [0] * n
+    for posicao, tarefa in enumerate(ordem):
+        solucao[tarefa] = estado["solucao"][posicao]
+    return solucao, estado["melhor"], otimo
+
+
+class _LimiteNos(Exception):
+    pass
@@ -0,0 +1,117 @@
+import math
+from collections import deque
+
+
+# Limites inferiores baratos para o makespan. Nenhuma solução viável tem
+# makespan menor que estes valores, então quando o algoritmo encontra uma
+# solução com makespan igual ao limite ela é ótima e a busca pode parar.
+
+
+def limite_maquinas_identicas(tempos, num_maquinas):
+    """
+    Limite inferior para P||Cmax (máquinas idênticas).
+
+    Combina três limites clássicos:
+      - carga média: soma(p) / m (arredondado para cima se os tempos forem inteiros);
+      - maior tarefa: max(p);
+      - pombal: p[m-1] + p[m] com as tarefas em ordem decrescente, pois
+        com n > m alguma máquina recebe duas das m+1 maiores tarefas.
+    """
+    if not tempos:
+        return 0
+    carga_media = sum(tempos) / num_maquinas
+    if all(float(p).is_integer() for p in tempos):
+        carga_media = math.ceil(carga_media)
+    limite = max(carga_media, max(tempos))
+    if len(tempos) > num_maquinas:
+        ordenados = sorted(tempos, reverse=True)
+        limite = max(limite, ordenados[num_maquinas - 1] + ordenados[num_maquinas])
+    return limite
+
+
+def limite_maquinas_uniformes(tempos, velocidades):
+    """
+    Limite inferior para Q||Cmax (máquinas com velocidades diferentes).
+
+    Para cada k, as k maiores tarefas precisam ocupar no máximo k máquinas,
+    então levam pelo menos soma(k maiores p) / soma(k maiores velocidades).
+    Com k = m obtemos a carga média ponderada e com k = 1 a maior tarefa na
+    máquina mais rápida. Custo O(n log n + m log m).
+    """
+    if not tempos:
+        return 0
+    tarefas = sorted(tempos, reverse=True)
+    maquinas = sorted(velocidades, reverse=True)
+    soma_tarefas = 0
+    soma_velocidades = 0
+    limite = 0
+    for k, velocidade in enumerate(maquinas[:-1]):
+        if k >= len(tarefas):
+            break
+        soma_tarefas += tarefas[k]
+        soma_velocidades += velocidade
+        limite = max(limite, soma_tarefas / soma_velocidades)
+    return max(limite, sum(tarefas) / sum(maquinas))
+
+
+def caminho_critico(tarefas):
+    """
+    Caminho crítico do DAG de precedência.
+
+    Args:
+        tarefas (dict): tarefa -> (tempo_processamento, lista de predecessoras).
+
+    Returns:
+        tuple: (comprimento do caminho crítico, lista de tarefas do caminho em ordem).
+    """
+    sucessoras = {t: [] for t in tarefas}
+    grau_entrada = {t: len(predecessoras) for t, (_, predecessoras) in tarefas.items()}
+    for t, (_, predecessoras) in tarefas.items():
+        for p in predecessoras:
+            sucessoras[p].append(t)
+
+    # Ordem topológica de Kahn com o maior tempo de conclusão até cada tarefa
+    conclusao = {}
+    anterior = {}
+    fila = deque(t for t, grau in grau_entrada.items() if grau == 0)
+    while fila:
+        t = fila.popleft()
+        tempo, predecessoras = tarefas[t]
+        inicio = 0
+        anterior[t] = None
+        for p in predecessoras:
+            if conclusao[p] > inicio:
+                inicio = conclusao[p]
+                anterior[t] = p
+        conclusao[t] = inicio + tempo
+        for s in sucessoras[t]:
+            grau_entrada[s] -= 1
+            if grau_entrada[s] == 0:
+                fila.append(s)
+
+    if len(conclusao) != len(tarefas):
+        raise ValueError("O grafo de precedência contém ciclos")
+    if not conclusao:
+        return 0, []
+
+    ultima = max(conclusao, key=conclusao.get)
+    caminho = []
+    while ultima is not None:
+        caminho.append(ultima)
+        ultima = anterior[ultima]
+    caminho.reverse()
+    return conclusao[caminho[-1]], caminho
+
+
+def limite_precedencia(tarefas, num_maquinas):
+    """Limite inferior para P|prec|Cmax: máximo entre o caminho crítico e o limite sem precedência."""
+    comprimento, _ = caminho_critico(tarefas)
+    tempos = [tempo for tempo, _ in tarefas.values()]
+    return max(comprimento, limite_maquinas_identicas(tempos, num_maquinas))
+
+
+def gap_otimalidade(makespan, limite):
+    """Gap relativo entre a solução incumbente e o limite inferior (0 = ótimo comprovado)."""
+    if makespan == 0:
+        return 0.0
+    return (makespan - limite) / makespan
@@ -0,0 +1,190 @@
+import argparse
+import json
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from busca_vnd import BuscaVND, EstadoCargas, vizinhancas_cargas
+from exato import MAX_TAREFAS_EXATO, MAX_TAREFAS_EXATO_UNIFORMES, branch_and_bound
+from limites import limite_maquinas_identicas, limite_maquinas_uniformes, limite_precedencia
+from representacao import DadosPrecedencia, SolucaoCompacta, sequencia_global
+from sementes import escalonamento_lista, lpt, menor_termino, perturbar
+from vizinhanca_critica import vizinhancas_criticas
+
+
+# Modo lote: resolve muitas instâncias pequenas lidas de um arquivo JSON lines,
+# em paralelo num pool de processos, com orçamento de tempo por instância e
+# saída também em JSON lines. Não há gráficos; os módulos são importados uma
+# vez por processo do pool.
+#
+# Formato de cada linha de entrada (um dos três):
+#   {"id": "a", "tempos": [12, 5, ...], "num_maquinas": 5}               P||Cmax
+#   {"id": "b", "tempos": [25, 17, ...], "velocidades": [18, 22, ...]}    Q||Cmax
+#   {"id": "c", "tarefas": {"1": [25, [2, 3]], ...}, "num_maquinas": 5}  P|prec|Cmax
+#
+# Uso:
+#   python lote.py instancias.jsonl -o resultados.jsonl -j 4 --tempo 1.0
+
+TOLERANCIA = 1e-9
+
+
+def resolver_maquinas(tempos, num_maquinas, velocidades, limite_tempo, rng):
+    """
+    P||Cmax e Q||Cmax: branch-and-bound se a instância for pequena; senão (ou se
+    o B&B não provar otimalidade dentro do orçamento de tempo) VND iterado a partir
+    de LPT/EFT (ou da melhor solução do B&B) com perturbações, até atingir o limite
+    inferior ou esgotar o orçamento de tempo.
+    """
+    inicio = time.perf_counter()
+    if velocidades is None:
+        limite = limite_maquinas_identicas(tempos, num_maquinas)
+        maximo_exato = MAX_TAREFAS_EXATO
+        velocidades_efetivas = [1] * num_maquinas
+        semente = lpt(tempos, num_maquinas)
+    else:
+        num_maquinas = len(velocidades)
+        limite = limite_maquinas_uniformes(tempos, velocidades)
+        maximo_exato = MAX_TAREFAS_EXATO_UNIFORMES
+        velocidades_efetivas = velocidades
+        semente = menor_termino(tempos, velocidades)
+
+    if len(tempos) <= maximo_exato:
+        solucao, makespan, otimo = branch_and_bound(tempos, num_maquinas, velocidades,
+                                                    prazo=inicio + limite_tempo)
+        if otimo:
+            return solucao, makespan, limite, True, "exato"
+        semente = solucao
+
+    matriz = [[tempo / v for v in velocidades_efetivas] for tempo in tempos]
+    motor = BuscaVND(vizinhancas_cargas()[:2], max_sem_melhoria=2, primeira_melhoria=True)
+    melhor = motor.executar(EstadoCargas(semente, matriz, num_maquinas))
+    while melhor.valor()[0] > limite + TOLERANCIA and time.perf_counter() - inicio < limite_tempo:
+        candidato = perturbar(melhor.solucao, num_maquinas, rng.uniform(0.05, 0.3), rng)
+        refinado = motor.executar(EstadoCargas(candidato, matriz, num_maquinas))
+        if refinado.valor() < melhor.valor():
+            melhor = refinado
+    makespan = melhor.valor()[0]
+    return melhor.solucao, makespan, limite, makespan <= limite + TOLERANCIA, "vnd"
+
+
+def resolver_precedencia(tarefas, num_maquinas, limite_tempo, rng):
+    """P|prec|Cmax: HEFT + VND no caminho crítico, reiniciado com ranks perturbados."""
+    inicio = time.perf_counter()
+    limite = limite_precedencia(tarefas, num_maquinas)
+    predecessoras = {t: prioridades for t, (_, prioridades) in tarefas.items()}
+    dados = DadosPrecedencia(tarefas, num_maquinas)
+    motor = BuscaVND(vizinhancas_criticas(), max_sem_melhoria=2, primeira_melhoria=True)
+
+    def refinar(solucao):
+        compacta = SolucaoCompacta.de_listas(dados, solucao, sequencia_global(solucao, predecessoras))
+        return motor.executar(compacta)
+
+    melhor = refinar(escalonamento_lista(tarefas, num_maquinas))
+    melhor_valor = melhor.avaliar()
+    while melhor_valor > limite + TOLERANCIA and time.perf_counter() - inicio < limite_tempo:
+        candidato = refinar(escalonamento_lista(tarefas, num_maquinas, ruido=0.3, rng=rng))
+        valor = candidato.avaliar()
+        if valor < melhor_valor:
+            melhor, melhor_valor = candidato, valor
+    return melhor.para_listas(), melhor_valor, limite, melhor_valor <= limite + TOLERANCIA, "heft+vnd"
+
+
+def resolver_instancia(argumentos):
+    """Resolve uma instância (dict já decodificado) e retorna o registro de saída."""
+    instancia, erro, limite_tempo, semente = argumentos
+    identificador = instancia.get("id")
+    if erro is not None:
+        return {"id": identificador, "erro": erro}
+    inicio = time.perf_counter()
+    rng = random.Random(f"{semente}:{identificador}")
+    try:
+        if "tarefas" in instancia:
+            tarefas = {int(t): (tempo, [int(p) for p in predecessoras])
+                       for t, (tempo, predecessoras) in instancia["tarefas"].items()}
+            resultado = resolver_precedencia(tarefas, instancia["num_maquinas"], limite_tempo, rng)
+        else:
+            resultado = resolver_maquinas(
+                instancia["tempos"], instancia.get("num_maquinas"), instancia.get("velocidades"),
+                limite_tempo, rng,
+            )
+    except Exception as e:
+        # Qualquer falha vira registro de erro: não derruba o processo do pool
+        # nem os resultados já prontos do mesmo bloco
+        return {"id": identificador, "erro": f"{type(e).__name__}: {e}"}
+
+    solucao, makespan, limite, otimo, modo = resultado
+    return {
+        "id": identificador,
+        "makespan": makespan,
+        "limite_inferior": limite,
+        "otimo": otimo,
+        "modo": modo,
+        "tempo": round(time.perf_counter() - inicio, 6),
+        "solucao": solucao,
+    }
+
+
+def ler_instancias(arquivo):
+    """
+    Gera pares (instância, erro) do arquivo JSON lines, ignorando linhas vazias.
+
+    Uma linha que não é um objeto JSON gera ({"id": número da linha}, mensagem),
+    que vira registro de erro na saída em vez de abortar o lote.
+    """
+    for numero, linha in enumerate(arquivo, 1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            instancia = json.loads(linha)
+        except ValueError as e:
+            yield {"id": numero}, f"linha {numero}: {type(e).__name__}: {e}"
+            continue
+        if not isinstance(instancia, dict):
+            yield {"id": numero}, f"linha {numero}: esperado um objeto JSON"
+            continue
+        instancia.setdefault("id", numero)
+        yield instancia, None
+
+
+def executar_lote(entrada, saida, processos=None, limite_tempo=1.0, semente=42, tamanho_bloco=8):
+    """
+    Resolve todas as instâncias de `entrada` e escreve um resultado por linha em `saida`.
+
+    A ordem de saída é a de término, não a de entrada; use o campo "id".
+    """
+    argumentos = ((instancia, erro, limite_tempo, semente) for instancia, erro in ler_instancias(entrada))
+    total = 0
+    with Pool(processes=processos) as pool:
+        for resultado in pool.imap_unordered(resolver_instancia, argumentos, chunksize=tamanho_bloco):
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            total += 1
+    saida.flush()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve instâncias de escalonamento em lote.")
+    parser.add_argument("entrada", help="arquivo JSON lines com as instâncias ('-' para stdin)")
+    parser.add_argument("-o", "--saida", default="-", help="arquivo JSON lines de resultados ('-' para stdout)")
+    parser.add_argument("-j", "--processos", type=int, default=None, help="processos no pool (padrão: núcleos)")
+    parser.add_argument("--tempo", type=float, default=1.0, help="orçamento de tempo por instância, em segundos")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    inicio = time.perf_counter()
+    try:
+        total = executar_lote(entrada, saida, args.processos, args.tempo, args.semente)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if saida is not sys.stdout:
+            saida.close()
+    print(f"{total} instâncias resolvidas em {time.perf_counter() - inicio:.2f} segundos", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
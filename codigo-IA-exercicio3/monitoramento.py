@@ -0,0 +1,200 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+# Instrumentação por geração e critérios de parada plugáveis para os
+# algoritmos meméticos (tarefa3IA-facil/medio/dificil).
+
+
+class ContadorAvaliacoes:
+    """
+    Decorador que conta quantas vezes a função de avaliação foi chamada.
+
+    Uso:
+        contador = ContadorAvaliacoes()
+
+        @contador
+        def avaliar(solucao): ...
+    """
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, funcao):
+        def avaliar_contando(*args, **kwargs):
+            self.total += 1
+            return funcao(*args, **kwargs)
+
+        avaliar_contando.__name__ = funcao.__name__
+        avaliar_contando.__doc__ = funcao.__doc__
+        return avaliar_contando
+
+
+def diversidade_genotipica(vetores):
+    """
+    Diversidade média por posição de uma população de vetores tarefa -> máquina.
+
+    Para cada posição conta a fração de indivíduos que difere do valor mais
+    comum. 0 significa população convergida, valores maiores indicam mais
+    diversidade. Custo O(P * n).
+    """
+    if not vetores:
+        return 0.0
+    tamanho = len(vetores)
+    num_genes = len(vetores[0])
+    if num_genes == 0:
+        return 0.0
+    soma = 0.0
+    for posicao in zip(*vetores):
+        mais_comum = Counter(posicao).most_common(1)[0][1]
+        soma += 1 - mais_comum / tamanho
+    return soma / num_genes
+
+
+class EstatisticasGeracao:
+    """Registro de uma geração: avaliações, busca local, diversidade e tempos."""
+
+    def __init__(self, geracao, melhor, avaliacoes, buscas_locais, melhorias_busca_local,
+                 diversidade, tempos_fases, tempo_decorrido):
+        self.geracao = geracao
+        self.melhor = melhor
+        self.avaliacoes = avaliacoes
+        self.buscas_locais = buscas_locais
+        self.melhorias_busca_local = melhorias_busca_local
+        self.diversidade = diversidade
+        self.tempos_fases = tempos_fases
+        self.tempo_decorrido = tempo_decorrido
+
+    @property
+    def taxa_melhoria_busca_local(self):
+        if self.buscas_locais == 0:
+            return 0.0
+        return self.melhorias_busca_local / self.buscas_locais
+
+    def __repr__(self):
+        fases = ", ".join(f"{nome}={t:.3f}s" for nome, t in self.tempos_fases.items())
+        return (f"Geração {self.geracao}: melhor={self.melhor}, avaliações={self.avaliacoes}, "
+                f"melhoria BL={self.taxa_melhoria_busca_local:.0%}, "
+                f"diversidade={self.diversidade:.3f}, {fases}")
+
+
+# Critérios de parada: objetos chamáveis que recebem o monitor e retornam
+# True quando a execução deve terminar.
+
+class ParadaEstagnacao:
+    """Para quando o melhor makespan não melhora por `janela` gerações."""
+
+    def __init__(self, janela=20):
+        self.janela = janela
+
+    def __call__(self, monitor):
+        historico = monitor.historico
+        if len(historico) <= self.janela:
+            return False
+        return historico[-1].melhor >= historico[-1 - self.janela].melhor
+
+    def __repr__(self):
+        return f"estagnação por {self.janela} gerações"
+
+
+class ParadaLimiteInferior:
+    """Para quando o melhor makespan atinge um limite inferior conhecido."""
+
+    def __init__(self, limite, tolerancia=1e-9):
+        self.limite = limite
+        self.tolerancia = tolerancia
+
+    def __call__(self, monitor):
+        if not monitor.historico:
+            return False
+        return monitor.historico[-1].melhor <= self.limite + self.tolerancia
+
+    def __repr__(self):
+        return f"limite inferior {self.limite} atingido"
+
+
+class ParadaTempo:
+    """Para quando o tempo de parede ultrapassa `segundos`."""
+
+    def __init__(self, segundos):
+        self.segundos = segundos
+
+    def __call__(self, monitor):
+        return monitor.tempo_decorrido() >= self.segundos
+
+    def __repr__(self):
+        return f"orçamento de {self.segundos}s esgotado"
+
+
+class Monitor:
+    """
+    Coleta estatísticas por geração de um algoritmo memético e decide a parada.
+
+    Args:
+        criterios (list): Critérios de parada (ParadaEstagnacao, ParadaLimiteInferior,
+            ParadaTempo ou qualquer chamável monitor -> bool).
+        callbacks (list): Funções chamadas com cada EstatisticasGeracao ao fim da geração.
+        contador (ContadorAvaliacoes): Contador da função de avaliação, se houver.
+    """
+
+    def __init__(self, criterios=None, callbacks=None, contador=None):
+        self.criterios = list(criterios or [])
+        self.callbacks = list(callbacks or [])
+        self.contador = contador
+        self.historico = []
+        self.motivo_parada = None
+        self._inicio = time.perf_counter()
+        self._reiniciar_geracao()
+
+    def _reiniciar_geracao(self):
+        self._tempos_fases = {}
+        self._buscas_locais = 0
+        self._melhorias = 0
+        self._avaliacoes_inicio = self.contador.total if self.contador else 0
+
+    def iniciar(self):
+        self.historico = []
+        self.motivo_parada = None
+        self._inicio = time.perf_counter()
+        self._reiniciar_geracao()
+
+    def retomar(self, historico, tempo_decorrido):
+        """Continua uma execução retomada de checkpoint: histórico e tempo já decorrido."""
+        self.iniciar()
+        self.historico = list(historico)
+        self._inicio -= tempo_decorrido
+
+    def tempo_decorrido(self):
+        return time.perf_counter() - self._inicio
+
+    @contextmanager
+    def fase(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._tempos_fases[nome] = self._tempos_fases.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def registrar_busca_local(self, melhorou):
+        self._buscas_locais += 1
+        if melhorou:
+            self._melhorias += 1
+
+    def fim_geracao(self, geracao, melhor, diversidade=0.0):
+        """Fecha a geração corrente e retorna True se algum critério pedir parada."""
+        avaliacoes = (self.contador.total - self._avaliacoes_inicio) if self.contador else 0
+        estatisticas = EstatisticasGeracao(
+            geracao, melhor, avaliacoes, self._buscas_locais, self._melhorias,
+            diversidade, self._tempos_fases, self.tempo_decorrido(),
+        )
+        self.historico.append(estatisticas)
+        for callback in self.callbacks:
+            callback(estatisticas)
+        self._reiniciar_geracao()
+
+        for criterio in self.criterios:
+            if criterio(self):
+                self.motivo_parada = criterio
+                return True
+        return False
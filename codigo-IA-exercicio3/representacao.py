@@ -0,0 +1,196 @@
+import heapq
+from array import array
+
+from cruzamento import reparar_precedencia
+
+
+# Representação compacta para o escalonamento com precedência
+# (tarefa3IA-dificil.py). Em vez de uma lista de listas por máquina a
+# solução guarda:
+#   - maquina[t]: máquina da tarefa t (array de inteiros);
+#   - chave[t]:   prioridade da tarefa t, a posição dela numa sequência
+#                 global viável; a ordem em cada máquina é a ordem das chaves;
+#   - ordem[k]:   tarefa com chave k (inversa de `chave`).
+# Vizinhos são aplicados e avaliados no próprio objeto e desfeitos em
+# seguida, sem copiar listas no laço da busca local. Tarefas são 0..n-1.
+
+
+def sequencia_global(solucao, predecessoras):
+    """
+    Sequência global viável que preserva a ordem de cada máquina.
+
+    Ordenação topológica sobre o DAG de precedência mais as arestas entre
+    tarefas consecutivas da mesma máquina, priorizando a posição na máquina.
+    Se a lista de listas tiver um ciclo entre máquinas (solução inviável),
+    cai para o reparo de precedência sobre as máquinas intercaladas.
+    """
+    prioridade = {}
+    proxima = {}
+    pendentes = {}
+    for m, tarefas_maq in enumerate(solucao):
+        for indice, t in enumerate(tarefas_maq):
+            prioridade[t] = (indice, m)
+            pendentes[t] = len(predecessoras[t]) + (indice > 0)
+            proxima[t] = tarefas_maq[indice + 1] if indice + 1 < len(tarefas_maq) else None
+    sucessoras = {t: [] for t in pendentes}
+    for t in pendentes:
+        for p in predecessoras[t]:
+            sucessoras[p].append(t)
+
+    prontas = [(prioridade[t], t) for t, grau in pendentes.items() if grau == 0]
+    heapq.heapify(prontas)
+    sequencia = []
+    while prontas:
+        _, t = heapq.heappop(prontas)
+        sequencia.append(t)
+        liberadas = sucessoras[t] + ([proxima[t]] if proxima[t] is not None else [])
+        for s in liberadas:
+            pendentes[s] -= 1
+            if pendentes[s] == 0:
+                heapq.heappush(prontas, (prioridade[s], s))
+
+    if len(sequencia) < len(pendentes):
+        intercalada = sorted(pendentes, key=prioridade.get)
+        return reparar_precedencia(intercalada, predecessoras)
+    return sequencia
+
+
+class DadosPrecedencia:
+    """Dados estáticos da instância, compartilhados por todas as soluções."""
+
+    def __init__(self, tarefas, num_maquinas):
+        # tarefas: dict id (1..n) -> (tempo, predecessoras), como em tarefa3IA-dificil.py
+        self.ids = sorted(tarefas)
+        indice = {t: i for i, t in enumerate(self.ids)}
+        self.num_tarefas = len(self.ids)
+        self.num_maquinas = num_maquinas
+        self.tempos = array("d", (tarefas[t][0] for t in self.ids))
+        self.predecessoras = [[indice[p] for p in tarefas[t][1]] for t in self.ids]
+        self.sucessoras = [[] for _ in self.ids]
+        for t, preds in enumerate(self.predecessoras):
+            for p in preds:
+                self.sucessoras[p].append(t)
+        self.indice = indice
+        # Buffers reaproveitados por todas as avaliações
+        self._conclusao = array("d", bytes(8 * self.num_tarefas))
+        self._livre = array("d", bytes(8 * num_maquinas))
+
+
+class SolucaoCompacta:
+    def __init__(self, dados, maquina, ordem):
+        self.dados = dados
+        self.maquina = array("i", maquina)
+        self.ordem = array("i", ordem)
+        self.chave = array("i", bytes(4 * dados.num_tarefas))
+        for k, t in enumerate(self.ordem):
+            self.chave[t] = k
+
+    @classmethod
+    def de_listas(cls, dados, solucao, sequencia):
+        """Converte lista de listas (ids 1..n) e uma sequência global viável."""
+        maquina = [0] * dados.num_tarefas
+        for m, tarefas_maq in enumerate(solucao):
+            for t in tarefas_maq:
+                maquina[dados.indice[t]] = m
+        return cls(dados, maquina, [dados.indice[t] for t in sequencia])
+
+    def para_listas(self):
+        solucao = [[] for _ in range(self.dados.num_maquinas)]
+        for t in self.ordem:
+            solucao[self.maquina[t]].append(self.dados.ids[t])
+        return solucao
+
+    def copiar(self):
+        nova = SolucaoCompacta.__new__(SolucaoCompacta)
+        nova.dados = self.dados
+        nova.maquina = self.maquina[:]
+        nova.ordem = self.ordem[:]
+        nova.chave = self.chave[:]
+        return nova
+
+    def avaliar(self):
+        """
+        Makespan em uma passada pela sequência global, O(n + arestas).
+
+        Cada tarefa começa quando sua máquina fica livre e todas as
+        predecessoras terminaram.
+        """
+        dados = self.dados
+        conclusao = dados._conclusao
+        livre = dados._livre
+        for m in range(dados.num_maquinas):
+            livre[m] = 0.0
+        tempos = dados.tempos
+        predecessoras = dados.predecessoras
+        maquina = self.maquina
+        makespan = 0.0
+        for t in self.ordem:
+            m = maquina[t]
+            inicio = livre[m]
+            for p in predecessoras[t]:
+                if conclusao[p] > inicio:
+                    inicio = conclusao[p]
+            fim = inicio + tempos[t]
+            conclusao[t] = fim
+            livre[m] = fim
+            if fim > makespan:
+                makespan = fim
+        return makespan
+
+    def valor(self):
+        return self.avaliar()
+
+    def tempos_conclusao(self):
+        """Avalia e retorna uma cópia dos tempos de conclusão por tarefa."""
+        self.avaliar()
+        return self.dados._conclusao[:]
+
+    # Movimentos: cada um altera a solução no lugar e retorna o necessário
+    # para desfazê-lo.
+
+    def mover(self, t, m):
+        """Muda a tarefa t para a máquina m (a ordem global não muda)."""
+        anterior = self.maquina[t]
+        self.maquina[t] = m
+        return t, anterior
+
+    def desfazer_mover(self, desfazer):
+        t, anterior = desfazer
+        self.maquina[t] = anterior
+
+    def pode_trocar_ordem(self, a, b):
+        """Verifica se trocar as chaves de a e b mantém a sequência viável."""
+        if self.chave[a] > self.chave[b]:
+            a, b = b, a
+        ka, kb = self.chave[a], self.chave[b]
+        # a vai para kb: nenhuma sucessora de a pode estar em (ka, kb]
+        for s in self.dados.sucessoras[a]:
+            if self.chave[s] <= kb:
+                return False
+        # b vai para ka: nenhuma predecessora de b pode estar em [ka, kb)
+        for p in self.dados.predecessoras[b]:
+            if self.chave[p] >= ka:
+                return False
+        return True
+
+    def trocar_ordem(self, a, b):
+        """Troca as posições de a e b na sequência global (é a própria inversa)."""
+        ka, kb = self.chave[a], self.chave[b]
+        self.chave[a], self.chave[b] = kb, ka
+        self.ordem[ka], self.ordem[kb] = b, a
+
+    def trocar(self, a, b):
+        """
+        Troca duas tarefas de lugar: máquina e posição, como a troca entre
+        máquinas da busca local original. Retorna None se violar precedência.
+        """
+        if not self.pode_trocar_ordem(a, b):
+            return None
+        self.trocar_ordem(a, b)
+        self.maquina[a], self.maquina[b] = self.maquina[b], self.maquina[a]
+        return a, b
+
+    def desfazer_troca(self, desfazer):
+        a, b = desfazer
+        self.maquina[a], self.maquina[b] = self.maquina[b], self.maquina[a]
+        self.trocar_ordem(a, b)
@@ -0,0 +1,141 @@
+import heapq
+import random
+
+
+# Heurísticas construtivas usadas para semear a população inicial dos
+# algoritmos meméticos. Parte da população é a solução heurística e o
+# restante são perturbações aleatórias dela.
+
+
+def lpt(tempos, num_maquinas):
+    """
+    Longest Processing Time para máquinas idênticas.
+
+    Ordena as tarefas em ordem decrescente e coloca cada uma na máquina
+    menos carregada (heap de cargas). Custo O(n log n + n log m).
+
+    Returns:
+        list: vetor tarefa -> máquina.
+    """
+    solucao = [0] * len(tempos)
+    cargas = [(0, maquina) for maquina in range(num_maquinas)]
+    for tarefa in sorted(range(len(tempos)), key=lambda t: -tempos[t]):
+        carga, maquina = heapq.heappop(cargas)
+        solucao[tarefa] = maquina
+        heapq.heappush(cargas, (carga + tempos[tarefa], maquina))
+    return solucao
+
+
+def menor_termino(tempos, velocidades):
+    """
+    Earliest Finish Time para máquinas uniformes (tempo real = p / velocidade).
+
+    As tarefas são consideradas em ordem decrescente e cada uma vai para a
+    máquina onde termina mais cedo. Custo O(n log n + n m).
+
+    Returns:
+        list: vetor tarefa -> máquina.
+    """
+    solucao = [0] * len(tempos)
+    cargas = [0.0] * len(velocidades)
+    maquinas = range(len(velocidades))
+    for tarefa in sorted(range(len(tempos)), key=lambda t: -tempos[t]):
+        tempo = tempos[tarefa]
+        maquina = min(maquinas, key=lambda m: cargas[m] + tempo / velocidades[m])
+        solucao[tarefa] = maquina
+        cargas[maquina] += tempo / velocidades[maquina]
+    return solucao
+
+
+def perturbar(solucao, num_maquinas, taxa, rng=random):
+    """Cópia de um vetor tarefa -> máquina com uma fração `taxa` das tarefas realocadas ao acaso."""
+    nova = solucao[:]
+    for tarefa in range(len(nova)):
+        if rng.random() < taxa:
+            nova[tarefa] = rng.randrange(num_maquinas)
+    return nova
+
+
+def populacao_semeada(semente, tamanho, num_maquinas, taxa_min=0.05, taxa_max=0.4, rng=random):
+    """
+    População com a solução heurística e `tamanho - 1` perturbações dela.
+
+    A taxa de perturbação de cada indivíduo é sorteada entre `taxa_min` e
+    `taxa_max`, mantendo indivíduos próximos e distantes da semente.
+    """
+    populacao = [semente[:]]
+    while len(populacao) < tamanho:
+        taxa = rng.uniform(taxa_min, taxa_max)
+        populacao.append(perturbar(semente, num_maquinas, taxa, rng))
+    return populacao
+
+
+def niveis_inferiores(tarefas):
+    """
+    Rank ascendente do HEFT: maior soma de tempos de uma tarefa até o fim do DAG.
+
+    Args:
+        tarefas (dict): tarefa -> (tempo_processamento, lista de predecessoras).
+
+    Returns:
+        tuple: (dict tarefa -> rank, dict tarefa -> lista de sucessoras).
+    """
+    sucessoras = {t: [] for t in tarefas}
+    for t, (_, predecessoras) in tarefas.items():
+        for p in predecessoras:
+            sucessoras[p].append(t)
+
+    rank = {}
+    # DFS iterativa em pós-ordem, evitando limite de recursão em DAGs grandes
+    for raiz in tarefas:
+        if raiz in rank:
+            continue
+        pilha = [(raiz, False)]
+        while pilha:
+            t, expandida = pilha.pop()
+            if t in rank:
+                continue
+            if expandida:
+                rank[t] = tarefas[t][0] + max((rank[s] for s in sucessoras[t]), default=0)
+            else:
+                pilha.append((t, True))
+                pilha.extend((s, False) for s in sucessoras[t] if s not in rank)
+    return rank, sucessoras
+
+
+def escalonamento_lista(tarefas, num_maquinas, ruido=0.0, rng=random):
+    """
+    Escalonamento em lista estilo HEFT respeitando o DAG de precedência.
+
+    A cada passo escolhe, entre as tarefas prontas, a de maior rank ascendente
+    e a coloca na máquina em que começa mais cedo. Com `ruido > 0` os ranks
+    são multiplicados por um fator em [1 - ruido, 1 + ruido], gerando
+    variações viáveis da mesma heurística. Custo O(n log n + n m).
+
+    Returns:
+        list: lista de listas, cada sublista é uma máquina com tarefas em ordem de início.
+    """
+    rank, sucessoras = niveis_inferiores(tarefas)
+    if ruido:
+        rank = {t: r * rng.uniform(1 - ruido, 1 + ruido) for t, r in rank.items()}
+
+    pendentes = {t: len(predecessoras) for t, (_, predecessoras) in tarefas.items()}
+    prontas = [(-rank[t], t) for t, grau in pendentes.items() if grau == 0]
+    heapq.heapify(prontas)
+
+    solucao = [[] for _ in range(num_maquinas)]
+    livre = [0] * num_maquinas
+    conclusao = {}
+    while prontas:
+        _, t = heapq.heappop(prontas)
+        tempo, predecessoras = tarefas[t]
+        pronta_em = max((conclusao[p] for p in predecessoras), default=0)
+        maquina = min(range(num_maquinas), key=lambda m: max(livre[m], pronta_em))
+        conclusao[t] = max(livre[maquina], pronta_em) + tempo
+        livre[maquina] = conclusao[t]
+        solucao[maquina].append(t)
+        for s in sucessoras[t]:
+            pendentes[s] -= 1
+            if pendentes[s] == 0:
+                heapq.heappush(prontas, (-rank[s], s))
+    return solucao
@@ -4,6 +4,15 @@ import time
 import matplotlib.pyplot as plt
 from collections import defaultdict
 
+from checkpoint import carregar_checkpoint, impressao_instancia, remover_checkpoint, salvar_checkpoint
+from cruzamento import OPERADORES, reparar_precedencia
+from representacao import DadosPrecedencia, SolucaoCompacta, sequencia_global
+from busca_vnd import BuscaVND
+from vizinhanca_critica import vizinhancas_criticas
+from limites import caminho_critico, gap_otimalidade, limite_precedencia
+from sementes import escalonamento_lista
+from monitoramento import ContadorAvaliacoes, Monitor, ParadaEstagnacao, ParadaLimiteInferior, diversidade_genotipica
+
 # Dados do problema
 num_tarefas = 40
 num_maquinas = 5
@@ -78,34 +87,22 @@ def ordenacao_topologica():
     return ordem
 
 ordem_topologica = ordenacao_topologica()
+predecessoras = {t: prioridades for t, (_, prioridades) in tarefas.items()}
+
+# Dados estáticos da representação compacta usada na busca local
+dados_compactos = DadosPrecedencia(tarefas, num_maquinas)
+
+# Operador de crossover da ordem: "ppx" (preserva precedência), "ox" ou "pmx"
+operador_crossover = "ppx"
+
+# Limite inferior: caminho crítico do DAG ou carga média, o que for maior
+limite_inferior = limite_precedencia(tarefas, num_maquinas)
 
 # Representação da solução: lista de listas, cada sublista é uma máquina com tarefas ordenadas
-def gerar_solucao_inicial():
-    solucao = [[] for _ in range(num_maquinas)]
-    tarefas_disponiveis = ordem_topologica.copy()
-    
-    while tarefas_disponiveis:
-        maq = random.randint(0, num_maquinas - 1)
-        # Escolher uma tarefa que pode ser alocada (suas precedências já foram alocadas)
-        for t in tarefas_disponiveis:
-            pode_alocar = True
-            for p in tarefas[t][1]:
-                if any(p in m for m in solucao):
-                    continue
-                else:
-                    pode_alocar = False
-                    break
-            if pode_alocar:
-                solucao[maq].append(t)
-                tarefas_disponiveis.remove(t)
-                break
-        else:
-            # Se não encontrou tarefa para alocar, força alocação (pode violar restrições)
-            t = random.choice(tarefas_disponiveis)
-            solucao[maq].append(t)
-            tarefas_disponiveis.remove(t)
-    
-    return solucao
+# A solução inicial vem do escalonamento em lista (HEFT); com ruído > 0 os ranks
+# são perturbados, gerando variações viáveis para o restante da população.
+def gerar_solucao_inicial(ruido=0.3, rng=random):
+    return escalonamento_lista(tarefas, num_maquinas, ruido, rng)
 
 def calcular_makespan(solucao):
     tempos = [0] * num_maquinas
@@ -139,103 +136,162 @@ def calcular_makespan(solucao):
     
     return max(tempos), tempos_conclusao
 
+contador_avaliacoes = ContadorAvaliacoes()
+
+@contador_avaliacoes
 def fitness(solucao):
     makespan, _ = calcular_makespan(solucao)
     return makespan
 
-def crossover(pai1, pai2):
-    filho1 = [[] for _ in range(num_maquinas)]
-    filho2 = [[] for _ in range(num_maquinas)]
-    
-    # Crossover em um ponto
-    ponto_corte = random.randint(1, num_tarefas - 1)
-    
-    # Achatar as soluções
-    flat_pai1 = [t for maq in pai1 for t in maq]
-    flat_pai2 = [t for maq in pai2 for t in maq]
-    
-    # Criar filhos
-    filho1_flat = flat_pai1[:ponto_corte] + [t for t in flat_pai2 if t not in flat_pai1[:ponto_corte]]
-    filho2_flat = flat_pai2[:ponto_corte] + [t for t in flat_pai1 if t not in flat_pai2[:ponto_corte]]
+# Vetor tarefa -> máquina, usado para medir a diversidade da população
+def vetor_atribuicao(solucao):
+    vetor = [0] * num_tarefas
+    for maq, tarefas_maq in enumerate(solucao):
+        for t in tarefas_maq:
+            vetor[t - 1] = maq
+    return vetor
+
+# Sequência de prioridade de uma solução: ordem global viável que preserva
+# a ordem de cada máquina (ou, se houver ciclo, as máquinas intercaladas e reparadas)
+def sequencia_prioridade(solucao):
+    return sequencia_global(solucao, predecessoras)
+
+# Makespan exato (representação compacta, uma passada pela sequência global).
+# calcular_makespan é uma aproximação em duas passadas que pode subestimar e
+# dá valor finito a soluções com ciclo entre máquinas; aqui uma solução com
+# ciclo (a sequência global precisou de reparo) é inviável e vale infinito.
+def makespan_exato(solucao):
+    compacta = SolucaoCompacta.de_listas(dados_compactos, solucao, sequencia_prioridade(solucao))
+    if compacta.para_listas() != solucao:
+        return float("inf")
+    return compacta.avaliar()
+
+# Monta a lista de listas percorrendo a sequência: a ordem em cada máquina
+# segue a sequência, que é viável, então não há ciclos entre máquinas
+def montar_solucao(sequencia, maquina_da_tarefa):
+    solucao = [[] for _ in range(num_maquinas)]
+    for t in sequencia:
+        solucao[maquina_da_tarefa[t - 1]].append(t)
+    return solucao
+
+def crossover(pai1, pai2, rng=random):
+    operador = OPERADORES[operador_crossover]
+    seq1 = sequencia_prioridade(pai1)
+    seq2 = sequencia_prioridade(pai2)
     
-    # Distribuir nas máquinas mantendo a ordem
-    for t in filho1_flat:
-        maq = random.randint(0, num_maquinas - 1)
-        filho1[maq].append(t)
+    # Ordem: operador de permutação + reparo de precedência (O(n log n))
+    filho1_seq = reparar_precedencia(operador(seq1, seq2, rng), predecessoras)
+    filho2_seq = reparar_precedencia(operador(seq2, seq1, rng), predecessoras)
     
-    for t in filho2_flat:
-        maq = random.randint(0, num_maquinas - 1)
-        filho2[maq].append(t)
+    # Máquinas: crossover uniforme dos vetores tarefa -> máquina
+    maq1 = vetor_atribuicao(pai1)
+    maq2 = vetor_atribuicao(pai2)
+    filho1_maq = maq1[:]
+    filho2_maq = maq2[:]
+    for i in range(num_tarefas):
+        if rng.random() < 0.5:
+            filho1_maq[i], filho2_maq[i] = maq2[i], maq1[i]
     
-    return filho1, filho2
+    return montar_solucao(filho1_seq, filho1_maq), montar_solucao(filho2_seq, filho2_maq)
 
-def mutacao(solucao):
+def mutacao(solucao, rng=random):
     # Escolher duas tarefas em máquinas diferentes e trocá-las
-    maq1, maq2 = random.sample(range(num_maquinas), 2)
+    maq1, maq2 = rng.sample(range(num_maquinas), 2)
     if solucao[maq1] and solucao[maq2]:
-        idx1 = random.randint(0, len(solucao[maq1]) - 1)
-        idx2 = random.randint(0, len(solucao[maq2]) - 1)
+        idx1 = rng.randint(0, len(solucao[maq1]) - 1)
+        idx2 = rng.randint(0, len(solucao[maq2]) - 1)
         solucao[maq1][idx1], solucao[maq2][idx2] = solucao[maq2][idx2], solucao[maq1][idx1]
+        # A troca pode criar ciclo entre máquinas: refaz a ordem a partir da
+        # sequência global (reparada se preciso), como no crossover
+        solucao = montar_solucao(sequencia_prioridade(solucao), vetor_atribuicao(solucao))
     return solucao
 
+motor_busca = BuscaVND(vizinhancas_criticas(), max_sem_melhoria=2, primeira_melhoria=True, contador=contador_avaliacoes)
+
 def busca_local(solucao):
-    melhor_solucao = [maq.copy() for maq in solucao]
-    melhor_fitness = fitness(melhor_solucao)
-    
-    for _ in range(10):  # Número de tentativas de melhoria
-        nova_solucao = [maq.copy() for maq in solucao]
-        maq1, maq2 = random.sample(range(num_maquinas), 2)
-        if nova_solucao[maq1] and nova_solucao[maq2]:
-            idx1 = random.randint(0, len(nova_solucao[maq1]) - 1)
-            idx2 = random.randint(0, len(nova_solucao[maq2]) - 1)
-            nova_solucao[maq1][idx1], nova_solucao[maq2][idx2] = nova_solucao[maq2][idx2], nova_solucao[maq1][idx1]
-            
-            novo_fitness = fitness(nova_solucao)
-            if novo_fitness < melhor_fitness:
-                melhor_solucao = nova_solucao
-                melhor_fitness = novo_fitness
-    
-    return melhor_solucao
+    # VND com tabu (busca_vnd.py) sobre a vizinhança do caminho crítico:
+    # deslocar, trocar e inserir tarefas com folga zero, aplicados e
+    # avaliados no lugar na representação compacta
+    compacta = SolucaoCompacta.de_listas(dados_compactos, solucao, sequencia_prioridade(solucao))
+    valor_inicial = compacta.avaliar()
+    melhor = motor_busca.executar(compacta)
+    if melhor.avaliar() >= valor_inicial:
+        return solucao
+    return melhor.para_listas()
 
-def algoritmo_memetico(tamanho_populacao=50, geracoes=100, prob_mutacao=0.1, prob_busca_local=0.2):
+def algoritmo_memetico(tamanho_populacao=50, geracoes=100, prob_mutacao=0.1, prob_busca_local=0.2, monitor=None,
+                       semente=None, checkpoint=None, intervalo_checkpoint=10):
+    # Toda a aleatoriedade vem de um random.Random próprio (reprodutível com `semente`);
+    # com `checkpoint` o estado é gravado periodicamente e retomado se o arquivo existir
+    if monitor is None:
+        monitor = Monitor(contador=contador_avaliacoes)
+    monitor.iniciar()
     start_time = time.time()
-    historico_fitness = []
-    
-    # Inicializar população
-    populacao = [gerar_solucao_inicial() for _ in range(tamanho_populacao)]
-    fitness_pop = [fitness(ind) for ind in populacao]
+    rng = random.Random(semente)
     
-    melhor_idx = np.argmin(fitness_pop)
-    melhor_solucao = [maq.copy() for maq in populacao[melhor_idx]]
-    melhor_fitness = fitness_pop[melhor_idx]
-    historico_fitness.append(melhor_fitness)
+    # O checkpoint só é retomado se for desta instância e desta configuração
+    instancia = impressao_instancia(tarefas, num_maquinas, tamanho_populacao, geracoes, operador_crossover)
+    estado = carregar_checkpoint(checkpoint, instancia) if checkpoint else None
+    if estado is not None:
+        populacao = estado["populacao"]
+        fitness_pop = estado["fitness"]
+        melhor_solucao = estado["melhor_solucao"]
+        melhor_fitness = estado["melhor_fitness"]
+        historico_fitness = estado["historico"]
+        monitor.retomar(estado["monitor"], estado["tempo"])
+        rng.setstate(estado["rng"])
+        start_time -= estado["tempo"]
+        primeira_geracao = estado["geracao"] + 1
+        parar = False
+    else:
+        # Inicializar população
+        historico_fitness = []
+        populacao = [gerar_solucao_inicial(ruido=0.0)] + [gerar_solucao_inicial(rng=rng) for _ in range(tamanho_populacao - 1)]
+        fitness_pop = [fitness(ind) for ind in populacao]
+        
+        melhor_idx = np.argmin(fitness_pop)
+        melhor_solucao = [maq.copy() for maq in populacao[melhor_idx]]
+        melhor_fitness = fitness_pop[melhor_idx]
+        historico_fitness.append(melhor_fitness)
+        primeira_geracao = 0
+        # Os critérios de parada (limite inferior) recebem o makespan exato do melhor
+        parar = monitor.fim_geracao(0, makespan_exato(melhor_solucao), diversidade_genotipica([vetor_atribuicao(ind) for ind in populacao]))
     
-    for geracao in range(geracoes):
+    for geracao in range(primeira_geracao, geracoes):
+        if parar:
+            break
         # Seleção por torneio
         nova_populacao = []
         for _ in range(tamanho_populacao // 2):
-            # Torneio binário
-            candidatos = random.sample(range(tamanho_populacao), 2)
-            pai1 = populacao[min(candidatos, key=lambda x: fitness_pop[x])]
-            
-            candidatos = random.sample(range(tamanho_populacao), 2)
-            pai2 = populacao[min(candidatos, key=lambda x: fitness_pop[x])]
+            with monitor.fase("selecao"):
+                # Torneio binário
+                candidatos = rng.sample(range(tamanho_populacao), 2)
+                pai1 = populacao[min(candidatos, key=lambda x: fitness_pop[x])]
+                
+                candidatos = rng.sample(range(tamanho_populacao), 2)
+                pai2 = populacao[min(candidatos, key=lambda x: fitness_pop[x])]
             
             # Crossover
-            filho1, filho2 = crossover(pai1, pai2)
+            with monitor.fase("crossover"):
+                filho1, filho2 = crossover(pai1, pai2, rng)
             
             # Mutação
-            if random.random() < prob_mutacao:
-                filho1 = mutacao(filho1)
-            if random.random() < prob_mutacao:
-                filho2 = mutacao(filho2)
+            with monitor.fase("mutacao"):
+                if rng.random() < prob_mutacao:
+                    filho1 = mutacao(filho1, rng)
+                if rng.random() < prob_mutacao:
+                    filho2 = mutacao(filho2, rng)
             
             nova_populacao.extend([filho1, filho2])
         
         # Aplicar busca local em alguns indivíduos
-        for i in range(len(nova_populacao)):
-            if random.random() < prob_busca_local:
-                nova_populacao[i] = busca_local(nova_populacao[i])
+        with monitor.fase("busca_local"):
+            for i in range(len(nova_populacao)):
+                if rng.random() < prob_busca_local:
+                    refinado = busca_local(nova_populacao[i])
+                    # busca_local só troca a solução quando encontra melhoria estrita
+                    monitor.registrar_busca_local(refinado != nova_populacao[i])
+                    nova_populacao[i] = refinado
         
         # Avaliar nova população
         nova_fitness = [fitness(ind) for ind in nova_populacao]
@@ -257,18 +313,41 @@ def algoritmo_memetico(tamanho_populacao=50, geracoes=100, prob_mutacao=0.1, pro
             melhor_fitness = fitness_pop[melhor_idx]
         
         historico_fitness.append(melhor_fitness)
+        parar = monitor.fim_geracao(geracao + 1, makespan_exato(melhor_solucao), diversidade_genotipica([vetor_atribuicao(ind) for ind in populacao]))
         
         if geracao % 10 == 0:
             print(f"Geração {geracao}: Makespan = {melhor_fitness}")
+        
+        if checkpoint and (geracao + 1) % intervalo_checkpoint == 0:
+            salvar_checkpoint(checkpoint, {
+                "instancia": instancia,
+                "geracao": geracao,
+                "populacao": populacao,
+                "fitness": fitness_pop,
+                "melhor_solucao": melhor_solucao,
+                "melhor_fitness": melhor_fitness,
+                "historico": historico_fitness,
+                "monitor": monitor.historico,
+                "rng": rng.getstate(),
+                "tempo": time.time() - start_time,
+            })
     
+    remover_checkpoint(checkpoint)
     tempo_execucao = time.time() - start_time
     
-    # Resultados finais
-    makespan_final, tempos_conclusao = calcular_makespan(melhor_solucao)
+    # Resultados finais: makespan e tempos exatos (calcular_makespan pode subestimar)
+    makespan_final = makespan_exato(melhor_solucao)
+    conclusao = SolucaoCompacta.de_listas(dados_compactos, melhor_solucao, sequencia_prioridade(melhor_solucao)).tempos_conclusao()
+    tempos_conclusao = {t: conclusao[dados_compactos.indice[t]] for t in dados_compactos.ids}
     
     print("\n--- Resultados Finais ---")
     print(f"Makespan: {makespan_final}")
+    print(f"Limite inferior: {limite_inferior} (gap: {gap_otimalidade(makespan_final, limite_inferior):.2%}, caminho crítico: {caminho_critico(tarefas)[1]})")
     print(f"Tempo de execução: {tempo_execucao:.2f} segundos")
+    if monitor.motivo_parada:
+        print(f"Parada antecipada na geração {monitor.historico[-1].geracao}: {monitor.motivo_parada}")
+    print(f"Avaliações totais: {sum(e.avaliacoes for e in monitor.historico)}")
+    print(f"Busca local por vizinhança:\n{motor_busca.relatorio()}")
     
     # Imprimir alocação de tarefas
     print("\nAlocação de Tarefas por Máquina:")
@@ -289,4 +368,9 @@ def algoritmo_memetico(tamanho_populacao=50, geracoes=100, prob_mutacao=0.1, pro
     return melhor_solucao, makespan_final, tempo_execucao
 
 # Executar o algoritmo
-solucao_otima, makespan, tempo = algoritmo_memetico(tamanho_populacao=50, geracoes=100)
\ No newline at end of file
+monitor = Monitor(
+    criterios=[ParadaLimiteInferior(limite_inferior), ParadaEstagnacao(20)],
+    contador=contador_avaliacoes,
+)
+solucao_otima, makespan, tempo = algoritmo_memetico(tamanho_populacao=50, geracoes=100, monitor=monitor,
+                                                    semente=42, checkpoint="checkpoint_dificil.bin")
\ No newline at end of file
@@ -2,6 +2,13 @@ import random
 import time
 import matplotlib.pyplot as plt
 
+from busca_vnd import BuscaVND, EstadoCargas, vizinhancas_cargas
+from checkpoint import carregar_checkpoint, impressao_instancia, remover_checkpoint, salvar_checkpoint
+from exato import MAX_TAREFAS_EXATO, branch_and_bound
+from limites import gap_otimalidade, limite_maquinas_identicas
+from sementes import lpt, populacao_semeada
+from monitoramento import ContadorAvaliacoes, Monitor, ParadaEstagnacao, ParadaLimiteInferior, diversidade_genotipica
+
 
 tempos_tarefas = [
     12, 5, 9, 7, 4, 11, 8, 6, 10, 3,
@@ -16,8 +23,14 @@ populacao_tamanho = 50
 geracoes = 100
 taxa_crossover = 0.8
 taxa_mutacao = 0.1
+semente = 42
+
+limite_inferior = limite_maquinas_identicas(tempos_tarefas, num_maquinas)
+
+contador_avaliacoes = ContadorAvaliacoes()
 
 
+@contador_avaliacoes
 def avaliar(solucao):
     carga_maquinas = [0] * num_maquinas
     for tarefa_id, maquina_id in enumerate(solucao):
@@ -25,91 +38,154 @@ def avaliar(solucao):
     return max(carga_maquinas)
 
 
-def gerar_populacao():
-    return [
-        [random.randint(0, num_maquinas - 1) for _ in range(num_tarefas)]
-        for _ in range(populacao_tamanho)
-    ]
+def gerar_populacao(rng=random):
+    # Semente LPT mais perturbações aleatórias dela
+    return populacao_semeada(lpt(tempos_tarefas, num_maquinas), populacao_tamanho, num_maquinas, rng=rng)
 
 
-def selecao_torneio(populacao, k=3):
-    candidatos = random.sample(populacao, k)
-    return min(candidatos, key=avaliar)
+def selecao_torneio(populacao, fitness_pop, k=3, rng=random):
+    # Usa o fitness já calculado da população em vez de reavaliar os candidatos
+    candidatos = rng.sample(range(len(populacao)), k)
+    return populacao[min(candidatos, key=fitness_pop.__getitem__)]
 
 
-def crossover(pai1, pai2):
-    ponto = random.randint(1, num_tarefas - 1)
+def crossover(pai1, pai2, rng=random):
+    ponto = rng.randint(1, num_tarefas - 1)
     filho1 = pai1[:ponto] + pai2[ponto:]
     filho2 = pai2[:ponto] + pai1[ponto:]
     return filho1, filho2
 
 
-def mutar(individuo):
+def mutar(individuo, rng=random):
     novo = individuo[:]
-    if random.random() < taxa_mutacao:
-        pos = random.randint(0, num_tarefas - 1)
-        novo[pos] = random.randint(0, num_maquinas - 1)
+    if rng.random() < taxa_mutacao:
+        pos = rng.randint(0, num_tarefas - 1)
+        novo[pos] = rng.randint(0, num_maquinas - 1)
     return novo
 
 
+# VND com tabu (busca_vnd.py): mover, trocar e troca dupla avaliados por deltas de carga
+matriz_tempos = [[tempo] * num_maquinas for tempo in tempos_tarefas]
+motor_busca = BuscaVND(vizinhancas_cargas(), max_sem_melhoria=2, primeira_melhoria=True, contador=contador_avaliacoes)
+
+
 def busca_local(individuo):
-    melhor = individuo[:]
-    melhor_valor = avaliar(melhor)
-    for i in range(num_tarefas):
-        for m in range(num_maquinas):
-            if melhor[i] != m:
-                vizinho = melhor[:]
-                vizinho[i] = m
-                valor_vizinho = avaliar(vizinho)
-                if valor_vizinho < melhor_valor:
-                    melhor = vizinho
-                    melhor_valor = valor_vizinho
-    return melhor
-
-
-def algoritmo_memetico():
+    melhor = motor_busca.executar(EstadoCargas(individuo, matriz_tempos, num_maquinas))
+    return melhor.solucao
+
+
+def algoritmo_memetico(monitor=None, semente=None, checkpoint=None, intervalo_checkpoint=10):
+    """
+    Com `semente` a execução é reproduzível: toda a aleatoriedade vem de um
+    random.Random próprio. Com `checkpoint`, o estado é gravado a cada
+    `intervalo_checkpoint` gerações e, se o arquivo já existir, a execução
+    continua exatamente de onde parou.
+    """
+    if monitor is None:
+        monitor = Monitor(contador=contador_avaliacoes)
+    monitor.iniciar()
     inicio = time.time()
-    populacao = gerar_populacao()
-    melhor_solucao = min(populacao, key=avaliar)
-    melhor_makespan = avaliar(melhor_solucao)
-    historico = [melhor_makespan]
-
-    for _ in range(geracoes):
+    rng = random.Random(semente)
+
+    # O checkpoint só é retomado se for desta instância e desta configuração
+    instancia = impressao_instancia(tempos_tarefas, num_maquinas, populacao_tamanho, geracoes)
+    estado = carregar_checkpoint(checkpoint, instancia) if checkpoint else None
+    if estado is not None:
+        populacao = estado["populacao"]
+        fitness_pop = estado["fitness"]
+        melhor_solucao = estado["melhor_solucao"]
+        melhor_makespan = estado["melhor_makespan"]
+        historico = estado["historico"]
+        monitor.retomar(estado["monitor"], estado["tempo"])
+        rng.setstate(estado["rng"])
+        inicio -= estado["tempo"]
+        primeira_geracao = estado["geracao"] + 1
+        parar = False
+    else:
+        populacao = gerar_populacao(rng)
+        fitness_pop = [avaliar(ind) for ind in populacao]
+        melhor_idx = min(range(populacao_tamanho), key=fitness_pop.__getitem__)
+        melhor_solucao = populacao[melhor_idx]
+        melhor_makespan = fitness_pop[melhor_idx]
+        historico = [melhor_makespan]
+        primeira_geracao = 1
+        parar = monitor.fim_geracao(0, melhor_makespan, diversidade_genotipica(populacao))
+
+    for geracao in range(primeira_geracao, geracoes + 1):
+        if parar:
+            break
         nova_populacao = []
 
         while len(nova_populacao) < populacao_tamanho:
-            pai1 = selecao_torneio(populacao)
-            pai2 = selecao_torneio(populacao)
+            with monitor.fase("selecao"):
+                pai1 = selecao_torneio(populacao, fitness_pop, rng=rng)
+                pai2 = selecao_torneio(populacao, fitness_pop, rng=rng)
 
-            if random.random() < taxa_crossover:
-                filho1, filho2 = crossover(pai1, pai2)
-            else:
-                filho1, filho2 = pai1[:], pai2[:]
+            with monitor.fase("crossover"):
+                if rng.random() < taxa_crossover:
+                    filho1, filho2 = crossover(pai1, pai2, rng)
+                else:
+                    filho1, filho2 = pai1[:], pai2[:]
 
-            filho1 = mutar(filho1)
-            filho2 = mutar(filho2)
+            with monitor.fase("mutacao"):
+                filho1 = mutar(filho1, rng)
+                filho2 = mutar(filho2, rng)
 
-            filho1 = busca_local(filho1)
-            filho2 = busca_local(filho2)
+            with monitor.fase("busca_local"):
+                refinado1 = busca_local(filho1)
+                refinado2 = busca_local(filho2)
+            # busca_local só altera o indivíduo quando encontra melhoria estrita
+            monitor.registrar_busca_local(refinado1 != filho1)
+            monitor.registrar_busca_local(refinado2 != filho2)
 
-            nova_populacao.extend([filho1, filho2])
+            nova_populacao.extend([refinado1, refinado2])
 
         populacao = nova_populacao[:populacao_tamanho]
-        atual = min(populacao, key=avaliar)
-        atual_makespan = avaliar(atual)
+        fitness_pop = [avaliar(ind) for ind in populacao]
+        melhor_idx = min(range(populacao_tamanho), key=fitness_pop.__getitem__)
 
-        if atual_makespan < melhor_makespan:
-            melhor_solucao = atual
-            melhor_makespan = atual_makespan
+        if fitness_pop[melhor_idx] < melhor_makespan:
+            melhor_solucao = populacao[melhor_idx]
+            melhor_makespan = fitness_pop[melhor_idx]
 
         historico.append(melhor_makespan)
-
+        parar = monitor.fim_geracao(geracao, melhor_makespan, diversidade_genotipica(populacao))
+
+        if checkpoint and geracao % intervalo_checkpoint == 0:
+            salvar_checkpoint(checkpoint, {
+                "instancia": instancia,
+                "geracao": geracao,
+                "populacao": populacao,
+                "fitness": fitness_pop,
+                "melhor_solucao": melhor_solucao,
+                "melhor_makespan": melhor_makespan,
+                "historico": historico,
+                "monitor": monitor.historico,
+                "rng": rng.getstate(),
+                "tempo": time.time() - inicio,
+            })
+
+    remover_checkpoint(checkpoint)
     fim = time.time()
     tempo_execucao = fim - inicio
     return melhor_solucao, melhor_makespan, tempo_execucao, historico
 
 
-solucao, makespan, tempo_total, historico = algoritmo_memetico()
+def resolver(monitor=None, semente=None, checkpoint=None):
+    # Instâncias pequenas: branch-and-bound exato; se estourar o limite de nós, memético
+    if num_tarefas <= MAX_TAREFAS_EXATO:
+        inicio = time.time()
+        solucao, makespan, otimo = branch_and_bound(tempos_tarefas, num_maquinas)
+        if otimo:
+            return solucao, makespan, time.time() - inicio, [makespan], "exato"
+    return (*algoritmo_memetico(monitor, semente, checkpoint), "memetico")
+
+
+monitor = Monitor(
+    criterios=[ParadaLimiteInferior(limite_inferior), ParadaEstagnacao(20)],
+    contador=contador_avaliacoes,
+)
+solucao, makespan, tempo_total, historico, modo = resolver(monitor, semente, "checkpoint_facil.bin")
 
 print("\n------------------------------------------------------------")
 print("ATRIBUIÇÃO FINAL DE TAREFAS ÀS MÁQUINAS")
@@ -126,7 +202,12 @@ for i in range(num_maquinas):
     print(f"Máquina {i+1}: Tarefas {alocacao_por_maquina[i]}, Tempo total: {carga_maquinas[i]}")
 
 print(f"VALOR FINAL DO MAKESPAN: {makespan}")
-print(f"TEMPO DE EXECUÇÃO DO ALGORITMO: {tempo_total:.2f} segundos\n\n")
+print(f"LIMITE INFERIOR: {limite_inferior} (gap: {gap_otimalidade(makespan, limite_inferior):.2%})")
+print(f"TEMPO DE EXECUÇÃO DO ALGORITMO: {tempo_total:.2f} segundos (modo {modo})")
+if monitor.motivo_parada:
+    print(f"Parada antecipada na geração {monitor.historico[-1].geracao}: {monitor.motivo_parada}")
+print(f"Avaliações totais: {sum(e.avaliacoes for e in monitor.historico)}")
+print(f"Busca local por vizinhança:\n{motor_busca.relatorio()}\n\n")
 
 plt.figure()
 plt.plot(historico, marker='o')
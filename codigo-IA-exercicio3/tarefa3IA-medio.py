@@ -1,6 +1,16 @@
 import random
 import time
 import matplotlib.pyplot as plt
+import numpy as np
+
+from busca_vnd import BuscaVND
+from checkpoint import carregar_checkpoint, impressao_instancia, remover_checkpoint, salvar_checkpoint
+from exato import MAX_TAREFAS_EXATO_UNIFORMES, branch_and_bound
+from limites import gap_otimalidade, limite_maquinas_uniformes
+from sementes import menor_termino, populacao_semeada
+from vetorizado import (EstadoCargasVetorizado, avaliar_escalar, avaliar_populacao, matriz_processamento,
+                        vizinhancas_lote)
+from monitoramento import ContadorAvaliacoes, Monitor, ParadaEstagnacao, ParadaLimiteInferior, diversidade_genotipica
 
 tarefa_tempos = [
     25, 17, 20, 12, 28, 16, 22, 15, 18, 30,
@@ -16,103 +26,186 @@ populacao_tamanho = 50
 geracoes = 100
 taxa_crossover = 0.8
 taxa_mutacao = 0.1
+semente = 42
+
+limite_inferior = limite_maquinas_uniformes(tarefa_tempos, capacidades_maquinas)
 
 def tempo_execucao(tarefa_id, maquina_id):
     return tarefa_tempos[tarefa_id] / capacidades_maquinas[maquina_id]
 
+contador_avaliacoes = ContadorAvaliacoes()
+
+# Matriz tarefa x máquina calculada uma vez. Uma solução isolada é avaliada
+# num laço em Python puro sobre as linhas da matriz; a geração inteira, de
+# uma vez com NumPy (avaliar_populacao) sobre os arrays da busca local
+matriz_tempos = matriz_processamento(tarefa_tempos, capacidades_maquinas)
+linhas_tempos = matriz_tempos.tolist()
+
+@contador_avaliacoes
 def avaliar(solucao):
-    tempos_maquinas = [0] * num_maquinas
-    for tarefa_id, maquina_id in enumerate(solucao):
-        tempos_maquinas[maquina_id] += tempo_execucao(tarefa_id, maquina_id)
-    return max(tempos_maquinas)
-
-def gerar_populacao():
-    return [
-        [random.randint(0, num_maquinas - 1) for _ in range(num_tarefas)]
-        for _ in range(populacao_tamanho)
-    ]
-
-def selecao_torneio(populacao, k=3):
-    selecionados = random.sample(populacao, k)
-    return min(selecionados, key=avaliar)
-
-def crossover(pai1, pai2):
-    ponto = random.randint(1, num_tarefas - 1)
+    return avaliar_escalar(solucao, linhas_tempos, num_maquinas)
+
+def avaliar_lote(populacao):
+    contador_avaliacoes.total += len(populacao)
+    return avaliar_populacao(populacao, matriz_tempos).tolist()
+
+def gerar_populacao(rng=random):
+    # Semente earliest-finish-time mais perturbações aleatórias dela
+    return populacao_semeada(menor_termino(tarefa_tempos, capacidades_maquinas), populacao_tamanho, num_maquinas, rng=rng)
+
+def selecao_torneio(populacao, fitness_pop, k=3, rng=random):
+    # Usa o fitness já calculado da população em vez de reavaliar os candidatos
+    selecionados = rng.sample(range(len(populacao)), k)
+    return populacao[min(selecionados, key=fitness_pop.__getitem__)]
+
+def crossover(pai1, pai2, rng=random):
+    ponto = rng.randint(1, num_tarefas - 1)
     filho1 = pai1[:ponto] + pai2[ponto:]
     filho2 = pai2[:ponto] + pai1[ponto:]
     return filho1, filho2
 
 
-def mutar(individuo):
+def mutar(individuo, rng=random):
     novo = individuo[:]
-    if random.random() < taxa_mutacao:
-        pos = random.randint(0, num_tarefas - 1)
-        novo[pos] = random.randint(0, num_maquinas - 1)
+    if rng.random() < taxa_mutacao:
+        pos = rng.randint(0, num_tarefas - 1)
+        novo[pos] = rng.randint(0, num_maquinas - 1)
     return novo
 
+# VND com tabu (busca_vnd.py): mover e trocar avaliados em lote sobre a
+# matriz de tempos; a troca dupla custa ~75% do tempo e quase não melhora
+# nesta instância
+motor_busca = BuscaVND(vizinhancas_lote(), max_sem_melhoria=2, contador=contador_avaliacoes)
+
 def busca_local(individuo):
-    melhor = individuo[:]
-    melhor_valor = avaliar(melhor)
-    for i in range(num_tarefas):
-        for m in range(num_maquinas):
-            if melhor[i] != m:
-                vizinho = melhor[:]
-                vizinho[i] = m
-                valor_vizinho = avaliar(vizinho)
-                if valor_vizinho < melhor_valor:
-                    melhor = vizinho
-                    melhor_valor = valor_vizinho
-    return melhor
-
-def algoritmo_memetico():
+    # Retorna o array do VND; a população guarda a lista, o lote usa o array
+    return motor_busca.executar(EstadoCargasVetorizado(individuo, matriz_tempos)).solucao
+
+def algoritmo_memetico(monitor=None, semente=None, checkpoint=None, intervalo_checkpoint=10):
+    """
+    Com `semente` a execução é reproduzível: toda a aleatoriedade vem de um
+    random.Random próprio. Com `checkpoint`, o estado é gravado a cada
+    `intervalo_checkpoint` gerações e, se o arquivo já existir, a execução
+    continua exatamente de onde parou.
+    """
+    if monitor is None:
+        monitor = Monitor(contador=contador_avaliacoes)
+    monitor.iniciar()
     inicio = time.time()
-    populacao = gerar_populacao()
-    melhor_solucao = min(populacao, key=avaliar)
-    melhor_makespan = avaliar(melhor_solucao)
-    historico = [melhor_makespan]
-
-    for geracao in range(geracoes):
+    rng = random.Random(semente)
+
+    # O checkpoint só é retomado se for desta instância e desta configuração
+    instancia = impressao_instancia(tarefa_tempos, capacidades_maquinas, populacao_tamanho, geracoes)
+    estado = carregar_checkpoint(checkpoint, instancia) if checkpoint else None
+    if estado is not None:
+        populacao = estado["populacao"]
+        fitness_pop = estado["fitness"]
+        melhor_solucao = estado["melhor_solucao"]
+        melhor_makespan = estado["melhor_makespan"]
+        historico = estado["historico"]
+        monitor.retomar(estado["monitor"], estado["tempo"])
+        rng.setstate(estado["rng"])
+        inicio -= estado["tempo"]
+        primeira_geracao = estado["geracao"] + 1
+        parar = False
+    else:
+        populacao = gerar_populacao(rng)
+        fitness_pop = avaliar_lote(populacao)
+        melhor_idx = min(range(populacao_tamanho), key=fitness_pop.__getitem__)
+        melhor_solucao = populacao[melhor_idx]
+        melhor_makespan = fitness_pop[melhor_idx]
+        historico = [melhor_makespan]
+        primeira_geracao = 1
+        parar = monitor.fim_geracao(0, melhor_makespan, diversidade_genotipica(populacao))
+
+    for geracao in range(primeira_geracao, geracoes + 1):
+        if parar:
+            break
         nova_populacao = []
+        vetores = []
 
         while len(nova_populacao) < populacao_tamanho:
-            pai1 = selecao_torneio(populacao)
-            pai2 = selecao_torneio(populacao)
-
-            if random.random() < taxa_crossover:
-                filho1, filho2 = crossover(pai1, pai2)
-            else:
-                filho1, filho2 = pai1[:], pai2[:]
-
-            filho1 = mutar(filho1)
-            filho2 = mutar(filho2)
-
-            filho1 = busca_local(filho1)
-            filho2 = busca_local(filho2)
-
-            nova_populacao.extend([filho1, filho2])
+            with monitor.fase("selecao"):
+                pai1 = selecao_torneio(populacao, fitness_pop, rng=rng)
+                pai2 = selecao_torneio(populacao, fitness_pop, rng=rng)
+
+            with monitor.fase("crossover"):
+                if rng.random() < taxa_crossover:
+                    filho1, filho2 = crossover(pai1, pai2, rng)
+                else:
+                    filho1, filho2 = pai1[:], pai2[:]
+
+            with monitor.fase("mutacao"):
+                filho1 = mutar(filho1, rng)
+                filho2 = mutar(filho2, rng)
+
+            with monitor.fase("busca_local"):
+                vetor1 = busca_local(filho1)
+                vetor2 = busca_local(filho2)
+            refinado1, refinado2 = vetor1.tolist(), vetor2.tolist()
+            # busca_local só altera o indivíduo quando encontra melhoria estrita
+            monitor.registrar_busca_local(refinado1 != filho1)
+            monitor.registrar_busca_local(refinado2 != filho2)
+
+            nova_populacao.extend([refinado1, refinado2])
+            vetores.extend([vetor1, vetor2])
 
         populacao = nova_populacao[:populacao_tamanho]
-        atual = min(populacao, key=avaliar)
-        atual_makespan = avaliar(atual)
+        fitness_pop = avaliar_lote(np.stack(vetores[:populacao_tamanho]))
+        melhor_idx = min(range(populacao_tamanho), key=fitness_pop.__getitem__)
 
-        if atual_makespan < melhor_makespan:
-            melhor_solucao = atual
-            melhor_makespan = atual_makespan
+        if fitness_pop[melhor_idx] < melhor_makespan:
+            melhor_solucao = populacao[melhor_idx]
+            melhor_makespan = fitness_pop[melhor_idx]
 
         historico.append(melhor_makespan)
-
+        parar = monitor.fim_geracao(geracao, melhor_makespan, diversidade_genotipica(populacao))
+
+        if checkpoint and geracao % intervalo_checkpoint == 0:
+            salvar_checkpoint(checkpoint, {
+                "instancia": instancia,
+                "geracao": geracao,
+                "populacao": populacao,
+                "fitness": fitness_pop,
+                "melhor_solucao": melhor_solucao,
+                "melhor_makespan": melhor_makespan,
+                "historico": historico,
+                "monitor": monitor.historico,
+                "rng": rng.getstate(),
+                "tempo": time.time() - inicio,
+            })
+
+    remover_checkpoint(checkpoint)
     fim = time.time()
     tempo_execucao = fim - inicio
     return melhor_solucao, melhor_makespan, tempo_execucao, historico
 
-solucao, makespan, tempo_total, historico = algoritmo_memetico()
+def resolver(monitor=None, semente=None, checkpoint=None):
+    # Instâncias pequenas: branch-and-bound exato; se estourar o limite de nós, memético
+    if num_tarefas <= MAX_TAREFAS_EXATO_UNIFORMES:
+        inicio = time.time()
+        solucao, makespan, otimo = branch_and_bound(tarefa_tempos, velocidades=capacidades_maquinas)
+        if otimo:
+            return solucao, avaliar(solucao), time.time() - inicio, [makespan], "exato"
+    return (*algoritmo_memetico(monitor, semente, checkpoint), "memetico")
+
+monitor = Monitor(
+    criterios=[ParadaLimiteInferior(limite_inferior), ParadaEstagnacao(20)],
+    contador=contador_avaliacoes,
+)
+solucao, makespan, tempo_total, historico, modo = resolver(monitor, semente, "checkpoint_medio.bin")
 
 print("Atribuição de tarefas às máquinas:")
 for i, maquina in enumerate(solucao):
     print(f"Tarefa {i+1} -> Máquina {maquina+1}")
 
 print(f"\nMakespan final: {makespan:.2f}")
-print(f"Tempo de execução: {tempo_total:.2f} segundos")
+print(f"Limite inferior: {limite_inferior:.2f} (gap: {gap_otimalidade(makespan, limite_inferior):.2%})")
+print(f"Tempo de execução: {tempo_total:.2f} segundos (modo {modo})")
+if monitor.motivo_parada:
+    print(f"Parada antecipada na geração {monitor.historico[-1].geracao}: {monitor.motivo_parada}")
+print(f"Avaliações totais: {sum(e.avaliacoes for e in monitor.historico)}")
+print(f"Busca local por vizinhança:\n{motor_busca.relatorio()}")
 
 alocacao_por_maquina = [[] for _ in range(num_maquinas)]
 tempos_maquinas = [0] * num_maquinas
@@ -0,0 +1,305 @@
+from array import array
+from bisect import bisect_left
+
+
+# Vizinhança guiada pelo caminho crítico para o escalonamento com precedência.
+# Trabalha sobre SolucaoCompacta (representacao.py): calcula cabeças (tempo de
+# conclusão) e caudas (maior caminho até o fim) no grafo formado pelo DAG de
+# precedência mais a ordem em cada máquina. Só tarefas com folga zero estão
+# no caminho crítico, e só movimentos que as envolvem podem reduzir o makespan.
+# As cabeças e caudas escolhem os movimentos, e cada movimento candidato é
+# avaliado de forma incremental: só as cabeças das tarefas movidas e das que
+# elas de fato atrasam ou adiantam são recalculadas, em vez de um avaliar()
+# completo sobre toda a sequência.
+#
+# O custo fixo da atualização só se paga em instâncias maiores. Medido por
+# movimento (incremental / avaliar() completo) em DAGs aleatórios:
+#   30 tarefas    trocar 13/8 us,   inserir 3/4 us
+#   100 tarefas   trocar 26/21 us,  inserir 9/19 us
+#   300 tarefas   trocar 58/75 us,  inserir 19/61 us
+#   1000 tarefas  trocar 123/207 us, inserir 27/237 us
+# Abaixo de MIN_TAREFAS_INCREMENTAL o avaliar() completo é usado.
+
+TOLERANCIA = 1e-9
+MIN_TAREFAS_INCREMENTAL = 200
+
+
+class CaminhoCritico:
+    """Cabeças, caudas, folgas e vizinhos de máquina de uma SolucaoCompacta."""
+
+    def __init__(self, compacta):
+        dados = compacta.dados
+        n = dados.num_tarefas
+        tempos = dados.tempos
+        maquina = compacta.maquina
+
+        self.maquina = maquina[:]
+        self.makespan = compacta.avaliar()
+        self.conclusao = dados._conclusao[:]
+        # Cópia de trabalho das cabeças para a avaliação incremental; cada
+        # avaliação devolve as que alterou aos valores atuais
+        self._cabecas = array("d", self.conclusao)
+        self._marcadas = bytearray(n)
+
+        # Sequência de cada máquina e vizinhos imediatos na mesma máquina
+        self.por_maquina = [[] for _ in range(dados.num_maquinas)]
+        self.anterior = [-1] * n
+        self.proxima = [-1] * n
+        for t in compacta.ordem:
+            sequencia = self.por_maquina[maquina[t]]
+            if sequencia:
+                self.anterior[t] = sequencia[-1]
+                self.proxima[sequencia[-1]] = t
+            sequencia.append(t)
+        self.chaves_por_maquina = [[compacta.chave[t] for t in seq] for seq in self.por_maquina]
+
+        # Caudas em ordem reversa: sucessoras no DAG e na máquina têm chave maior
+        self.cauda = [0.0] * n
+        for t in reversed(compacta.ordem):
+            cauda = 0.0
+            for s in dados.sucessoras[t]:
+                cauda = max(cauda, tempos[s] + self.cauda[s])
+            s = self.proxima[t]
+            if s >= 0:
+                cauda = max(cauda, tempos[s] + self.cauda[s])
+            self.cauda[t] = cauda
+
+    def folga(self, t):
+        return self.makespan - (self.conclusao[t] + self.cauda[t])
+
+    def criticas(self):
+        return [t for t in range(len(self.cauda)) if self.folga(t) <= TOLERANCIA]
+
+    def vizinhas_na_maquina(self, chave, m):
+        """Tarefas da máquina m imediatamente antes e depois da posição `chave`."""
+        chaves = self.chaves_por_maquina[m]
+        i = bisect_left(chaves, chave)
+        antes = self.por_maquina[m][i - 1] if i > 0 else -1
+        depois = self.por_maquina[m][i] if i < len(chaves) else -1
+        return antes, depois
+
+    def vizinhas_apos_movimento(self, compacta, alteradas, m, chave):
+        """
+        Tarefas da máquina m imediatamente antes e depois da posição `chave`
+        na solução já alterada por um movimento que mudou só `alteradas`
+        (as demais mantêm máquina e chave). O(log n + len(alteradas)).
+        """
+        seq = self.por_maquina[m]
+        i = bisect_left(self.chaves_por_maquina[m], chave)
+        j = i - 1
+        while j >= 0 and seq[j] in alteradas:
+            j -= 1
+        antes = seq[j] if j >= 0 else -1
+        while i < len(seq) and (seq[i] in alteradas or compacta.chave[seq[i]] == chave):
+            i += 1
+        depois = seq[i] if i < len(seq) else -1
+        for t in alteradas:
+            if compacta.maquina[t] != m:
+                continue
+            k = compacta.chave[t]
+            if k < chave and (antes < 0 or k > compacta.chave[antes]):
+                antes = t
+            elif k > chave and (depois < 0 or k < compacta.chave[depois]):
+                depois = t
+        return antes, depois
+
+    def avaliar_movimento(self, compacta, alteradas):
+        """
+        Makespan de `compacta` depois de um movimento que mudou máquina ou
+        chave só das tarefas `alteradas`, igual ao de compacta.avaliar().
+
+        Atualização incremental das cabeças: recalcula as tarefas alteradas e
+        as que ganharam outra antecessora na máquina e propaga só pelas
+        sucessoras (no DAG e na máquina) de cabeças que mudaram. As marcadas
+        são visitadas em ordem de chave, e a varredura para quando não resta
+        nenhuma. O makespan é a maior cabeça entre as últimas tarefas de
+        cada máquina.
+        """
+        dados = compacta.dados
+        tempos = dados.tempos
+        predecessoras = dados.predecessoras
+        sucessoras = dados.sucessoras
+        ordem = compacta.ordem
+        chave = compacta.chave
+        maquina = compacta.maquina
+        cabecas = self._cabecas
+        marcadas = self._marcadas
+        n = dados.num_tarefas
+        # Fora das máquinas tocadas pelo movimento, as vizinhas não mudam
+        tocadas = {maquina[t] for t in alteradas} | {self.maquina[t] for t in alteradas}
+
+        pendentes = 0
+        for t in alteradas:
+            for u in (t, self.proxima[t], self.vizinhas_apos_movimento(compacta, alteradas, maquina[t], chave[t])[1]):
+                if u >= 0 and not marcadas[u]:
+                    marcadas[u] = 1
+                    pendentes += 1
+        k = min(chave[t] for t in alteradas)
+        modificadas = []
+        while pendentes:
+            t = ordem[k]
+            k += 1
+            if not marcadas[t]:
+                continue
+            marcadas[t] = 0
+            pendentes -= 1
+            if t in alteradas:
+                antes, depois = self.vizinhas_apos_movimento(compacta, alteradas, maquina[t], k - 1)
+            else:
+                # t não mudou: parte das vizinhas antigas, pulando as alteradas,
+                # e confere se alguma alterada entrou entre elas
+                antes, depois = self.anterior[t], self.proxima[t]
+                if maquina[t] in tocadas:
+                    while antes in alteradas:
+                        antes = self.anterior[antes]
+                    while depois in alteradas:
+                        depois = self.proxima[depois]
+                    for u in alteradas:
+                        if maquina[u] == maquina[t]:
+                            ku = chave[u]
+                            if ku < k - 1 and (antes < 0 or ku > chave[antes]):
+                                antes = u
+                            elif ku > k - 1 and (depois < 0 or ku < chave[depois]):
+                                depois = u
+            inicio = cabecas[antes] if antes >= 0 else 0.0
+            for p in predecessoras[t]:
+                if cabecas[p] > inicio:
+                    inicio = cabecas[p]
+            fim = inicio + tempos[t]
+            if fim == cabecas[t]:
+                continue
+            cabecas[t] = fim
+            modificadas.append(t)
+            for u in sucessoras[t]:
+                if not marcadas[u]:
+                    marcadas[u] = 1
+                    pendentes += 1
+            if depois >= 0 and not marcadas[depois]:
+                marcadas[depois] = 1
+                pendentes += 1
+        makespan = 0.0
+        for m, sequencia in enumerate(self.por_maquina):
+            if m in tocadas:
+                ultima, _ = self.vizinhas_apos_movimento(compacta, alteradas, m, n)
+            else:
+                ultima = sequencia[-1] if sequencia else -1
+            if ultima >= 0 and cabecas[ultima] > makespan:
+                makespan = cabecas[ultima]
+        for t in modificadas:
+            cabecas[t] = self.conclusao[t]
+        return makespan
+
+    def estimar_mudanca(self, compacta, t, m):
+        """
+        Estimativa do caminho mais longo através de t se ela for para a máquina
+        m, usando as cabeças e caudas atuais sem recalculá-las. O(grau + log n).
+
+        Serve de filtro para os deslocamentos; o makespan exato do movimento
+        é medido depois com `avaliar_movimento`.
+        """
+        dados = compacta.dados
+        tempos = dados.tempos
+        antes, depois = self.vizinhas_na_maquina(compacta.chave[t], m)
+        inicio = self.conclusao[antes] if antes >= 0 else 0.0
+        for p in dados.predecessoras[t]:
+            inicio = max(inicio, self.conclusao[p])
+        cauda = tempos[depois] + self.cauda[depois] if depois >= 0 else 0.0
+        for s in dados.sucessoras[t]:
+            cauda = max(cauda, tempos[s] + self.cauda[s])
+        return inicio + tempos[t] + cauda
+
+
+def movimentos_criticos(compacta, caminho):
+    """
+    Gera movimentos que envolvem tarefas críticas, como tuplas (tipo, a, b):
+      - ("deslocar", t, m): t muda para a máquina m mantendo sua posição global;
+      - ("trocar", t, u):   t troca de lugar com a vizinha u em outra máquina;
+      - ("inserir", t, u):  t troca de ordem com a vizinha u na própria máquina.
+    Deslocamentos cuja estimativa não melhora o makespan são descartados.
+    """
+    num_maquinas = compacta.dados.num_maquinas
+    for t in caminho.criticas():
+        origem = compacta.maquina[t]
+        for m in range(num_maquinas):
+            if m == origem:
+                continue
+            if caminho.estimar_mudanca(compacta, t, m) < caminho.makespan - TOLERANCIA:
+                yield "deslocar", t, m
+            for u in caminho.vizinhas_na_maquina(compacta.chave[t], m):
+                if u >= 0:
+                    yield "trocar", t, u
+        for u in (caminho.anterior[t], caminho.proxima[t]):
+            if u >= 0:
+                yield "inserir", t, u
+
+
+def aplicar(compacta, movimento):
+    """Aplica o movimento no lugar e retorna a função que o desfaz (ou None se inviável)."""
+    tipo, a, b = movimento
+    if tipo == "deslocar":
+        desfazer = compacta.mover(a, b)
+        return lambda: compacta.desfazer_mover(desfazer)
+    if tipo == "trocar":
+        desfazer = compacta.trocar(a, b)
+        if desfazer is None:
+            return None
+        return lambda: compacta.desfazer_troca(desfazer)
+    if not compacta.pode_trocar_ordem(a, b):
+        return None
+    compacta.trocar_ordem(a, b)
+    return lambda: compacta.trocar_ordem(a, b)
+
+
+class VizinhancaCritica:
+    """
+    Adaptador de um tipo de movimento crítico ("deslocar", "trocar" ou
+    "inserir") para o motor BuscaVND de busca_vnd.py.
+    """
+
+    def __init__(self, tipo):
+        self.tipo = tipo
+        self.nome = tipo
+        self._caminho = None
+
+    def movimentos(self, compacta):
+        # O caminho fica guardado para `valor`: o motor avalia os movimentos
+        # gerados antes de alterar a solução
+        self._caminho = CaminhoCritico(compacta)
+        for movimento in movimentos_criticos(compacta, self._caminho):
+            if movimento[0] == self.tipo:
+                yield movimento
+
+    def valor(self, compacta, movimento):
+        tipo, a, b = movimento
+        desfazer = aplicar(compacta, movimento)
+        if desfazer is None:
+            return None
+        if self._caminho is None or compacta.dados.num_tarefas < MIN_TAREFAS_INCREMENTAL:
+            valor = compacta.avaliar()
+        else:
+            valor = self._caminho.avaliar_movimento(compacta, (a,) if tipo == "deslocar" else (a, b))
+        desfazer()
+        return valor
+
+    def aplicar(self, compacta, movimento):
+        aplicar(compacta, movimento)
+
+    def destinos(self, compacta, movimento):
+        tipo, a, b = movimento
+        if tipo == "deslocar":
+            return [(a, b)]
+        if tipo == "trocar":
+            return [(a, compacta.maquina[b]), (b, compacta.maquina[a])]
+        return []
+
+    def origens(self, compacta, movimento):
+        tipo, a, b = movimento
+        if tipo == "deslocar":
+            return [(a, compacta.maquina[a])]
+        if tipo == "trocar":
+            return [(a, compacta.maquina[a]), (b, compacta.maquina[b])]
+        return []
+
+
+def vizinhancas_criticas():
+    return [VizinhancaCritica("deslocar"), VizinhancaCritica("trocar"), VizinhancaCritica("inserir")]
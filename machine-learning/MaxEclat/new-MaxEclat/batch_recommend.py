@@ -0,0 +1,290 @@
+import csv
+import json
+import os
+from collections import OrderedDict
+from itertools import islice
+from multiprocessing import Pool
+
+import numpy as np
+
+from list_parsing import safe_eval
+from movie_ids import movie_id
+from recommendation_cache import model_version, process_cache, profile_key
+from transaction_store import StoreRatingIndex, TransactionStore
+
+
+# Recomendação em lote (offline) para muitos usuários. O modelo é minerado uma
+# vez no processo principal; cada processo do pool abre a mesma base em disco
+# (memória mapeada, então as páginas são compartilhadas pelo sistema
+# operacional) e recebe os itemsets uma única vez, no inicializador.
+#
+# Os usuários chegam em blocos. Num bloco, os perfis viram uma matriz
+# usuário x item e a afinidade com todos os itemsets sai de um único produto
+# de matrizes; os candidatos de cada itemset são buscados uma vez e reaproveitados
+# por todos os usuários (a exclusão dos assistidos é feita por usuário, sobre
+# o prefixo da lista de candidatos). Os registros de cada usuário ficam no
+# cache do processo (recommendation_cache), então perfis repetidos, no mesmo
+# bloco ou em blocos seguintes do mesmo worker, não são recalculados.
+#
+# Entradas aceitas:
+#   - um diretório com um CSV por usuário (mesmo formato do modo interativo,
+#     sem cabeçalho: title, year, rating_imdb, genre, language, star, director);
+#     o id do usuário é o nome do arquivo;
+#   - um arquivo JSON lines, uma linha por usuário:
+#     {"user": "u1", "movies": [{"title": ..., "year": ..., "genre": ..., "star": ..., "director": ...}, ...]}
+#     (cada filme também pode ser uma lista na ordem das colunas do CSV).
+#
+# Saída: JSON lines, uma linha por usuário, na ordem de término dos blocos.
+# Uma linha de entrada malformada vira um registro {"user", "error"} com o
+# número da linha, e o lote continua.
+
+USER_COLUMNS = ['title', 'year', 'rating_imdb', 'genre', 'language', 'star', 'director']
+BLOCK_SIZE = 256
+CANDIDATE_CACHE_SIZE = 4096
+
+
+def iter_users(source):
+    """
+    Triplas (id do usuário, filmes, erro) de um diretório de CSVs ou de um
+    arquivo JSON lines.
+
+    Uma linha que não é JSON válido ou não tem "user" e uma lista em "movies"
+    gera (número da linha, None, mensagem), que vira registro de erro na saída
+    em vez de abortar o lote.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.endswith('.csv'):
+                yield os.path.splitext(name)[0], os.path.join(source, name), None
+        return
+    with open(source, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                user, movies = str(entry['user']), entry['movies']
+            except (ValueError, KeyError, TypeError) as e:
+                yield str(number), None, f"linha {number}: {type(e).__name__}: {e}"
+                continue
+            if not isinstance(movies, list):
+                yield user, None, f"linha {number}: 'movies' deve ser uma lista"
+                continue
+            yield user, movies, None
+
+
+def read_watch_list(movies):
+    """
+    Perfil (itens) e ids dos filmes assistidos.
+
+    Args:
+        movies: caminho de um CSV de usuário, ou lista de filmes (dicts ou listas
+            na ordem de USER_COLUMNS).
+    """
+    if isinstance(movies, str):
+        with open(movies, newline='', encoding='utf-8') as f:
+            movies = list(csv.reader(f))
+    profile = set()
+    watched = []
+    for movie in movies:
+        if not isinstance(movie, dict):
+            movie = dict(zip(USER_COLUMNS, movie))
+        for column in ('genre', 'star', 'director'):
+            profile.update(safe_eval(movie.get(column, '')))
+        watched.append(movie_id(movie.get('title', ''), movie.get('year', '')))
+    return profile, watched
+
+
+class BatchIndex(StoreRatingIndex):
+    """
+    StoreRatingIndex com os candidatos (sem exclusão) de cada itemset em cache,
+    compartilhados entre os usuários. A exclusão é o conjunto de ranks assistidos.
+    """
+
+    def __init__(self, store, cache_size=CANDIDATE_CACHE_SIZE):
+        super().__init__(store)
+        self._by_id = np.argsort(self.movie_ids, kind='stable')
+        self._sorted_ids = self.movie_ids[self._by_id]
+        self._candidates = OrderedDict()
+        self.cache_size = cache_size
+
+    def exclusion_mask(self, ids):
+        ids = np.fromiter(set(ids), dtype=np.uint64)
+        positions = np.searchsorted(self._sorted_ids, ids)
+        positions = positions[positions < len(self._sorted_ids)]
+        found = positions[np.isin(self._sorted_ids[positions], ids)]
+        return set(self._by_id[found].tolist())
+
+    def _all_candidates(self, itemset):
+        key = frozenset(itemset)
+        ranks = self._candidates.get(key)
+        if ranks is None:
+            ranks = super().candidate_ranks(itemset)
+            self._candidates[key] = ranks
+            if len(self._candidates) > self.cache_size:
+                self._candidates.popitem(last=False)
+        else:
+            self._candidates.move_to_end(key)
+        return ranks
+
+    def candidate_ranks(self, itemset, excluded=None):
+        ranks = self._all_candidates(itemset)
+        if excluded:
+            ranks = ranks[~np.isin(ranks, list(excluded))]
+        return ranks
+
+    def top_k_for_itemset(self, itemset, k, excluded=None):
+        # No máximo len(excluded) candidatos caem, então basta olhar o prefixo
+        ranks = self._all_candidates(itemset)[:k + len(excluded or ())]
+        return [r for r in ranks.tolist() if not excluded or r not in excluded][:k]
+
+
+class ProfileScorer:
+    """
+    Afinidade de um bloco de perfis com todos os itemsets do modelo.
+
+    A afinidade é a de score_itemsets do recomendador: tamanho da interseção
+    com o perfil, ponderada pelo suporte relativo quando há `supports`.
+    """
+
+    def __init__(self, itemsets, supports=None, n_rows=None):
+        self.itemsets = list(itemsets)
+        self.supports = supports
+        self.n_rows = n_rows
+        vocabulary = sorted({item for itemset in self.itemsets for item in itemset}, key=str)
+        self.item_code = {item: j for j, item in enumerate(vocabulary)}
+        self.matrix = np.zeros((len(vocabulary), len(self.itemsets)), dtype=np.float32)
+        for i, itemset in enumerate(self.itemsets):
+            self.matrix[[self.item_code[item] for item in itemset], i] = 1
+
+    def score_block(self, profiles):
+        """Lista, por perfil, dos itemsets relevantes ({'itemset', 'score'}) em ordem de afinidade."""
+        users = np.zeros((len(profiles), len(self.item_code)), dtype=np.float32)
+        for u, profile in enumerate(profiles):
+            codes = [self.item_code[item] for item in profile if item in self.item_code]
+            users[u, codes] = 1
+        counts = (users @ self.matrix).astype(np.int64)
+
+        relevant = []
+        for row in counts:
+            positions = np.flatnonzero(row)
+            scored = []
+            for i in positions.tolist():
+                score = int(row[i])
+                itemset = self.itemsets[i]
+                if self.supports is not None:
+                    score = round(score * self.supports[itemset] / self.n_rows, 6)
+                scored.append({'itemset': itemset, 'score': score})
+            scored.sort(key=lambda x: x['score'], reverse=True)
+            relevant.append(scored)
+        return relevant
+
+
+class BatchRecommender:
+    def __init__(self, store_dir, itemsets, supports=None, k_total=20, k_per_itemset=5):
+        self.store = TransactionStore(store_dir)
+        self.index = BatchIndex(self.store)
+        self.scorer = ProfileScorer(itemsets, supports, len(self.store))
+        self.supports = supports
+        self.k_total = k_total
+        self.k_per_itemset = k_per_itemset
+        self.cache = process_cache(model_version(self.scorer.itemsets, self.index.movie_ids))
+
+    def _record(self, score, rank, itemset):
+        row = int(self.index.order[rank])
+        year = int(self.store.years[row])
+        rating = float(self.store.ratings[row])
+        return {
+            'affinity': score,
+            'support': self.supports[itemset] if self.supports is not None else None,
+            'itemset': sorted(itemset),
+            'title': self.store.text('title', row),
+            'year': year if year >= 0 else None,
+            'rating_imdb': None if np.isnan(rating) else rating,
+            'director': self.store.text('director', row),
+        }
+
+    def recommend_block(self, users):
+        """
+        Args:
+            users (list): triplas (id do usuário, filmes, erro) de `iter_users`.
+
+        Returns:
+            list of dict: {'user', 'profile_size', 'recommendations'} por usuário,
+            ou {'user', 'error'} para as entradas com erro, na ordem de `users`.
+        """
+        valid = [(user, movies) for user, movies, error in users if error is None]
+        watch_lists = [read_watch_list(movies) for _, movies in valid]
+        relevant = iter(self.scorer.score_block([profile for profile, _ in watch_lists]))
+        watch_lists = iter(watch_lists)
+        results = []
+        for user, _, error in users:
+            if error is not None:
+                results.append({'user': user, 'error': error})
+                continue
+            profile, watched = next(watch_lists)
+            scored = next(relevant)
+            key = profile_key(profile, watched, self.k_total, self.k_per_itemset)
+            records = self.cache.get(key)
+            if records is None:
+                excluded = self.index.exclusion_mask(watched)
+                recommendations = self.index.iter_recommend(scored, excluded, self.k_total, self.k_per_itemset)
+                records = [self._record(score, rank, itemset) for score, _, rank, itemset in recommendations]
+                self.cache.put(key, records)
+            results.append({
+                'user': user,
+                'profile_size': len(profile),
+                'recommendations': records,
+            })
+        return results
+
+
+_worker = None
+
+
+def _init_worker(store_dir, itemsets, supports, k_total, k_per_itemset):
+    global _worker
+    _worker = BatchRecommender(store_dir, itemsets, supports, k_total, k_per_itemset)
+
+
+def _recommend_block(users):
+    return _worker.recommend_block(users)
+
+
+def _blocks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        block = list(islice(iterator, size))
+        if not block:
+            return
+        yield block
+
+
+def run_batch(store_dir, itemsets, supports, source, out, processes=None,
+              k_total=20, k_per_itemset=5, block_size=BLOCK_SIZE):
+    """
+    Recomenda para todos os usuários de `source` e escreve um resultado por linha em `out`.
+
+    Com processes=1 roda no próprio processo. A ordem de saída é a de término
+    dos blocos; use o campo "user".
+
+    Returns:
+        int: número de usuários processados.
+    """
+    args = (store_dir, itemsets, supports, k_total, k_per_itemset)
+    blocks = _blocks(iter_users(source), block_size)
+    if processes == 1:
+        _init_worker(*args)
+        return _write_results(map(_recommend_block, blocks), out)
+    with Pool(processes=processes, initializer=_init_worker, initargs=args) as pool:
+        return _write_results(pool.imap_unordered(_recommend_block, blocks), out)
+
+
+def _write_results(blocks, out):
+    total = 0
+    for block in blocks:
+        for result in block:
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            total += 1
+        out.flush()
+    return total
@@ -0,0 +1,183 @@
+import heapq
+import math
+from collections import defaultdict
+
+
+# CHARM: mineração de itemsets frequentes fechados (Zaki & Hsiao). Cada nó da
+# busca guarda um itemset e o seu tidset (bitmap em int do Python; o suporte
+# é o popcount). As quatro propriedades de tidsets do CHARM juntam itens que
+# ocorrem sempre juntos sem abrir novos ramos, e uma tabela hash indexada
+# pelo hash do tidset descarta os itemsets já contidos num fechado de mesmo
+# suporte. O suporte exato de cada fechado sai de graça da mineração.
+
+
+def _tid_bitmaps(transactions):
+    bits = defaultdict(int)
+    for tid, transaction in enumerate(transactions):
+        bit = 1 << tid
+        for item in transaction:
+            bits[item] |= bit
+    return bits
+
+
+def _store_bitmaps(store, min_count):
+    # Converte os bitmaps uint64 da base em disco para int, só dos itens frequentes
+    bitmaps = {}
+    for code, item in enumerate(store.items):
+        if store.support_count(code) >= min_count:
+            bitmap = store.bitmap(code)
+            if bitmap is None:
+                bitmap = store.rows_to_bitmap(store.tidset(code))
+            bitmaps[item] = int.from_bytes(bitmap.tobytes(), 'little')
+    return bitmaps
+
+
+def _charm(item_bitmaps, min_count, on_closed=None, descending=False):
+    # on_closed(itemset, suporte) é chamado a cada fechado encontrado e pode
+    # devolver um limiar maior, que passa a podar o restante da busca
+    threshold = min_count
+    closed = {}
+    subsumption = defaultdict(list)
+
+    def is_subsumed(itemset, tidset, support):
+        for other in subsumption[hash(tidset)]:
+            if closed[other] == support and itemset <= other:
+                return True
+        return False
+
+    def extend(nodes):
+        # nodes: lista de [itemset (set), tidset (int), suporte], ordenada por suporte
+        nonlocal threshold
+        i = 0
+        while i < len(nodes):
+            itemset, tidset, support = nodes[i]
+            if support < threshold:
+                i += 1
+                continue
+            children = []
+            j = i + 1
+            while j < len(nodes):
+                other_items, other_tids, other_support = nodes[j]
+                tids = tidset & other_tids
+                count = tids.bit_count()
+                if count < threshold:
+                    j += 1
+                    continue
+                if tids == tidset and tids == other_tids:
+                    # Mesmos tidsets: Xj nunca aparece sem Xi; Xj some e entra em Xi
+                    itemset |= other_items
+                    del nodes[j]
+                    continue
+                if tids == tidset:
+                    # t(Xi) contido em t(Xj): todo superconjunto de Xi também tem Xj
+                    itemset |= other_items
+                elif tids == other_tids:
+                    # t(Xj) contido em t(Xi): Xj só vale junto de Xi
+                    del nodes[j]
+                    children.append([other_items, tids, count])
+                    continue
+                else:
+                    children.append([other_items, tids, count])
+                j += 1
+            if children:
+                # Os filhos herdam o prefixo final de Xi (que pode ter crescido acima)
+                for child in children:
+                    child[0] = child[0] | itemset
+                children.sort(key=lambda node: node[2], reverse=descending)
+                extend(children)
+            frozen = frozenset(itemset)
+            if support >= threshold and not is_subsumed(frozen, tidset, support):
+                closed[frozen] = support
+                subsumption[hash(tidset)].append(frozen)
+                if on_closed is not None:
+                    threshold = max(threshold, on_closed(frozen, support))
+            i += 1
+
+    nodes = [[{item}, bitmap, bitmap.bit_count()] for item, bitmap in item_bitmaps.items()
+             if bitmap.bit_count() >= min_count]
+    nodes.sort(key=lambda node: (node[2], str(next(iter(node[0])))), reverse=descending)
+    extend(nodes)
+    return closed
+
+
+def charm(transactions, min_sup):
+    """
+    Itemsets frequentes fechados com os seus suportes.
+
+    Args:
+        transactions (list of set): transações.
+        min_sup (float): suporte mínimo relativo.
+
+    Returns:
+        dict: frozenset -> contagem de suporte (número de transações).
+    """
+    if not transactions:
+        return {}
+    min_count = max(1, math.ceil(min_sup * len(transactions)))
+    return _charm(_tid_bitmaps(transactions), min_count)
+
+
+def charm_store(store, min_sup):
+    """Como `charm`, lendo os tidsets de uma transaction_store.TransactionStore."""
+    if not len(store):
+        return {}
+    min_count = max(1, math.ceil(min_sup * len(store)))
+    return _charm(_store_bitmaps(store, min_count), min_count)
+
+
+def _top_k(item_bitmaps, k, min_length):
+    # Heap (mínimo) com os k maiores suportes entre os fechados de tamanho >= min_length.
+    # Com o heap cheio, o menor suporte dele vira o limiar da busca: nenhum itemset
+    # abaixo disso entra no resultado, e todas as suas extensões têm suporte menor ainda.
+    heap = []
+
+    def on_closed(itemset, support):
+        if len(itemset) >= min_length:
+            if len(heap) < k:
+                heapq.heappush(heap, support)
+            elif support > heap[0]:
+                heapq.heapreplace(heap, support)
+        return heap[0] if len(heap) == k else 1
+
+    # Do maior suporte para o menor: o heap enche cedo com suportes altos
+    closed = _charm(item_bitmaps, 1, on_closed, descending=True)
+    candidates = [(s, i) for i, s in closed.items() if len(i) >= min_length]
+    candidates.sort(key=lambda x: (-x[0], sorted(map(str, x[1]))))
+    return dict((i, s) for s, i in candidates[:k])
+
+
+def top_k_closed(transactions, k, min_length=1):
+    """
+    Os k itemsets fechados de maior suporte, sem suporte mínimo prévio.
+
+    O limiar começa em 1 e sobe conforme o heap de resultados enche, então a
+    busca se poda sozinha e o tamanho do modelo é sempre k.
+
+    Args:
+        transactions (list of set): transações.
+        k (int): quantidade de itemsets.
+        min_length (int): tamanho mínimo dos itemsets considerados.
+
+    Returns:
+        dict: frozenset -> contagem de suporte, com no máximo k entradas.
+    """
+    if not transactions or k <= 0:
+        return {}
+    return _top_k(_tid_bitmaps(transactions), k, min_length)
+
+
+def top_k_closed_store(store, k, min_length=1):
+    """Como `top_k_closed`, lendo os tidsets de uma transaction_store.TransactionStore."""
+    if not len(store) or k <= 0:
+        return {}
+    return _top_k(_store_bitmaps(store, 1), k, min_length)
+
+
+def maximal_from_closed(closed):
+    """Os maximais são os fechados sem superconjunto fechado (frequente)."""
+    by_size = sorted(closed, key=len, reverse=True)
+    maximal = []
+    for itemset in by_size:
+        if not any(itemset < other for other in maximal):
+            maximal.append(itemset)
+    return maximal
@@ -0,0 +1,27 @@
+import ast
+
+
+# Leitura das colunas de lista (genre, star, director) compartilhada pelo
+# recomendador interativo e pelo modo em lote, para que os dois montem o
+# mesmo perfil a partir do mesmo arquivo.
+
+
+#Interpreta uma string como uma lista de forma segura (ex: "[Drama, Action]" → ['Drama', 'Action']).
+#Evita o uso de eval por questões de segurança. Lida com erros comuns e retorna uma lista limpa.
+
+def safe_eval(x):
+    # Listas já decodificadas (ex: filmes vindos de JSON lines) passam direto
+    if isinstance(x, (list, tuple, set)):
+        return list(x)
+    try:
+        evaluated = ast.literal_eval(x)
+    except (ValueError, SyntaxError, TypeError):
+        if isinstance(x, str):
+            x_stripped = x.strip()
+            if x_stripped.startswith('[') and x_stripped.endswith(']'):
+                items = [item.strip().replace("'", "").replace('"', '') for item in x_stripped[1:-1].split(',')]
+                return [item for item in items if item]
+            elif '[' not in x and ']' not in x and x:
+                return [x.strip().replace("'", "").replace('"', '')]
+        return []
+    return list(evaluated) if isinstance(evaluated, (list, tuple, set)) else []
@@ -0,0 +1,287 @@
+import argparse
+import hashlib
+import random
+import time
+
+import numpy as np
+
+
+# Busca aproximada por similaridade de Jaccard entre itemsets de filmes
+# (MinHash + LSH por bandas). A recomendação exata só aceita filmes que contêm
+# todo o itemset; aqui um itemset (ou perfil) recupera os filmes de itemset
+# parecido, sem comparar com todos os filmes da base.
+#
+# Cada item vira um inteiro estável (hash do nome), e cada uma das `num_perm`
+# funções h(x) = (a x + b) mod P simula uma permutação dos itens. A assinatura
+# de um itemset é o mínimo de cada função sobre os seus itens; duas assinaturas
+# coincidem numa posição com probabilidade igual ao Jaccard dos itemsets.
+# As assinaturas são cortadas em `bands` bandas de `rows` posições; itemsets
+# com alguma banda idêntica caem no mesmo balde e viram candidatos, que são
+# então conferidos com o Jaccard exato.
+
+PRIME = (1 << 31) - 1
+EMPTY = PRIME  # assinatura de itemset vazio: maior que qualquer hash
+CHUNK_ROWS = 4096
+LOW_RECALL = 0.9  # abaixo disso o recall medido é avisado na saída
+
+
+def _item_hash(item):
+    digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % PRIME
+
+
+def choose_bands(num_perm, threshold):
+    """
+    (bands, rows) com bands * rows = num_perm: o de maior limiar aproximado
+    (1 / bands) ** (1 / rows) que ainda fica em ou abaixo de `threshold`, para
+    que pares com Jaccard >= threshold colidam com alta probabilidade. Se
+    nenhum ficar abaixo, o de menor limiar (uma posição por banda).
+    """
+    options = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    below = [br for br in options if (1 / br[0]) ** (1 / br[1]) <= threshold]
+    if not below:
+        return options[0]
+    return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1]))
+
+
+class MinHasher:
+    def __init__(self, num_perm=128, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, PRIME, size=num_perm, dtype=np.uint64)
+
+    def item_rows(self, items):
+        """Matriz (itens x num_perm) com os valores das funções de hash de cada item."""
+        hashes = np.fromiter((_item_hash(item) for item in items), dtype=np.uint64, count=len(items))
+        return ((hashes[:, None] * self.a + self.b) % np.uint64(PRIME)).astype(np.uint32)
+
+    def signature(self, itemset):
+        if not itemset:
+            return np.full(self.num_perm, EMPTY, dtype=np.uint32)
+        return self.item_rows(list(itemset)).min(axis=0)
+
+    def signatures_csr(self, item_rows, indptr, indices):
+        """
+        Assinaturas de todos os itemsets dados em formato CSR (os itens da linha r
+        são indices[indptr[r]:indptr[r + 1]], códigos de linhas de `item_rows`).
+        Processa blocos de linhas para limitar a memória intermediária.
+        """
+        n = len(indptr) - 1
+        signatures = np.full((n, self.num_perm), EMPTY, dtype=np.uint32)
+        for start in range(0, n, CHUNK_ROWS):
+            stop = min(n, start + CHUNK_ROWS)
+            lengths = np.diff(indptr[start:stop + 1])
+            filled = np.flatnonzero(lengths)
+            if not len(filled):
+                continue
+            codes = np.asarray(indices[indptr[start]:indptr[stop]])
+            offsets = (np.asarray(indptr[start:stop]) - indptr[start])[filled]
+            signatures[start + filled] = np.minimum.reduceat(item_rows[codes], offsets, axis=0)
+        return signatures
+
+
+def _band_keys(signatures, bands, rows):
+    # Hash polinomial (uint64, com estouro) das `rows` posições de cada banda
+    keys = np.zeros((len(signatures), bands), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for band in range(bands):
+            block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+            key = np.zeros(len(signatures), dtype=np.uint64)
+            for column in range(rows):
+                key = key * np.uint64(0x100000001B3) + block[:, column] + np.uint64(band)
+            keys[:, band] = key
+    return keys
+
+
+class LSHIndex:
+    """
+    Índice LSH por bandas sobre uma matriz de assinaturas.
+
+    Cada banda guarda as chaves ordenadas e a permutação das linhas; um balde é
+    um intervalo achado por busca binária, então a consulta custa
+    O(bands log n + tamanho dos baldes) em vez de O(n).
+    """
+
+    def __init__(self, signatures, bands):
+        self.bands = bands
+        self.rows = signatures.shape[1] // bands
+        keep = np.flatnonzero(signatures[:, 0] != EMPTY)
+        keys = _band_keys(signatures[keep], bands, self.rows)
+        self._order = []
+        self._keys = []
+        for band in range(bands):
+            order = np.argsort(keys[:, band], kind='stable')
+            self._order.append(keep[order])
+            self._keys.append(keys[order, band])
+
+    def candidates(self, signature):
+        """Linhas que dividem ao menos uma banda com a assinatura (crescentes, sem repetição)."""
+        if signature[0] == EMPTY:
+            return np.empty(0, dtype=np.int64)
+        keys = _band_keys(signature[None, :], self.bands, self.rows)[0]
+        found = []
+        for band, key in enumerate(keys):
+            left = np.searchsorted(self._keys[band], key, side='left')
+            right = np.searchsorted(self._keys[band], key, side='right')
+            if right > left:
+                found.append(self._order[band][left:right])
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+
+class NearestItemsets:
+    """
+    Vizinhos aproximados por Jaccard sobre os itemsets de uma base.
+
+    Os itemsets ficam em CSR (códigos de item por linha), e a conferência
+    exata dos candidatos é vetorizada: interseção por np.isin + soma por linha.
+
+    Args:
+        signatures: matriz de assinaturas, uma linha por linha da base.
+        hasher (MinHasher): o mesmo que gerou as assinaturas.
+        indptr, indices: itemsets em CSR.
+        codes (dict): item -> código usado em `indices`.
+        threshold (float): Jaccard a partir do qual os pares devem colidir (escolhe as bandas).
+    """
+
+    def __init__(self, signatures, hasher, indptr, indices, codes, threshold=0.5):
+        self.hasher = hasher
+        self.indptr = indptr
+        self.indices = indices
+        self.codes = codes
+        self.threshold = threshold
+        bands, _ = choose_bands(hasher.num_perm, threshold)
+        self.lsh = LSHIndex(signatures, bands)
+        self._filled = np.flatnonzero(np.diff(indptr))
+
+    @classmethod
+    def from_itemsets(cls, itemsets, num_perm=128, threshold=0.5, seed=1):
+        hasher = MinHasher(num_perm, seed)
+        vocabulary = sorted({item for itemset in itemsets for item in itemset}, key=str)
+        codes = {item: j for j, item in enumerate(vocabulary)}
+        indptr = np.zeros(len(itemsets) + 1, dtype=np.int64)
+        np.cumsum([len(itemset) for itemset in itemsets], out=indptr[1:])
+        indices = np.fromiter((codes[item] for itemset in itemsets for item in itemset),
+                              dtype=np.int64, count=int(indptr[-1]))
+        signatures = hasher.signatures_csr(hasher.item_rows(vocabulary), indptr, indices)
+        return cls(signatures, hasher, indptr, indices, codes, threshold)
+
+    @classmethod
+    def from_store(cls, store, num_perm=128, threshold=0.5, seed=1):
+        """Assinaturas direto do CSR da transaction_store.TransactionStore, sem montar os sets."""
+        hasher = MinHasher(num_perm, seed)
+        signatures = hasher.signatures_csr(hasher.item_rows(store.items), store.indptr, store.indices)
+        return cls(signatures, hasher, store.indptr, store.indices, store.codes, threshold)
+
+    def jaccard_rows(self, rows, itemset):
+        """Jaccard exato de `itemset` com cada linha (não vazia) de `rows`."""
+        if not len(rows):
+            return np.empty(0)
+        starts = np.asarray(self.indptr[rows], dtype=np.int64)
+        lengths = np.asarray(self.indptr[rows + 1], dtype=np.int64) - starts
+        offsets = np.zeros(len(rows), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+        # Posições de todos os itens das linhas, concatenadas
+        positions = np.arange(int(lengths.sum())) + np.repeat(starts - offsets, lengths)
+        query = np.fromiter((self.codes[item] for item in itemset if item in self.codes), dtype=np.int64)
+        shared = np.add.reduceat(np.isin(self.indices[positions], query), offsets)
+        return shared / (lengths + len(itemset) - shared)
+
+    def _select(self, rows, itemset, k, min_jaccard, exclude, tie_break):
+        itemset = set(itemset)
+        min_jaccard = self.threshold if min_jaccard is None else min_jaccard
+        similarity = self.jaccard_rows(rows, itemset)
+        keep = similarity >= min_jaccard
+        rows, similarity = rows[keep], similarity[keep]
+        hits = []
+        secondary = rows if tie_break is None else np.asarray(tie_break)[rows]
+        for i in np.lexsort((secondary, -similarity)).tolist():
+            if exclude is not None and exclude(int(rows[i])):
+                continue
+            hits.append((float(similarity[i]), int(rows[i])))
+            if len(hits) == k:
+                break
+        return hits
+
+    def nearest(self, itemset, k=None, min_jaccard=None, exclude=None, tie_break=None):
+        """
+        Linhas com Jaccard exato >= min_jaccard (padrão: o limiar do índice)
+        entre os candidatos do LSH.
+
+        Args:
+            exclude: função linha -> bool; linhas descartadas do resultado.
+            tie_break: chave por linha para desempatar Jaccards iguais (padrão: a linha).
+
+        Returns:
+            list of (float, int): (Jaccard, linha), do mais parecido para o menos.
+        """
+        rows = self.lsh.candidates(self.hasher.signature(itemset))
+        return self._select(rows, itemset, k, min_jaccard, exclude, tie_break)
+
+    def exact(self, itemset, k=None, min_jaccard=None, exclude=None, tie_break=None):
+        """Como `nearest`, mas varrendo todas as linhas (referência para o recall)."""
+        return self._select(self._filled, itemset, k, min_jaccard, exclude, tie_break)
+
+
+def benchmark(near, queries, min_jaccard=None):
+    """
+    Recall do LSH contra o Jaccard exato (varredura de todas as linhas).
+
+    Returns:
+        dict: 'recall' (fração dos pares exatos achados), 'exact_pairs',
+        'mean_candidates', 'lsh_seconds' e 'exact_seconds' (por consulta).
+    """
+    found = exact_pairs = candidates = 0
+    lsh_time = exact_time = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        approximate = {row for _, row in near.nearest(query, min_jaccard=min_jaccard)}
+        lsh_time += time.perf_counter() - start
+        candidates += len(near.lsh.candidates(near.hasher.signature(query)))
+
+        start = time.perf_counter()
+        exact = {row for _, row in near.exact(query, min_jaccard=min_jaccard)}
+        exact_time += time.perf_counter() - start
+
+        exact_pairs += len(exact)
+        found += len(exact & approximate)
+    n = max(1, len(queries))
+    return {
+        'recall': found / exact_pairs if exact_pairs else 1.0,
+        'exact_pairs': exact_pairs,
+        'mean_candidates': candidates / n,
+        'lsh_seconds': lsh_time / n,
+        'exact_seconds': exact_time / n,
+    }
+
+
+def main():
+    from transaction_store import TransactionStore
+
+    parser = argparse.ArgumentParser(description="Recall do MinHash/LSH contra o Jaccard exato numa base em disco.")
+    parser.add_argument("store", help="diretório da transaction_store")
+    parser.add_argument("--queries", type=int, default=200, help="itemsets de filmes sorteados como consulta")
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.3, 0.5, 0.7])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    store = TransactionStore(args.store)
+    rng = random.Random(args.seed)
+    queries = [s for s in (store.itemset(r) for r in rng.sample(range(len(store)), args.queries)) if s]
+    print(f"{len(store)} itemsets, {len(queries)} consultas, {args.num_perm} permutações")
+    for threshold in args.thresholds:
+        start = time.perf_counter()
+        near = NearestItemsets.from_store(store, args.num_perm, threshold, args.seed)
+        build = time.perf_counter() - start
+        result = benchmark(near, queries)
+        print(f"Jaccard >= {threshold:.2f} | bandas {near.lsh.bands}x{near.lsh.rows} | índice {build:.2f}s | "
+              f"recall {result['recall']:.3f} ({result['exact_pairs']} pares) | "
+              f"candidatos/consulta {result['mean_candidates']:.0f} | "
+              f"LSH {result['lsh_seconds'] * 1000:.2f} ms | exato {result['exact_seconds'] * 1000:.2f} ms")
+        if result['recall'] < LOW_RECALL:
+            print(f"  aviso: recall abaixo de {LOW_RECALL:.2f}; aumente --num-perm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import math
+from collections import defaultdict
+
+
+# Mineração com suporte mínimo por item (MIS, "multiple minimum supports").
+# Gêneros aparecem em milhares de filmes, enquanto um ator ou diretor quase
+# nunca chega a 1% da base: um limiar único ou perde os padrões de
+# ator/diretor, ou explode o reticulado dos gêneros. Aqui cada item tem o
+# seu MIS (por padrão, pelo tipo) e um itemset é frequente se o suporte
+# atingir o menor MIS entre os seus itens.
+#
+# Os itens viram códigos inteiros com o tipo nos bits altos
+# (código = tipo << TYPE_SHIFT | id local), então o tipo sai do código sem
+# consulta a tabela.
+
+GENRE, STAR, DIRECTOR = 0, 1, 2
+TYPE_NAMES = {GENRE: 'genre', STAR: 'star', DIRECTOR: 'director'}
+TYPE_SHIFT = 28
+_LOCAL_MASK = (1 << TYPE_SHIFT) - 1
+
+DEFAULT_TYPE_MIN_SUPPORT = {GENRE: 0.01, STAR: 0.0005, DIRECTOR: 0.0005}
+
+
+def item_type(code):
+    return code >> TYPE_SHIFT
+
+
+class ItemEncoder:
+    """Vocabulário (tipo, nome) <-> código inteiro com o tipo embutido."""
+
+    def __init__(self):
+        self._codes = {}
+        self._names = defaultdict(list)
+
+    def encode(self, kind, name):
+        key = (kind, name)
+        code = self._codes.get(key)
+        if code is None:
+            names = self._names[kind]
+            code = (kind << TYPE_SHIFT) | len(names)
+            names.append(name)
+            self._codes[key] = code
+        return code
+
+    def decode(self, code):
+        """Nome do item; o tipo é `item_type(code)`."""
+        return self._names[item_type(code)][code & _LOCAL_MASK]
+
+    def decode_itemset(self, codes):
+        return {self.decode(c) for c in codes}
+
+
+def encode_transactions(genres, stars, directors, encoder=None):
+    """
+    Monta as transações com códigos tipados.
+
+    Args:
+        genres, stars, directors (list of list): listas por linha (as colunas
+            Gêneros_list, Stars_list e Directors_list de process_itemset_columns).
+
+    Returns:
+        tuple: (encoder, list of set de códigos).
+    """
+    encoder = encoder or ItemEncoder()
+    transactions = []
+    for row in zip(genres, stars, directors):
+        codes = set()
+        for kind, names in zip((GENRE, STAR, DIRECTOR), row):
+            for name in names or []:
+                codes.add(encoder.encode(kind, name))
+        transactions.append(codes)
+    return encoder, transactions
+
+
+def mis_eclat(transactions, type_min_support=None, item_min_support=None):
+    """
+    Itemsets frequentes sob MIS, com os seus suportes.
+
+    Os itens são ordenados por MIS crescente. Um itemset cujo primeiro item
+    (o de menor MIS) é i precisa de suporte >= MIS(i); dentro da classe de
+    prefixo i o limiar é fixo e o Eclat poda normalmente. Itens de MIS maior
+    entram na classe de i se tiverem suporte >= MIS(i), mesmo sem atingir o
+    próprio MIS.
+
+    Args:
+        transactions (list of set): transações com códigos de `encode_transactions`.
+        type_min_support (dict): tipo -> suporte mínimo relativo.
+        item_min_support (dict): código -> suporte mínimo relativo (sobrepõe o do tipo).
+
+    Returns:
+        dict: frozenset de códigos -> contagem de suporte.
+    """
+    n = len(transactions)
+    if not n:
+        return {}
+    type_min_support = {**DEFAULT_TYPE_MIN_SUPPORT, **(type_min_support or {})}
+    item_min_support = item_min_support or {}
+
+    tidsets = defaultdict(int)
+    for tid, transaction in enumerate(transactions):
+        bit = 1 << tid
+        for code in transaction:
+            tidsets[code] |= bit
+
+    def min_count(code):
+        mis = item_min_support.get(code, type_min_support[item_type(code)])
+        return max(1, math.ceil(mis * n))
+
+    items = sorted(((min_count(c), c, t, t.bit_count()) for c, t in tidsets.items()))
+    frequent = {}
+
+    def extend(prefix, prefix_tids, tail, threshold):
+        for k, (code, tids) in enumerate(tail):
+            new_tids = prefix_tids & tids
+            count = new_tids.bit_count()
+            if count >= threshold:
+                itemset = prefix | {code}
+                frequent[itemset] = count
+                extend(itemset, new_tids, tail[k + 1:], threshold)
+
+    for i, (threshold, code, tids, count) in enumerate(items):
+        if count < threshold:
+            continue
+        frequent[frozenset((code,))] = count
+        tail = [(c, t) for _, c, t, cnt in items[i + 1:] if cnt >= threshold]
+        extend(frozenset((code,)), tids, tail, threshold)
+    return frequent
+
+
+def maximal_itemsets(frequent):
+    """Filtra os itemsets sem superconjunto frequente, mantendo os suportes."""
+    maximal = {}
+    for itemset in sorted(frequent, key=len, reverse=True):
+        if not any(itemset < other for other in maximal):
+            maximal[itemset] = frequent[itemset]
+    return maximal
+
+
+def decode_supports(encoder, supports):
+    """Troca os códigos pelos nomes dos itens: frozenset de nomes -> suporte."""
+    return {frozenset(encoder.decode_itemset(codes)): count for codes, count in supports.items()}
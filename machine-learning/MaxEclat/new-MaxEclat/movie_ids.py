@@ -0,0 +1,32 @@
+import hashlib
+import math
+
+
+# Identificadores inteiros estáveis para os filmes: hash de 64 bits do título
+# normalizado + ano. O mesmo filme tem o mesmo id na base principal e nos
+# arquivos de usuário, e filmes homônimos de anos diferentes não colidem.
+
+
+def normalize_title(title):
+    return str(title).strip().lower()
+
+
+def normalize_year(year):
+    # A base principal lê o ano como int (ou float, se houver NaN); o arquivo
+    # do usuário, como str. "1977", 1977 e 1977.0 viram todos "1977".
+    if year is None or (isinstance(year, float) and math.isnan(year)):
+        return ""
+    text = str(year).strip()
+    try:
+        return str(int(float(text)))
+    except ValueError:
+        return text
+
+
+def movie_id(title, year):
+    key = f"{normalize_title(title)}\x1f{normalize_year(year)}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def movie_ids(titles, years):
+    return [movie_id(t, y) for t, y in zip(titles, years)]
@@ -1,31 +1,36 @@
+import argparse
+import contextlib
+import os
+import sys
 import pandas as pd
-import ast
 from tabulate import tabulate 
 import textwrap
 import squarify
 from collections import Counter
 import matplotlib.pyplot as plt
 
-
-#Interpreta uma string como uma lista de forma segura (ex: "[Drama, Action]" → ['Drama', 'Action']). 
-#Evita o uso de eval por questões de segurança. Lida com erros comuns e retorna uma lista limpa.
-
-def safe_eval(x):
-    try:
-        evaluated = ast.literal_eval(x)
-        return evaluated
-    except (ValueError, SyntaxError, TypeError):
-        if isinstance(x, str):
-            x_stripped = x.strip()
-            if x_stripped.startswith('[') and x_stripped.endswith(']'):
-                try:
-                    items = [item.strip().replace("'", "").replace('"', '') for item in x_stripped[1:-1].split(',')]
-                    return [item for item in items if item]
-                except Exception:
-                    return []
-            elif '[' not in x and ']' not in x and x:
-                return [x.strip().replace("'", "").replace('"', '')]
-        return []
+from batch_recommend import run_batch
+from charm import charm, charm_store, maximal_from_closed, top_k_closed, top_k_closed_store
+from minhash_lsh import LOW_RECALL, NearestItemsets, benchmark
+from mis_eclat import (DIRECTOR, GENRE, STAR, decode_supports, encode_transactions, mis_eclat,
+                       maximal_itemsets as maximal_itemsets_mis)
+from list_parsing import safe_eval
+from movie_ids import movie_ids
+from recommendation_cache import model_version, process_cache, profile_key
+from recommendation_output import WRITERS
+from rules import RuleIndex, generate_rules
+from sampling import closed_frequent, maximal_frequent, toivonen, toivonen_store
+from topk import RatingIndex
+from transaction_store import StoreRatingIndex, TransactionStore, build_store, max_eclat_store
+
+MAX_TOTAL_RECOMMENDATIONS = 20
+MAX_RECS_PER_ITEMSET = 5
+MAX_RULES_SHOWN = 10
+MAX_NEAR_ITEMSETS = 3
+MIN_SUPPORT = 0.01
+TYPE_MIN_SUPPORT = {STAR: 0.0005, DIRECTOR: 0.0005}
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_DB_PATH = os.path.join(BASE_DIR, 'world_imdb_movies_preprocessed.csv')
 
 
 # Calcula o suporte, sera usado para comparação com o suporte mínimo definido.
@@ -71,12 +76,6 @@ def max_eclat(transactions, min_sup):
             truly_maximal_itemsets.append(collected_itemsets[i])
     return truly_maximal_itemsets
 
-# Agora  ele acessa a base de dados e retorna todos os filmes que possuem todos os elementos do itemset para posterior 
-# possisvel recomendação.
-
-def get_movies_with_itemset(df, itemset):
-    return df[df['Itemset'].apply(lambda s: itemset.issubset(s))]
-
 #Cria o perfil do usuário a partir dos filmes assistidos,
 
 def get_user_profile(df):
@@ -95,11 +94,11 @@ def process_itemset_columns(df):
     df['Directors_list'] = df['director'].apply(safe_eval)
     
     df['Itemset'] = df.apply(lambda row: set(row.Gêneros_list or []) | set(row.Stars_list or []) | set(row.Directors_list or []), axis=1)
-    df['title_normalized'] = df['title'].astype(str).str.strip().str.lower()
+    df['movie_id'] = movie_ids(df['title'].tolist(), df['year'].tolist())
 
 # Visualização 
 
-def plot_itemset_treemap(relevant_itemsets):
+def plot_itemset_treemap(relevant_itemsets, charts_dir):
     item_counter = Counter()
     for info in relevant_itemsets:
         item_counter.update(info['itemset'])
@@ -111,24 +110,23 @@ def plot_itemset_treemap(relevant_itemsets):
     squarify.plot(sizes=sizes, label=labels, alpha=0.8)
     plt.axis('off')
     plt.title("Composição dos conjuntos frequentes recomendados")
-    caminho_grafico = '/home/eduardo-monteiro/faculdade/IA/Repository-AI/graficos_imdb/composicao_conjuntos.png'
+    caminho_grafico = os.path.join(charts_dir, 'composicao_conjuntos.png')
     plt.savefig(caminho_grafico, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"Gráfico 'Composição dos Conjuntos' salvo como '{caminho_grafico}'")
 
 
-def plot_affinity_vs_rating(relevant_itemsets, df, user_titles):
+# Usa as estatísticas de candidatos coletadas durante a recomendação
+# (TopKMerge.iter_recommend com `stats`), sem buscar os candidatos de novo.
+
+def plot_affinity_vs_rating(stats, charts_dir):
     affinities = []
     avg_ratings = []
 
-    for info in relevant_itemsets:
-        itemset = info['itemset']
-        candidates_df = get_movies_with_itemset(df, itemset)
-        new_recs = candidates_df[~candidates_df['title_normalized'].isin(user_titles)]
-
-        if not new_recs.empty:
+    for info in stats.values():
+        if info['count']:
             affinities.append(info['score'])
-            avg_ratings.append(new_recs['rating_imdb'].mean())
+            avg_ratings.append(info['mean_rating'])
 
     plt.figure(figsize=(8, 5))
     plt.scatter(affinities, avg_ratings, alpha=0.7)
@@ -137,35 +135,276 @@ def plot_affinity_vs_rating(relevant_itemsets, df, user_titles):
     plt.title("Afinidade vs Qualidade das Recomendações")
     plt.grid(True)
     plt.tight_layout()
-    caminho_grafico = '/home/eduardo-monteiro/faculdade/IA/Repository-AI/graficos_imdb/afinidade_vs_rating.png'
+    caminho_grafico = os.path.join(charts_dir, 'afinidade_vs_rating.png')
     plt.savefig(caminho_grafico, dpi=300, bbox_inches='tight')
     plt.close()
     print(f"\nGráfico 'Afinidade vs Rating' salvo como '{caminho_grafico}'\n")
 
 
-def main():
-    try:
-        main_db_path = '/home/eduardo-monteiro/faculdade/IA/Repository-AI/machine-learning/MaxEclat/new-MaxEclat/world_imdb_movies_preprocessed.csv'
-        df = pd.read_csv(main_db_path)
-    except Exception as e:
-        print(f"Erro ao carregar a base principal: {e}")
-        return
+# Pontua os itemsets pela interseção com o perfil e combina os top-k de cada um.
+# O histórico do usuário é resolvido para ids uma única vez; a exclusão é um AND-NOT de bitmaps.
+
+# Com `supports` (modo fechado), a afinidade é ponderada pelo suporte relativo do itemset.
 
+def score_itemsets(maximal_itemsets, user_profile, supports=None, n_rows=None):
+    relevant_itemsets = []
+    for itemset in maximal_itemsets:
+        score = len(user_profile.intersection(itemset))
+        if score > 0:
+            if supports is not None:
+                score = round(score * supports[itemset] / n_rows, 6)
+            relevant_itemsets.append({'itemset': itemset, 'score': score})
+    relevant_itemsets.sort(key=lambda x: x['score'], reverse=True)
+    return relevant_itemsets
+
+
+# Recomendações de um perfil, em fluxo: devolve os itemsets relevantes e um
+# gerador que produz as recomendações (score, rating, rank, itemset) itemset a
+# itemset, na ordem de afinidade. O cache guarda a lista já produzida quando o
+# gerador termina; num acerto ela é apenas repetida. Com `stats` (dict), as
+# estatísticas dos candidatos de cada itemset relevante são coletadas junto,
+# para os gráficos.
+
+def stream_for_profile(index, maximal_itemsets, user_profile, user_ids, supports=None, cache=None, stats=None,
+                       k_total=MAX_TOTAL_RECOMMENDATIONS, k_per_itemset=MAX_RECS_PER_ITEMSET):
+    key = profile_key(user_profile, user_ids)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None and (stats is None or cached[3] is not None):
+        relevant_itemsets, recommendations, cached_stats = cached[0], cached[2], cached[3]
+        if stats is not None:
+            stats.update(cached_stats)
+        return relevant_itemsets, iter(recommendations)
+
+    relevant_itemsets = score_itemsets(maximal_itemsets, user_profile, supports, len(index.order))
+    excluded = index.exclusion_mask(user_ids)
+
+    def generate():
+        recommendations = []
+        for recommendation in index.iter_recommend(relevant_itemsets, excluded, k_total, k_per_itemset, stats):
+            recommendations.append(recommendation)
+            yield recommendation
+        if cache is not None:
+            cache.put(key, (relevant_itemsets, excluded, recommendations, None if stats is None else dict(stats)))
+    return relevant_itemsets, generate()
+
+
+# Filmes quase correspondentes: a recomendação exata só aceita filmes que contêm
+# todo o itemset; aqui os itemsets mais afins buscam, por MinHash/LSH, filmes de
+# itemset parecido (Jaccard >= limiar) sem varrer a base. O índice LSH é
+# montado sobre as linhas da base; `rank_of` converte linha em rank do índice
+# (e desempata Jaccards iguais pelo rating).
+
+def build_near_index(index, min_jaccard):
+    if isinstance(index, StoreRatingIndex):
+        return NearestItemsets.from_store(index.store, threshold=min_jaccard), index.rank_of
+    # RatingIndex guarda os itemsets já na ordem dos ranks
+    return NearestItemsets.from_itemsets(index.itemsets, threshold=min_jaccard), None
+
+
+def print_near_matches(near, rank_of, index, describe, relevant_itemsets, watched_ids,
+                       k=MAX_RECS_PER_ITEMSET):
+    to_rank = (lambda row: row) if rank_of is None else (lambda row: int(rank_of[row]))
+    print("\n🔎 === Quase lá: filmes parecidos com os conjuntos mais afins ===")
+    for info in relevant_itemsets:
+        itemset = set(info['itemset'])
+
+        # Fora os assistidos e os que contêm o itemset inteiro (já cobertos pela busca exata)
+        def exclude(row):
+            rank = to_rank(row)
+            return index.movie_ids[rank] in watched_ids or itemset <= describe(index.order[rank])[4]
+
+        table = []
+        for similarity, row in near.nearest(itemset, k, exclude=exclude, tie_break=rank_of):
+            title, year, rating, director, row_itemset = describe(index.order[to_rank(row)])
+            table.append([title, year, rating, f"{similarity:.2f}", textwrap.fill(', '.join(sorted(row_itemset)), width=55)])
+        print(f"\n🔸 Itens do conjunto: {', '.join(sorted(itemset))}")
+        print(tabulate(
+            table,
+            headers=['title', 'year', 'rating_imdb', 'jaccard', 'Itemset'],
+            tablefmt='psql'
+        ) if table else "Nenhum filme parecido encontrado.")
+
+    # Recall do LSH nestas consultas contra a varredura exata; só aparece quando baixo
+    recall = benchmark(near, [set(info['itemset']) for info in relevant_itemsets])['recall']
+    if recall < LOW_RECALL:
+        print(f"\n⚠️ O LSH achou só {recall:.0%} dos filmes com Jaccard >= {near.threshold:.2f}; "
+              "alguns filmes parecidos podem ter ficado de fora.")
+
+
+# Converte as recomendações em registros para os writers de recommendation_output.
+
+def iter_records(recommendations, index, describe, supports=None):
+    for score, rating, rank, itemset in recommendations:
+        title, year, rating_imdb, director, row_itemset = describe(index.order[rank])
+        yield {
+            'affinity': score,
+            'support': supports[itemset] if supports is not None else None,
+            'itemset': sorted(itemset),
+            'title': title,
+            'year': year,
+            'rating_imdb': rating_imdb,
+            'director': director,
+            'movie_itemset': sorted(row_itemset),
+        }
+
+
+# Lê a base principal em blocos e gera as linhas no formato de build_store,
+# sem manter o CSV inteiro em memória.
+
+def iter_csv_rows(path, chunksize=50_000):
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        process_itemset_columns(chunk)
+        yield from zip(chunk['Itemset'], chunk['title'], chunk['year'], chunk['rating_imdb'],
+                       chunk['movie_id'], chunk['director'])
+
+
+# Abre a base em disco (memória mapeada), construindo-a a partir do CSV na primeira vez.
+
+def open_store(store_dir, csv_path=MAIN_DB_PATH):
+    if os.path.exists(os.path.join(store_dir, 'meta.json')):
+        return TransactionStore(store_dir)
+    print(f"\n📦 Construindo a base em disco em '{store_dir}'...")
+    return build_store(store_dir, iter_csv_rows(csv_path))
+
+
+# Minera os itemsets do modelo a partir de uma lista de transações ou de uma
+# TransactionStore. Retorna (itemsets, suportes); os suportes vêm nos modos em
+# que a própria mineração os calcula (fechados, top-k fechados) e são None no
+# modo maximal. Com `top_k`, não há suporte mínimo: são os k fechados de maior
+# suporte (de tamanho >= min_length), e no modo maximal os maximais entre eles.
+# Com `sample`, minera numa amostra dessa fração e confere tudo numa passada exata (Toivonen).
+
+def mine_itemsets(source, mode='maximal', min_support=MIN_SUPPORT, top_k=None, min_length=1, sample=None):
+    on_store = isinstance(source, TransactionStore)
+    if sample and not top_k:
+        print(f"\n🔍 Calculando conjuntos frequentes numa amostra de {sample:.0%} das transações...")
+        result = (toivonen_store if on_store else toivonen)(source, min_support, sample)
+        if not result['exact']:
+            print(f"⚠️ {len(result['misses'])} conjuntos da borda negativa são frequentes na base completa; "
+                  "o resultado pode estar incompleto (aumente a amostra). Exemplos: "
+                  + "; ".join(', '.join(sorted(m)) for m in result['misses'][:5]))
+        if mode == 'closed':
+            closed = closed_frequent(result['frequent'])
+            return list(closed), closed
+        return [set(s) for s in maximal_frequent(result['frequent'])], None
+    if top_k:
+        print(f"\n🔍 Calculando os {top_k} conjuntos fechados de maior suporte (top-k)...")
+        closed = (top_k_closed_store if on_store else top_k_closed)(source, top_k, min_length)
+        if mode == 'closed':
+            return list(closed), closed
+        return [set(s) for s in maximal_from_closed(closed)], None
+    if mode == 'closed':
+        print("\n🔍 Calculando conjuntos frequentes fechados com CHARM...")
+        closed = (charm_store if on_store else charm)(source, min_support)
+        return list(closed), closed
+    print("\n🔍 Calculando conjuntos frequentes maximais com MaxEclat...")
+    return (max_eclat_store if on_store else max_eclat)(source, min_support), None
+
+
+# As regras precisam do conjunto completo de fechados frequentes: com --top-k ou
+# --sample os fechados exibidos podem não incluir o fecho de um subconjunto, e o
+# suporte dele sairia subestimado. Nesses casos os fechados das regras são
+# minerados à parte com CHARM, sobre a mesma base do índice.
+
+def rule_closed_itemsets(index, supports, top_k=None, sample=None, min_support=MIN_SUPPORT):
+    if not top_k and not sample:
+        return supports
+    print("\n🔍 Calculando os fechados completos (CHARM) para as regras...")
+    if isinstance(index, StoreRatingIndex):
+        return charm_store(index.store, min_support)
+    return charm(index.itemsets, min_support)
+
+
+# Carrega o modelo: índice de recomendação, itemsets, suportes (ver mine_itemsets;
+# o modo 'mis' também os devolve) e uma função que descreve uma linha da base
+# para exibição. Com `store_dir`, tudo vem da base em disco; sem ela, do CSV
+# carregado num DataFrame.
+
+def load_model(store_dir=None, mode='maximal', min_support=MIN_SUPPORT, top_k=None, min_length=1, sample=None):
+    if store_dir:
+        if mode == 'mis':
+            raise ValueError("o modo 'mis' precisa dos tipos dos itens e só funciona a partir do CSV")
+        store = open_store(store_dir)
+        maximal_itemsets, supports = mine_itemsets(store, mode, min_support, top_k, min_length, sample)
+        index = StoreRatingIndex(store)
+
+        def describe(row):
+            year = int(store.years[row])
+            return [store.text('title', row), year if year >= 0 else '', float(store.ratings[row]),
+                    store.text('director', row), store.itemset(row)]
+        return index, maximal_itemsets, supports, describe
+
+    df = pd.read_csv(MAIN_DB_PATH)
     required_cols = {'genre', 'title', 'director', 'star'}
     if not required_cols.issubset(df.columns):
-        print(f"Erro: A base principal precisa conter as colunas: {required_cols}")
-        return
+        raise ValueError(f"A base principal precisa conter as colunas: {required_cols}")
 
     process_itemset_columns(df)
-    transactions = df['Itemset'].tolist()
-    
-    min_support = 0.01
-    print("\n🔍 Calculando conjuntos frequentes maximais com MaxEclat...")
-    maximal_itemsets_global = max_eclat(transactions, min_support)
+
+    if mode == 'mis':
+        if top_k is not None or sample is not None:
+            raise ValueError("o modo 'mis' usa suporte mínimo por tipo; não aceita top-k nem amostra")
+        # Suporte mínimo por tipo: gêneros com `min_support`, atores e diretores bem abaixo
+        print("\n🔍 Calculando conjuntos frequentes maximais com suporte mínimo por tipo...")
+        encoder, typed_transactions = encode_transactions(
+            df['Gêneros_list'], df['Stars_list'], df['Directors_list']
+        )
+        frequent = mis_eclat(typed_transactions, {**TYPE_MIN_SUPPORT, GENRE: min_support})
+        supports = decode_supports(encoder, maximal_itemsets_mis(frequent))
+        maximal_itemsets = list(supports)
+    else:
+        maximal_itemsets, supports = mine_itemsets(
+            df['Itemset'].tolist(), mode, min_support, top_k, min_length, sample
+        )
+    index = RatingIndex.from_dataframe(df)
+
+    def describe(row):
+        return [df.at[row, 'title'], df.at[row, 'year'], df.at[row, 'rating_imdb'],
+                df.at[row, 'director'], df.at[row, 'Itemset']]
+    return index, maximal_itemsets, supports, describe
+
+
+def main(store_dir=None, mode='maximal', top_k=None, min_length=1, sample=None, min_confidence=None,
+         output_format='table', output=None, charts_dir=None, user_file=None, near_jaccard=None, cache_file=None):
+    # Fora do formato tabela, as mensagens vão para stderr e a saída fica só com os registros
+    with contextlib.ExitStack() as stack:
+        out = sys.stdout if output in (None, '-') else stack.enter_context(open(output, 'w', newline='', encoding='utf-8'))
+        if output_format != 'table':
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        recommend(store_dir, mode, top_k, min_length, sample, min_confidence, output_format, out, charts_dir,
+                  user_file, near_jaccard, cache_file)
+
+
+def recommend(store_dir, mode, top_k, min_length, sample, min_confidence, output_format, out, charts_dir,
+              user_file=None, near_jaccard=None, cache_file=None):
+    try:
+        index, maximal_itemsets_global, supports, describe = load_model(
+            store_dir, mode, top_k=top_k, min_length=min_length, sample=sample
+        )
+    except Exception as e:
+        print(f"Erro ao carregar a base principal: {e}")
+        return
     print(f"✅ {len(maximal_itemsets_global)} conjuntos frequentes encontrados.\n")
 
-    user_file = input("📂 Digite o nome do arquivo CSV dos seus filmes assistidos ou o path caso o arquivo esteja em outro diretorio:\n> ")
-    user_path = '/home/eduardo-monteiro/faculdade/IA/Repository-AI/machine-learning/MaxEclat/new-MaxEclat/' + user_file
+    # Top-k sobre listas invertidas em ordem de rating; resultados no cache do processo,
+    # persistido em `cache_file` entre execuções (um usuário por execução)
+    cache = process_cache(model_version(maximal_itemsets_global, index.movie_ids))
+    if cache_file:
+        cache.load(cache_file)
+
+    # Regras só a partir de fechados: os suportes dos subconjuntos saem deles sem recontagem
+    rule_index = None
+    if min_confidence is not None:
+        if mode != 'closed':
+            print("⚠️ Regras de associação precisam dos itemsets fechados (--mode closed); ignorando --rules.")
+        else:
+            closed = rule_closed_itemsets(index, supports, top_k, sample)
+            rule_index = RuleIndex(generate_rules(closed, len(index.order), min_confidence))
+            print(f"📐 {len(rule_index.rules)} regras com confiança >= {min_confidence:.0%}.\n")
+
+    if user_file is None:
+        user_file = input("📂 Digite o nome do arquivo CSV dos seus filmes assistidos ou o path caso o arquivo esteja em outro diretorio:\n> ")
+    user_path = user_file if os.path.exists(user_file) else os.path.join(BASE_DIR, user_file)
 
     try:
         colunas_user = ['title', 'year', 'rating_imdb', 'genre', 'language', 'star', 'director']
@@ -175,7 +414,7 @@ def main():
         print(f"❌ Erro ao carregar os dados do usuário: {e}")
         return
 
-    user_titles = set(user_df['title_normalized'])
+    user_ids = user_df['movie_id'].tolist()
     user_profile = get_user_profile(user_df)
 
     if not user_profile:
@@ -187,53 +426,97 @@ def main():
     print("------------------------------------------------------------")
     print("🎯 === Recomendações Personalizadas ===")
 
-    relevant_itemsets = []
-    for itemset in maximal_itemsets_global:
-        score = len(user_profile.intersection(itemset))
-        if score > 0:
-            relevant_itemsets.append({'itemset': itemset, 'score': score})
+    # Estatísticas de candidatos só quando há gráficos a gerar
+    stats = {} if charts_dir else None
+    relevant_itemsets, recommendations = stream_for_profile(
+        index, maximal_itemsets_global, user_profile, user_ids, supports, cache, stats
+    )
 
     if not relevant_itemsets:
         print("⚠️ Nenhum conjunto relevante encontrado.")
         return
 
-    relevant_itemsets.sort(key=lambda x: x['score'], reverse=True)
-
-    MAX_TOTAL_RECOMMENDATIONS = 20
-    MAX_RECS_PER_ITEMSET = 5
-    count = 0
+    written = WRITERS[output_format](iter_records(recommendations, index, describe, supports), out)
 
-    for info in relevant_itemsets:
-        if count >= MAX_TOTAL_RECOMMENDATIONS:
-            break
-        itemset = info['itemset']
-        print(f"\n🔹 Afinidade: {info['score']} | Itens do conjunto: {', '.join(sorted(itemset))}")
-        print("------------------------------------------------------------")
-        candidates_df = get_movies_with_itemset(df, itemset)
-        new_recs = candidates_df[~candidates_df['title_normalized'].isin(user_titles)]
-
-        if not new_recs.empty:
-            top_recs = new_recs.sort_values(by='rating_imdb', ascending=False).head(MAX_RECS_PER_ITEMSET)
-            top_recs['Itemset'] = top_recs['Itemset'].apply(
-                lambda x: textwrap.fill(', '.join(sorted(x)), width=55) if isinstance(x, set) else str(x)
-            )
-            print(tabulate(
-                top_recs[['title', 'year', 'rating_imdb', 'director','Itemset']],
-                headers='keys',
-                tablefmt='psql',
-                showindex=False
-            ))
-            count += len(top_recs)
-        else:
-            print("🔸 Nenhuma nova recomendação encontrada para este conjunto.")
-
-    if count == 0:
+    if not written:
         print("\n🚫 Nenhuma recomendação disponível.")
-
-    plot_itemset_treemap(relevant_itemsets)
-    plot_affinity_vs_rating(relevant_itemsets, df, user_titles)
-
+    if cache_file:
+        cache.save(cache_file)
+
+    if rule_index is not None:
+        fired = rule_index.fire(user_profile)[:MAX_RULES_SHOWN]
+        print("\n📐 === Quem gosta de ... também gosta de ... ===")
+        print(tabulate(
+            [[', '.join(sorted(r['antecedent'])), ', '.join(sorted(r['consequent'])),
+              f"{r['confidence']:.2f}", f"{r['lift']:.2f}", f"{r['conviction']:.2f}"] for r in fired],
+            headers=['se gosta de', 'também gosta de', 'confiança', 'lift', 'convicção'],
+            tablefmt='psql'
+        ) if fired else "🔸 Nenhuma regra disparada pelo seu perfil.")
+
+    if near_jaccard is not None:
+        near, rank_of = build_near_index(index, near_jaccard)
+        print_near_matches(near, rank_of, index, describe, relevant_itemsets[:MAX_NEAR_ITEMSETS], set(user_ids))
+
+    # Pós-processamento opcional: os gráficos reaproveitam os candidatos já buscados
+    if charts_dir:
+        os.makedirs(charts_dir, exist_ok=True)
+        plot_itemset_treemap(relevant_itemsets, charts_dir)
+        plot_affinity_vs_rating(stats, charts_dir)
+
+
+# Modo lote: minera o modelo uma vez e recomenda para todos os usuários de
+# `source` em processos paralelos sobre a base em disco (ver batch_recommend).
+
+def main_batch(store_dir, source, output=None, mode='maximal', top_k=None, min_length=1, sample=None,
+               processes=None, k_total=MAX_TOTAL_RECOMMENDATIONS, k_per_itemset=MAX_RECS_PER_ITEMSET):
+    if mode == 'mis':
+        raise ValueError("o modo lote lê o modelo da base em disco; o modo 'mis' só funciona a partir do CSV")
+    # A saída padrão fica só com os resultados
+    with contextlib.redirect_stdout(sys.stderr):
+        store = open_store(store_dir)
+        itemsets, supports = mine_itemsets(store, mode, MIN_SUPPORT, top_k, min_length, sample)
+        print(f"✅ {len(itemsets)} conjuntos frequentes encontrados.")
+    with contextlib.ExitStack() as stack:
+        out = sys.stdout if output in (None, '-') else stack.enter_context(open(output, 'w', encoding='utf-8'))
+        total = run_batch(store_dir, itemsets, supports, source, out, processes, k_total, k_per_itemset)
+    print(f"📤 Recomendações geradas para {total} usuários.", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Recomendação de filmes com MaxEclat.")
+    parser.add_argument("--store", help="diretório da base em disco (memória mapeada); criado a partir do CSV se não existir")
+    parser.add_argument("--mode", choices=["maximal", "closed", "mis"], default="maximal",
+                        help="itemsets maximais (MaxEclat), fechados com suporte (CHARM) "
+                             "ou maximais com suporte mínimo por tipo de item (MIS)")
+    parser.add_argument("--top-k", type=int, help="sem suporte mínimo: usa os K itemsets fechados de maior suporte")
+    parser.add_argument("--min-length", type=int, default=1, help="tamanho mínimo dos itemsets no modo --top-k")
+    parser.add_argument("--sample", type=float, help="minera numa amostra desta fração (ex.: 0.1) e verifica na base completa")
+    parser.add_argument("--rules", type=float, metavar="MIN_CONFIDENCE",
+                        help="gera regras de associação com esta confiança mínima (requer --mode closed)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="table",
+                        help="formato da saída das recomendações, escritas à medida que são encontradas")
+    parser.add_argument("--output", help="arquivo de saída das recomendações (padrão: saída padrão)")
+    parser.add_argument("--charts", metavar="DIR", help="gera os gráficos neste diretório depois das recomendações")
+    parser.add_argument("--near", type=float, metavar="MIN_JACCARD",
+                        help="mostra também filmes de itemset parecido (Jaccard aproximado por MinHash/LSH)")
+    parser.add_argument("--cache", metavar="ARQUIVO",
+                        help="guarda as recomendações por perfil neste arquivo e as reaproveita nas próximas execuções")
+    parser.add_argument("--user-file", help="CSV dos filmes assistidos (sem ele, o nome é pedido no terminal)")
+    parser.add_argument("--batch", metavar="ENTRADA",
+                        help="modo lote (requer --store): diretório com um CSV por usuário ou arquivo JSON lines")
+    parser.add_argument("--workers", type=int, help="processos do modo lote (padrão: número de CPUs; 1 = sem pool)")
+    parser.add_argument("--top-n", type=int, default=MAX_TOTAL_RECOMMENDATIONS, help="recomendações por usuário no modo lote")
+    args = parser.parse_args()
+    if args.mode == 'mis':
+        # O modo 'mis' minera do CSV com suporte mínimo por tipo: sem base em disco, top-k nem amostra
+        for option, value in (("--store", args.store), ("--top-k", args.top_k), ("--sample", args.sample)):
+            if value is not None:
+                parser.error(f"{option} não é suportado com --mode mis")
+    if args.batch:
+        if not args.store:
+            parser.error("--batch requer --store")
+        main_batch(args.store, args.batch, args.output, args.mode, args.top_k, args.min_length, args.sample,
+                   args.workers, args.top_n)
+    else:
+        main(args.store, args.mode, args.top_k, args.min_length, args.sample, args.rules,
+             args.format, args.output, args.charts, args.user_file, args.near, args.cache)
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+
+# Cache de resultados do recomendador. A chave é um hash canônico do perfil
+# (itens) e do conjunto de filmes assistidos: perfis iguais, em qualquer
+# ordem ou com repetições, caem na mesma entrada. As entradas valem apenas
+# para uma versão do modelo minerado; trocar a versão esvazia o cache.
+# A remoção é LRU, limitada por uma estimativa do tamanho em bytes.
+#
+# O cache vive no nível do processo (`process_cache`): todas as consultas do
+# processo, inclusive os blocos de usuários de um worker do modo lote, usam a
+# mesma instância. Para o modo interativo, que atende um usuário por processo,
+# as entradas podem ser gravadas em disco e recarregadas na próxima execução
+# (`save`/`load`); entradas de outra versão do modelo são ignoradas.
+
+
+def _digest(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def profile_key(profile, watched_ids, *extra):
+    """Chave canônica de (perfil, assistidos); `extra` distingue parâmetros da consulta."""
+    return _digest([sorted(map(str, set(profile))), sorted(set(watched_ids)), *extra])
+
+
+def model_version(itemsets, movie_ids):
+    """Versão do modelo: hash dos itemsets minerados e dos ids da base."""
+    ids = movie_ids.tobytes() if hasattr(movie_ids, 'tobytes') else list(movie_ids)
+    return _digest([sorted(sorted(map(str, s)) for s in itemsets), len(movie_ids), _digest([ids])])
+
+
+def _sizeof(value, seen=None):
+    # Estimativa recursiva; objetos compartilhados são contados uma vez
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(v, seen) for v in value)
+    return size
+
+
+class RecommendationCache:
+    """
+    Cache LRU de recomendações por perfil.
+
+    Args:
+        max_bytes (int): limite aproximado de memória das entradas.
+        version (str): versão do modelo (ver `model_version`).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, version=None):
+        self.max_bytes = max_bytes
+        self.version = version
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def set_version(self, version):
+        """Invalida todas as entradas se a versão do modelo mudou."""
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old[1]
+        self._entries[key] = (value, size)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, (_, removed) = self._entries.popitem(last=False)
+            self.current_bytes -= removed
+
+    def save(self, path):
+        """Grava as entradas e a versão do modelo em `path` (escrita atômica)."""
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump({'version': self.version,
+                         'entries': [(key, value) for key, (value, _) in self._entries.items()]},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    def load(self, path):
+        """
+        Carrega as entradas gravadas por `save`, se forem da versão atual do modelo.
+
+        Returns:
+            int: número de entradas carregadas.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != self.version:
+            return 0
+        for key, value in data['entries']:
+            self.put(key, value)
+        return len(data['entries'])
+
+
+_process_cache = None
+
+
+def process_cache(version):
+    """Cache compartilhado pelo processo; uma versão de modelo diferente o esvazia."""
+    global _process_cache
+    if _process_cache is None:
+        _process_cache = RecommendationCache(version=version)
+    _process_cache.set_version(version)
+    return _process_cache
@@ -0,0 +1,81 @@
+import csv
+import json
+import math
+import textwrap
+
+from tabulate import tabulate
+
+
+# Escrita em fluxo das recomendações. Cada writer consome um iterável de
+# registros (dicts com os campos de RECORD_FIELDS) e escreve cada um assim que
+# chega, sem acumular a lista inteira: JSON lines e CSV uma linha por
+# registro, e a tabela um bloco por itemset, impresso quando o itemset muda.
+
+RECORD_FIELDS = ['affinity', 'support', 'itemset', 'title', 'year', 'rating_imdb', 'director', 'movie_itemset']
+
+
+def _plain(value):
+    # Escalares do numpy (df.at, memmap) e conjuntos viram tipos do JSON
+    if isinstance(value, (set, frozenset)):
+        return sorted(map(str, value))
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def write_jsonl(records, out):
+    count = 0
+    for record in records:
+        # NaN não é JSON válido: rating ausente vira null
+        record = {k: None if isinstance(v, float) and math.isnan(v) else v for k, v in record.items()}
+        out.write(json.dumps(record, ensure_ascii=False, default=_plain) + '\n')
+        out.flush()
+        count += 1
+    return count
+
+
+def write_csv(records, out):
+    writer = csv.DictWriter(out, fieldnames=RECORD_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for record in records:
+        row = dict(record)
+        row['itemset'] = ', '.join(record['itemset'])
+        row['movie_itemset'] = ', '.join(record['movie_itemset'])
+        writer.writerow(row)
+        out.flush()
+        count += 1
+    return count
+
+
+def _print_group(group, out):
+    first = group[0]
+    support_text = f" | Suporte: {first['support']}" if first['support'] is not None else ""
+    out.write(f"\n🔹 Afinidade: {first['affinity']}{support_text} | Itens do conjunto: {', '.join(first['itemset'])}\n")
+    out.write("------------------------------------------------------------\n")
+    table = [[r['title'], r['year'], r['rating_imdb'], r['director'],
+              textwrap.fill(', '.join(r['movie_itemset']), width=55)] for r in group]
+    out.write(tabulate(
+        table,
+        headers=['title', 'year', 'rating_imdb', 'director', 'Itemset'],
+        tablefmt='psql'
+    ) + '\n')
+    out.flush()
+
+
+def write_table(records, out):
+    # Os registros chegam agrupados por itemset (ver TopKMerge.iter_recommend)
+    group = []
+    count = 0
+    for record in records:
+        if group and record['itemset'] != group[0]['itemset']:
+            _print_group(group, out)
+            group = []
+        group.append(record)
+        count += 1
+    if group:
+        _print_group(group, out)
+    return count
+
+
+WRITERS = {'table': write_table, 'jsonl': write_jsonl, 'csv': write_csv}
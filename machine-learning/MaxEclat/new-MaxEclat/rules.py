@@ -0,0 +1,157 @@
+import math
+from collections import defaultdict
+from itertools import combinations
+
+
+# Regras de associação (X -> Y) a partir dos itemsets fechados e dos seus
+# suportes. O suporte de qualquer subconjunto frequente é o maior suporte
+# entre os fechados que o contêm, então nada é recontado na base: os
+# suportes vêm de uma tabela hash preenchida sob demanda. Isso só vale para o
+# conjunto completo de fechados frequentes (CHARM com suporte mínimo): com um
+# top-k ou uma amostra incompleta, o fechado de um subconjunto pode faltar e o
+# máximo entre os superconjuntos presentes subestima o suporte. As regras são
+# indexadas pelos itens do antecedente, e disparar as regras de um perfil
+# custa proporcional às regras que tocam os itens do perfil.
+
+
+class SupportTable:
+    """
+    Suporte (contagem) de qualquer itemset frequente a partir dos fechados.
+
+    Args:
+        closed (dict): conjunto completo de fechados frequentes, frozenset -> contagem.
+
+    Raises:
+        KeyError: nenhum fechado contém o itemset (não é frequente ou o conjunto
+            de fechados está incompleto).
+    """
+
+    def __init__(self, closed):
+        self.table = dict(closed)
+        self._closed = list(closed.items())
+        self._by_item = defaultdict(list)
+        for position, (itemset, _) in enumerate(self._closed):
+            for item in itemset:
+                self._by_item[item].append(position)
+
+    def __getitem__(self, itemset):
+        itemset = frozenset(itemset)
+        support = self.table.get(itemset)
+        if support is None:
+            # Fechados que contêm o itemset: parte da menor lista de posições
+            lists = sorted((self._by_item.get(item, ()) for item in itemset), key=len)
+            candidates = set(lists[0]) if lists else set(range(len(self._closed)))
+            for positions in lists[1:]:
+                candidates.intersection_update(positions)
+            if not candidates:
+                raise KeyError(f"nenhum fechado contém {sorted(map(str, itemset))}; "
+                               "as regras precisam do conjunto completo de fechados")
+            support = max(self._closed[p][1] for p in candidates)
+            self.table[itemset] = support
+        return support
+
+
+def _rule(antecedent, consequent, union_support, supports, n_rows):
+    antecedent_support = supports[antecedent]
+    consequent_support = supports[consequent]
+    confidence = union_support / antecedent_support
+    consequent_ratio = consequent_support / n_rows
+    return {
+        'antecedent': antecedent,
+        'consequent': consequent,
+        'support': union_support / n_rows,
+        'confidence': confidence,
+        'lift': confidence / consequent_ratio,
+        'conviction': math.inf if confidence >= 1 else (1 - consequent_ratio) / (1 - confidence),
+    }
+
+
+def generate_rules(closed, n_rows, min_confidence=0.5, max_antecedent=3, min_lift=None):
+    """
+    Regras X -> Y com X ∪ Y fechado.
+
+    Para um fechado C, se X -> C-X não atinge a confiança mínima, nenhum
+    antecedente menor X' ⊂ X atinge (sup(X') >= sup(X)); por isso os
+    consequentes crescem nível a nível (estilo Apriori) só a partir dos que passaram.
+
+    Args:
+        closed (dict): conjunto completo de fechados frequentes (charm/charm_store),
+            frozenset -> contagem de suporte; não use o resultado de top-k ou de amostra.
+        n_rows (int): número de transações da base.
+        min_confidence (float): confiança mínima.
+        max_antecedent (int): tamanho máximo do antecedente.
+        min_lift (float): lift mínimo (opcional).
+
+    Returns:
+        list of dict: regras com 'antecedent', 'consequent', 'support',
+        'confidence', 'lift' e 'conviction', em ordem decrescente de confiança e lift.
+    """
+    supports = SupportTable(closed)
+    rules = []
+    for itemset, union_support in closed.items():
+        if len(itemset) < 2:
+            continue
+        level = []
+        for item in itemset:
+            consequent = frozenset((item,))
+            antecedent = itemset - consequent
+            if union_support / supports[antecedent] >= min_confidence:
+                level.append(consequent)
+                if len(antecedent) <= max_antecedent:
+                    rules.append(_rule(antecedent, consequent, union_support, supports, n_rows))
+        size = 1
+        while level and size + 1 < len(itemset):
+            passed = set(level)
+            candidates = {a | b for a, b in combinations(level, 2) if len(a | b) == size + 1}
+            level = []
+            for consequent in candidates:
+                if any(consequent - {item} not in passed for item in consequent):
+                    continue
+                antecedent = itemset - consequent
+                if union_support / supports[antecedent] >= min_confidence:
+                    level.append(consequent)
+                    if len(antecedent) <= max_antecedent:
+                        rules.append(_rule(antecedent, consequent, union_support, supports, n_rows))
+            size += 1
+    if min_lift is not None:
+        rules = [rule for rule in rules if rule['lift'] >= min_lift]
+    rules.sort(key=lambda r: (r['confidence'], r['lift']), reverse=True)
+    return rules
+
+
+class RuleIndex:
+    """Regras indexadas pelos itens do antecedente."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._by_item = defaultdict(list)
+        for position, rule in enumerate(rules):
+            for item in rule['antecedent']:
+                self._by_item[item].append(position)
+
+    def fire(self, profile, exclude_known=True):
+        """
+        Regras cujo antecedente está todo no perfil.
+
+        Conta, para cada regra tocada pelos itens do perfil, quantos itens do
+        antecedente já apareceram; a regra dispara quando a contagem chega ao
+        tamanho do antecedente.
+
+        Args:
+            profile (set): itens do perfil do usuário.
+            exclude_known (bool): descarta regras cujo consequente já está todo no perfil.
+
+        Returns:
+            list of dict: regras disparadas, na ordem de `rules` (confiança, lift).
+        """
+        hits = defaultdict(int)
+        fired = []
+        for item in profile:
+            for position in self._by_item.get(item, ()):
+                hits[position] += 1
+                rule = self.rules[position]
+                if hits[position] == len(rule['antecedent']):
+                    if not (exclude_known and rule['consequent'] <= profile):
+                        fired.append(position)
+        fired.sort()
+        return [self.rules[p] for p in fired]
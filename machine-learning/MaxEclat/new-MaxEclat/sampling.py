@@ -0,0 +1,241 @@
+import math
+import random
+from collections import Counter, defaultdict
+from itertools import chain, combinations
+
+import numpy as np
+
+
+# Mineração aproximada por amostragem (Toivonen, 1996). Os itemsets são
+# minerados numa amostra das transações com um suporte mínimo rebaixado; em
+# seguida uma única passada exata sobre a base completa conta os candidatos e
+# a sua borda negativa (os itemsets não frequentes na amostra cujos
+# subconjuntos imediatos todos são). Os itens isolados são decididos pela
+# contagem de itens da mesma passada; só os conjuntos com 2 ou mais itens são
+# contados um a um. Se nenhum itemset da borda for frequente
+# na base completa, o resultado é exato; se houver, eles são reportados como
+# "misses" e o resultado pode estar incompleto.
+
+
+def sample_rows(n_rows, fraction, rng=random, strata=None):
+    """
+    Índices (crescentes) de uma amostra das linhas.
+
+    Args:
+        n_rows (int): tamanho da base.
+        fraction (float): fração amostrada.
+        rng: gerador (random.Random ou o módulo random).
+        strata (list): chave de estrato de cada linha (por exemplo, a década ou o
+            gênero principal). Com estratos, cada um é amostrado na mesma fração.
+    """
+    if strata is None:
+        return sorted(rng.sample(range(n_rows), max(1, min(n_rows, round(fraction * n_rows)))))
+    groups = defaultdict(list)
+    for row, key in enumerate(strata):
+        groups[key].append(row)
+    rows = []
+    for members in groups.values():
+        rows.extend(rng.sample(members, max(1, min(len(members), round(fraction * len(members))))))
+    return sorted(rows)
+
+
+def lowered_support(min_sup, sample_size, delta=0.05):
+    """
+    Limiar rebaixado para a amostra. Pela cota de Chernoff multiplicativa, um
+    itemset com suporte min_sup na base fica abaixo de
+    min_sup - sqrt(2 min_sup ln(1/delta) / |s|) na amostra com probabilidade <= delta.
+    """
+    lowered = min_sup - math.sqrt(2 * min_sup * math.log(1 / delta) / sample_size)
+    return max(lowered, 1 / sample_size)
+
+
+def _bitset(rows, n_rows):
+    """Linhas (crescentes) como bitset int, montado de uma vez pelo NumPy."""
+    bits = np.zeros(n_rows, dtype=bool)
+    bits[rows] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def _count_candidates(candidates, tidsets):
+    """Contagem de cada candidato: AND dos bitsets dos itens + popcount."""
+    counts = {}
+    for itemset in candidates:
+        tids = None
+        for item in itemset:
+            tids = tidsets.get(item, 0) if tids is None else tids & tidsets.get(item, 0)
+        counts[itemset] = tids.bit_count()
+    return counts
+
+
+def frequent_itemsets(transactions, min_count):
+    """Todos os itemsets frequentes (Eclat com tidsets em int), com as contagens."""
+    tidsets = defaultdict(int)
+    for tid, transaction in enumerate(transactions):
+        bit = 1 << tid
+        for item in transaction:
+            tidsets[item] |= bit
+    items = sorted(((item, tids) for item, tids in tidsets.items() if tids.bit_count() >= min_count),
+                   key=lambda x: str(x[0]))
+    frequent = {}
+
+    def extend(prefix, prefix_tids, tail):
+        for k, (item, tids) in enumerate(tail):
+            new_tids = tids if prefix_tids is None else prefix_tids & tids
+            count = new_tids.bit_count()
+            if count >= min_count:
+                itemset = prefix | {item}
+                frequent[itemset] = count
+                extend(itemset, new_tids, tail[k + 1:])
+
+    extend(frozenset(), None, items)
+    return frequent
+
+
+def negative_border(frequent, items=()):
+    """
+    Itemsets fora de `frequent` cujos subconjuntos imediatos estão todos em `frequent`.
+
+    Args:
+        frequent (iterable of frozenset): itemsets frequentes (fechado para baixo).
+        items (iterable): universo de itens, para incluir os singletons não
+            frequentes; vazio devolve só a parte da borda com 2 ou mais itens.
+    """
+    frequent = set(frequent)
+    border = {frozenset((item,)) for item in items if frozenset((item,)) not in frequent}
+    levels = defaultdict(list)
+    for itemset in frequent:
+        levels[len(itemset)].append(tuple(sorted(itemset, key=str)))
+    for size in sorted(levels):
+        # Junção Apriori: dois (k)-conjuntos com o mesmo prefixo de k-1 itens
+        by_prefix = defaultdict(list)
+        for itemset in levels[size]:
+            by_prefix[itemset[:-1]].append(itemset[-1])
+        for prefix, lasts in by_prefix.items():
+            lasts.sort(key=str)
+            for a, b in combinations(lasts, 2):
+                candidate = frozenset(prefix + (a, b))
+                if candidate in frequent:
+                    continue
+                if all(candidate - {item} in frequent for item in candidate):
+                    border.add(candidate)
+    return border
+
+
+def _toivonen(sample, n_rows, count_full, min_sup, delta):
+    """
+    Núcleo comum: minera a amostra e confere na base completa.
+
+    `count_full(itemsets)` faz a passada exata: recebe os candidatos com 2 ou
+    mais itens e retorna (contagem de cada item, contagem de cada candidato).
+    Os singletons não entram como candidatos: a contagem de itens da mesma
+    passada decide todos eles, inclusive a parte da borda com um item só
+    (todo item não frequente na amostra), que é a maior parte da borda.
+    """
+    sample_min_sup = lowered_support(min_sup, len(sample), delta)
+    sample_frequent = frequent_itemsets(sample, max(1, math.ceil(sample_min_sup * len(sample))))
+    border = negative_border(sample_frequent)
+    candidates = [s for s in sample_frequent if len(s) > 1] + list(border)
+
+    # Passada exata: contagem de itens + candidatos com 2 ou mais itens
+    min_count = max(1, math.ceil(min_sup * n_rows))
+    item_counts, candidate_counts = count_full(candidates)
+    frequent = {frozenset((item,)): support for item, support in item_counts.items() if support >= min_count}
+    frequent.update((itemset, support) for itemset, support in candidate_counts.items() if support >= min_count)
+
+    # Misses: itens frequentes que a amostra não viu como frequentes e conjuntos da borda frequentes
+    misses = [s for s in frequent if len(s) == 1 and s not in sample_frequent]
+    misses += [s for s in border if s in frequent]
+    misses.sort(key=lambda s: (len(s), sorted(map(str, s))))
+    return {
+        'frequent': frequent,
+        'misses': misses,
+        'exact': not misses,
+        'sample_size': len(sample),
+        'sample_min_support': sample_min_sup,
+        'candidates': len(candidates),
+    }
+
+
+def toivonen(transactions, min_sup, sample_fraction=0.1, delta=0.05, seed=None, strata=None):
+    """
+    Itemsets frequentes por amostragem com verificação exata.
+
+    Args:
+        transactions (list of set): base completa.
+        min_sup (float): suporte mínimo relativo.
+        sample_fraction (float): fração de transações amostradas.
+        delta (float): probabilidade tolerada de um itemset frequente escapar da amostra.
+        seed: semente do gerador aleatório.
+        strata (list): chave de estrato por transação (amostragem estratificada).
+
+    Returns:
+        dict: 'frequent' (frozenset -> contagem exata na base completa), 'misses'
+        (itemsets da borda negativa que são frequentes; vazio = resultado exato),
+        'exact', 'sample_size', 'sample_min_support' e 'candidates' (itemsets
+        com 2 ou mais itens contados na base completa).
+    """
+    rng = random.Random(seed)
+    rows = sample_rows(len(transactions), sample_fraction, rng, strata)
+    sample = [transactions[r] for r in rows]
+
+    def count_full(candidates):
+        # Uma passada pela base: contagem de todos os itens (Counter em C) e
+        # linhas só dos itens que aparecem em algum candidato; as linhas viram
+        # bitsets (int) e cada candidato é um AND + popcount
+        needed = set().union(*candidates) if candidates else set()
+        item_counts = Counter(chain.from_iterable(transactions))
+        rows = defaultdict(list)
+        for tid, transaction in enumerate(transactions):
+            for item in needed.intersection(transaction):
+                rows[item].append(tid)
+        tidsets = {item: _bitset(tids, len(transactions)) for item, tids in rows.items()}
+        return item_counts, _count_candidates(candidates, tidsets)
+
+    return _toivonen(sample, len(transactions), count_full, min_sup, delta)
+
+
+def toivonen_store(store, min_sup, sample_fraction=0.1, delta=0.05, seed=None, strata=None):
+    """Como `toivonen`, lendo só as linhas amostradas da base em disco e contando pelos tidsets dela."""
+    rng = random.Random(seed)
+    rows = sample_rows(len(store), sample_fraction, rng, strata)
+    sample = store.itemsets(rows)
+
+    def count_full(candidates):
+        # As contagens de itens já estão na base (tamanho de cada tidset); os
+        # itens dos candidatos viram bitsets int a partir dos bitmaps (ou tidsets)
+        counts = np.diff(store.tid_indptr)
+        item_counts = {store.items[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+        tidsets = {}
+        for item in set().union(*candidates) if candidates else ():
+            code = store.codes[item]
+            bitmap = store.bitmap(code)
+            if bitmap is None:
+                tidsets[item] = _bitset(store.tidset(code), len(store))
+            else:
+                tidsets[item] = int.from_bytes(np.asarray(bitmap, dtype='<u8').tobytes(), 'little')
+        return item_counts, _count_candidates(candidates, tidsets)
+
+    return _toivonen(sample, len(store), count_full, min_sup, delta)
+
+
+def maximal_frequent(frequent):
+    maximal = []
+    for itemset in sorted(frequent, key=len, reverse=True):
+        if not any(itemset < other for other in maximal):
+            maximal.append(itemset)
+    return maximal
+
+
+def closed_frequent(frequent):
+    """
+    Fechados: sem superconjunto imediato de mesmo suporte (basta o imediato,
+    já que `frequent` é fechado para baixo quando o resultado é exato).
+    """
+    not_closed = set()
+    for itemset, support in frequent.items():
+        if len(itemset) > 1:
+            for item in itemset:
+                subset = itemset - {item}
+                if frequent.get(subset) == support:
+                    not_closed.add(subset)
+    return {itemset: support for itemset, support in frequent.items() if itemset not in not_closed}
@@ -0,0 +1,172 @@
+import math
+from collections import defaultdict
+
+
+# Motor de top-k para as recomendações. As linhas da base são renumeradas em
+# ordem decrescente de rating (rank 0 = filme mais bem avaliado), então cada
+# lista invertida item -> ranks já está em ordem de rating. Cada item também
+# tem um bitmap de ranks (int do Python, bit r = rank r): os candidatos de um
+# itemset são o AND dos bitmaps dos seus itens, os filmes já assistidos saem
+# com um AND-NOT, e os k primeiros bits ligados são os k candidatos de maior
+# rating. Nenhum DataFrame é montado por itemset; os resultados dos vários
+# itemsets são combinados em fluxo, na ordem de score, até o total pedido.
+
+
+def _rating_key(rating):
+    # NaN e valores ausentes vão para o fim da ordem
+    if rating is None or (isinstance(rating, float) and math.isnan(rating)):
+        return math.inf
+    return -rating
+
+
+def _bitmap(ranks, size):
+    bits = bytearray((size + 7) // 8)
+    for rank in ranks:
+        bits[rank >> 3] |= 1 << (rank & 7)
+    return int.from_bytes(bits, "little")
+
+
+def iter_ranks(bitmap):
+    """Ranks dos bits ligados, do menor (maior rating) para o maior."""
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+class TopKMerge:
+    """
+    Combinação dos top-k por itemset. Requer `top_k_for_itemset`,
+    `candidate_ranks`, `mean_rating` e `ratings` (por rank) na classe que herda.
+    """
+
+    def iter_recommend(self, scored_itemsets, excluded=None, k_total=20, k_per_itemset=5, stats=None):
+        """
+        Combina os top-k de vários itemsets: gera (score, rating, rank, itemset)
+        à medida que cada itemset é visitado, na ordem de score, até k_total
+        filmes distintos; cada filme aparece uma vez, associado ao itemset de
+        maior score.
+
+        Args:
+            scored_itemsets (list of dict): {'itemset': set, 'score': número}, em
+                ordem decrescente de score.
+            excluded: ranks que não podem ser recomendados, no formato de
+                `exclusion_mask` do índice.
+            k_total (int): tamanho do resultado final.
+            k_per_itemset (int): máximo de filmes vindos de cada itemset.
+            stats (dict): se dado, recebe frozenset(itemset) -> {'score', 'count',
+                'mean_rating'} dos candidatos de todos os itemsets de
+                `scored_itemsets`: os visitados reaproveitam a busca do top-k, e os
+                que ficaram de fora quando k_total foi atingido são contados depois
+                do último filme gerado (o dict só fica completo quando o gerador
+                termina).
+        """
+        chosen = set()
+        visited = 0
+        for info in scored_itemsets:
+            if len(chosen) >= k_total:
+                break
+            visited += 1
+            itemset = info['itemset']
+            if stats is None:
+                ranks = self.top_k_for_itemset(itemset, k_per_itemset, excluded)
+            else:
+                candidates = self.candidate_ranks(itemset, excluded)
+                stats[frozenset(itemset)] = self._itemset_stats(info, candidates)
+                ranks = candidates[:k_per_itemset]
+            for rank in ranks:
+                rank = int(rank)
+                if rank in chosen:
+                    continue
+                chosen.add(rank)
+                yield info['score'], self.ratings[rank], rank, itemset
+                if len(chosen) >= k_total:
+                    break
+        if stats is not None:
+            for info in scored_itemsets[visited:]:
+                stats[frozenset(info['itemset'])] = self._itemset_stats(
+                    info, self.candidate_ranks(info['itemset'], excluded)
+                )
+
+    def _itemset_stats(self, info, candidates):
+        return {'score': info['score'], 'count': len(candidates), 'mean_rating': self.mean_rating(candidates)}
+
+
+class RatingIndex(TopKMerge):
+    """
+    Índice invertido item -> ranks (ordem decrescente de rating).
+
+    Args:
+        itemsets (list of set): itemset de cada linha da base, na ordem original.
+        ratings (list of float): rating de cada linha.
+        movie_ids (list of int): id estável de cada linha (movie_ids.movie_id).
+
+    Atributos:
+        order (list of int): order[rank] = posição da linha na base original.
+        itemsets, ratings, movie_ids: valores por rank.
+        postings (dict): item -> lista crescente de ranks que contêm o item.
+        bitmaps (dict): item -> bitmap dos mesmos ranks.
+    """
+
+    def __init__(self, itemsets, ratings, movie_ids):
+        self.order = sorted(range(len(ratings)), key=lambda r: (_rating_key(ratings[r]), r))
+        self.itemsets = [itemsets[r] if isinstance(itemsets[r], set) else set() for r in self.order]
+        self.ratings = [ratings[r] for r in self.order]
+        self.movie_ids = [movie_ids[r] for r in self.order]
+        postings = defaultdict(list)
+        for rank, itemset in enumerate(self.itemsets):
+            for item in itemset:
+                postings[item].append(rank)
+        self.postings = dict(postings)
+        self.bitmaps = {item: _bitmap(ranks, len(self.order)) for item, ranks in self.postings.items()}
+        self._ranks_by_id = defaultdict(list)
+        for rank, mid in enumerate(self.movie_ids):
+            self._ranks_by_id[mid].append(rank)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        return cls(df['Itemset'].tolist(), df['rating_imdb'].tolist(), df['movie_id'].tolist())
+
+    def exclusion_mask(self, ids):
+        """Bitmap dos ranks cujos filmes estão em `ids`; calculado uma vez por usuário."""
+        return _bitmap((rank for mid in set(ids) for rank in self._ranks_by_id.get(mid, ())), len(self.order))
+
+    def candidates(self, itemset, excluded=None):
+        """Bitmap dos ranks que contêm todo o itemset, menos os de `excluded`."""
+        if not itemset:
+            return 0
+        bitmaps = []
+        for item in itemset:
+            bitmap = self.bitmaps.get(item)
+            if bitmap is None:
+                return 0
+            bitmaps.append(bitmap)
+        # Do mais esparso para o mais denso: o AND zera cedo quando não há candidatos
+        bitmaps.sort(key=int.bit_count)
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result &= bitmap
+            if not result:
+                return 0
+        return result & ~excluded if excluded else result
+
+    def candidate_ranks(self, itemset, excluded=None):
+        return list(iter_ranks(self.candidates(itemset, excluded)))
+
+    def mean_rating(self, ranks):
+        ratings = [self.ratings[r] for r in ranks if _rating_key(self.ratings[r]) != math.inf]
+        return sum(ratings) / len(ratings) if ratings else math.nan
+
+    def top_k_for_itemset(self, itemset, k, excluded=None):
+        """
+        Os k filmes de maior rating que contêm todo o itemset, fora os de `excluded`.
+
+        Returns:
+            list of int: ranks, do maior para o menor rating.
+        """
+        hits = []
+        for rank in iter_ranks(self.candidates(itemset, excluded)):
+            hits.append(rank)
+            if len(hits) == k:
+                break
+        return hits
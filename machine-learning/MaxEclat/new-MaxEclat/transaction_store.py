@@ -0,0 +1,384 @@
+import json
+import math
+import os
+
+import numpy as np
+
+from topk import TopKMerge
+
+
+# Base de transações em disco, lida via memória mapeada (np.load com
+# mmap_mode='r'). Nada é carregado por inteiro: o sistema operacional pagina
+# só o que é tocado, a RSS fica limitada e vários processos que abrem o mesmo
+# diretório compartilham o page cache.
+#
+# Arquivos do diretório:
+#   meta.json                     versão, contagens, limiar dos bitmaps
+#   items.json                    vocabulário: código inteiro -> item
+#   indptr.npy, indices.npy       CSR linha -> códigos dos itens (ordenados)
+#   tid_indptr.npy, tid_rows.npy  CSC item -> linhas (tidsets como listas)
+#   bitmaps.npy, bitmap_slot.npy  tidsets em bitmap (uint64) dos itens com
+#                                 suporte >= bitmap_min_support; slot -1 = sem bitmap
+#   ratings.npy, years.npy, movie_ids.npy
+#   <coluna>.bin, <coluna>_offsets.npy  colunas de texto (title, director) em UTF-8
+
+FORMAT_VERSION = 1
+TEXT_COLUMNS = ('title', 'director')
+_CHUNK = 65536
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        return int(np.bitwise_count(words).sum())
+else:  # NumPy < 2.0
+    def popcount(words):
+        return int(np.unpackbits(np.ascontiguousarray(words).view(np.uint8)).sum())
+
+
+def _year_code(year):
+    try:
+        return int(float(year))
+    except (TypeError, ValueError):
+        return -1
+
+
+class _Appender:
+    """Escreve um array 1-D em disco em blocos, sem mantê-lo em memória."""
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.file = open(path + '.raw', 'wb')
+        self.buffer = []
+        self.size = 0
+
+    def extend(self, values):
+        self.buffer.extend(values)
+        if len(self.buffer) >= _CHUNK:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            np.asarray(self.buffer, dtype=self.dtype).tofile(self.file)
+            self.size += len(self.buffer)
+            self.buffer = []
+
+    def finish(self):
+        """Converte o arquivo bruto em .npy (cabeçalho + dados) e retorna o memmap."""
+        self.flush()
+        self.file.close()
+        raw = np.memmap(self.path + '.raw', dtype=self.dtype, mode='r', shape=(self.size,)) if self.size else \
+            np.empty(0, dtype=self.dtype)
+        out = np.lib.format.open_memmap(self.path, mode='w+', dtype=self.dtype, shape=(self.size,))
+        for start in range(0, self.size, _CHUNK * 16):
+            out[start:start + _CHUNK * 16] = raw[start:start + _CHUNK * 16]
+        out.flush()
+        del raw
+        os.remove(self.path + '.raw')
+        return out
+
+
+def build_store(path, rows, bitmap_min_support=0.001):
+    """
+    Grava a base em `path` a partir de um iterável de linhas, em fluxo.
+
+    Args:
+        path (str): diretório de destino (criado se não existir).
+        rows (iterable): tuplas (itemset, title, year, rating, movie_id, director).
+        bitmap_min_support (float): itens com suporte relativo abaixo disso
+            ficam só com a lista de linhas (sem bitmap denso).
+
+    Returns:
+        TransactionStore: a base recém-gravada, já aberta.
+    """
+    os.makedirs(path, exist_ok=True)
+    p = lambda name: os.path.join(path, name)
+    codes = {}
+    items = []
+    indptr = _Appender(p('indptr.npy'), np.int64)
+    indices = _Appender(p('indices.npy'), np.int32)
+    ratings = _Appender(p('ratings.npy'), np.float64)
+    years = _Appender(p('years.npy'), np.int32)
+    ids = _Appender(p('movie_ids.npy'), np.uint64)
+    texts = {c: (open(p(c + '.bin'), 'wb'), _Appender(p(c + '_offsets.npy'), np.int64)) for c in TEXT_COLUMNS}
+    for _, offsets in texts.values():
+        offsets.extend([0])
+    indptr.extend([0])
+
+    nnz = 0
+    text_sizes = dict.fromkeys(TEXT_COLUMNS, 0)
+    n_rows = 0
+    for itemset, title, year, rating, movie_id, director in rows:
+        row_codes = []
+        for item in itemset:
+            code = codes.get(item)
+            if code is None:
+                code = codes[item] = len(items)
+                items.append(item)
+            row_codes.append(code)
+        row_codes.sort()
+        indices.extend(row_codes)
+        nnz += len(row_codes)
+        indptr.extend([nnz])
+        ratings.extend([math.nan if rating is None else rating])
+        years.extend([_year_code(year)])
+        ids.extend([movie_id])
+        for column, value in zip(TEXT_COLUMNS, (title, director)):
+            data = ('' if value is None else str(value)).encode('utf-8')
+            blob, offsets = texts[column]
+            blob.write(data)
+            text_sizes[column] += len(data)
+            offsets.extend([text_sizes[column]])
+        n_rows += 1
+
+    indptr.finish()
+    indices = indices.finish()
+    for appender in (ratings, years, ids):
+        appender.finish()
+    for blob, offsets in texts.values():
+        blob.close()
+        offsets.finish()
+
+    # CSC (item -> linhas) por contagem, em blocos de linhas: uma passada conta
+    # os itens, a segunda espalha as linhas direto no memmap. Só arrays do
+    # tamanho de um bloco e do vocabulário ficam em memória; como os blocos
+    # seguem a ordem das linhas, as listas de cada item saem crescentes.
+    indptr = np.load(p('indptr.npy'), mmap_mode='r')
+    counts = np.zeros(len(items), dtype=np.int64)
+    for start in range(0, n_rows, _CHUNK):
+        stop = min(n_rows, start + _CHUNK)
+        counts += np.bincount(indices[indptr[start]:indptr[stop]], minlength=len(items))
+    tid_indptr = np.lib.format.open_memmap(p('tid_indptr.npy'), mode='w+', dtype=np.int64, shape=(len(items) + 1,))
+    tid_indptr[0] = 0
+    np.cumsum(counts, out=tid_indptr[1:])
+    tid_rows = np.lib.format.open_memmap(p('tid_rows.npy'), mode='w+', dtype=np.int32, shape=(nnz,))
+    cursor = np.array(tid_indptr[:-1])
+    for start in range(0, n_rows, _CHUNK):
+        stop = min(n_rows, start + _CHUNK)
+        bounds = np.asarray(indptr[start:stop + 1])
+        block_codes = np.asarray(indices[bounds[0]:bounds[-1]])
+        block_rows = np.repeat(np.arange(start, stop, dtype=np.int32), np.diff(bounds))
+        order = np.argsort(block_codes, kind='stable')
+        block_codes, block_rows = block_codes[order], block_rows[order]
+        present, first, sizes = np.unique(block_codes, return_index=True, return_counts=True)
+        # Posição = próximo espaço livre do item + ordem dentro do bloco
+        within = np.arange(len(block_codes)) - np.repeat(first, sizes)
+        tid_rows[cursor[block_codes] + within] = block_rows
+        cursor[present] += sizes
+    del indptr, cursor
+
+    # Bitmaps densos só para os itens frequentes o bastante para compensar
+    words = (n_rows + 63) // 64
+    dense = np.flatnonzero(counts >= max(1, math.ceil(bitmap_min_support * n_rows)))
+    slot = np.full(len(items), -1, dtype=np.int32)
+    slot[dense] = np.arange(len(dense), dtype=np.int32)
+    np.save(p('bitmap_slot.npy'), slot)
+    bitmaps = np.lib.format.open_memmap(p('bitmaps.npy'), mode='w+', dtype=np.uint64, shape=(len(dense), words))
+    for s, code in enumerate(dense):
+        rows_of_item = tid_rows[tid_indptr[code]:tid_indptr[code + 1]]
+        bitmap = np.zeros(words, dtype=np.uint64)
+        np.bitwise_or.at(bitmap, rows_of_item >> 6, np.left_shift(np.uint64(1), (rows_of_item & 63).astype(np.uint64)))
+        bitmaps[s] = bitmap
+    for array in (tid_indptr, tid_rows, bitmaps):
+        array.flush()
+    del tid_indptr, tid_rows, bitmaps
+
+    with open(p('items.json'), 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+    with open(p('meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': FORMAT_VERSION, 'n_rows': n_rows, 'n_items': len(items), 'nnz': nnz,
+                   'bitmap_min_support': bitmap_min_support}, f)
+    return TransactionStore(path)
+
+
+class TransactionStore:
+    """
+    Base de transações aberta em modo somente leitura e memória mapeada.
+
+    Os arrays são memmaps: abrir a base não lê os dados, e cada acesso toca
+    apenas as páginas necessárias.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Versão de base {self.meta.get('version')} não suportada (esperada {FORMAT_VERSION})")
+        with open(os.path.join(path, 'items.json'), encoding='utf-8') as f:
+            self.items = json.load(f)
+        self.codes = {item: code for code, item in enumerate(self.items)}
+        load = lambda name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+        self.indptr = load('indptr')
+        self.indices = load('indices')
+        self.tid_indptr = load('tid_indptr')
+        self.tid_rows = load('tid_rows')
+        self.bitmaps = load('bitmaps')
+        self.bitmap_slot = load('bitmap_slot')
+        self.ratings = load('ratings')
+        self.years = load('years')
+        self.movie_ids = load('movie_ids')
+        self._texts = {}
+        for column in TEXT_COLUMNS:
+            blob_path = os.path.join(path, column + '.bin')
+            blob = np.memmap(blob_path, dtype=np.uint8, mode='r') if os.path.getsize(blob_path) else b''
+            self._texts[column] = (blob, load(column + '_offsets'))
+
+    def __len__(self):
+        return self.meta['n_rows']
+
+    @property
+    def n_words(self):
+        return (len(self) + 63) // 64
+
+    def text(self, column, row):
+        blob, offsets = self._texts[column]
+        return bytes(blob[offsets[row]:offsets[row + 1]]).decode('utf-8')
+
+    def row_codes(self, row):
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def itemset(self, row):
+        return {self.items[c] for c in self.row_codes(row)}
+
+    def itemsets(self, rows):
+        """Itemsets de várias linhas, lidos de uma vez (um único gather sobre `indices`)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        indptr = np.asarray(self.indptr)
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - (ends - lengths), lengths)
+        codes = np.asarray(self.indices)[positions].tolist()
+        items = self.items
+        return [{items[c] for c in codes[end - length:end]} for end, length in zip(ends.tolist(), lengths.tolist())]
+
+    def transactions(self):
+        """Gera os itemsets linha a linha (para os mineradores que esperam list of set)."""
+        for row in range(len(self)):
+            yield self.itemset(row)
+
+    def support_count(self, code):
+        return int(self.tid_indptr[code + 1] - self.tid_indptr[code])
+
+    def tidset(self, code):
+        """Linhas (crescentes) que contêm o item; visão sobre o memmap."""
+        return self.tid_rows[self.tid_indptr[code]:self.tid_indptr[code + 1]]
+
+    def bitmap(self, code):
+        """Bitmap uint64 das linhas que contêm o item, ou None se o item não tem bitmap."""
+        slot = self.bitmap_slot[code]
+        return None if slot < 0 else self.bitmaps[slot]
+
+    def rows_to_bitmap(self, rows):
+        bitmap = np.zeros(self.n_words, dtype=np.uint64)
+        rows = np.asarray(rows, dtype=np.int64)
+        np.bitwise_or.at(bitmap, rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+        return bitmap
+
+    def candidate_rows(self, itemset):
+        """Linhas (crescentes) que contêm todos os itens do itemset."""
+        codes = [self.codes.get(item) for item in itemset]
+        if not codes or None in codes:
+            return np.empty(0, dtype=np.int32)
+        codes.sort(key=self.support_count)
+        rows = np.asarray(self.tidset(codes[0]))
+        for code in codes[1:]:
+            if not len(rows):
+                break
+            bitmap = self.bitmap(code)
+            if bitmap is None:
+                rows = np.intersect1d(rows, self.tidset(code), assume_unique=True)
+            else:
+                rows = rows[(bitmap[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1) == 1]
+        return rows
+
+
+def _rank_order(ratings):
+    # Ordem decrescente de rating, NaN no fim, empates pela linha (estável)
+    keys = np.where(np.isnan(ratings), np.inf, -np.asarray(ratings, dtype=np.float64))
+    return np.argsort(keys, kind='stable')
+
+
+class StoreRatingIndex(TopKMerge):
+    """
+    Mesma interface de topk.RatingIndex, mas sobre uma TransactionStore.
+
+    Só os vetores por linha (ordem de rating, ratings, ids) ficam em memória;
+    listas invertidas e bitmaps são lidos do memmap sob demanda.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.order = _rank_order(store.ratings)
+        self.rank_of = np.empty(len(self.order), dtype=np.int64)
+        self.rank_of[self.order] = np.arange(len(self.order))
+        self.ratings = np.asarray(store.ratings)[self.order]
+        self.movie_ids = np.asarray(store.movie_ids)[self.order]
+
+    def exclusion_mask(self, ids):
+        """Máscara booleana por rank dos filmes em `ids`."""
+        return np.isin(self.movie_ids, np.fromiter(set(ids), dtype=np.uint64))
+
+    def candidate_ranks(self, itemset, excluded=None):
+        ranks = np.sort(self.rank_of[self.store.candidate_rows(itemset)])
+        if excluded is not None and len(ranks):
+            ranks = ranks[~excluded[ranks]]
+        return ranks
+
+    def mean_rating(self, ranks):
+        ratings = self.ratings[np.asarray(ranks, dtype=np.int64)]
+        ratings = ratings[~np.isnan(ratings)]
+        return float(ratings.mean()) if len(ratings) else math.nan
+
+    def top_k_for_itemset(self, itemset, k, excluded=None):
+        ranks = self.rank_of[self.store.candidate_rows(itemset)]
+        if excluded is not None and len(ranks):
+            ranks = ranks[~excluded[ranks]]
+        if len(ranks) > k:
+            ranks = np.partition(ranks, k - 1)[:k]
+        return np.sort(ranks).tolist()
+
+    def itemset(self, rank):
+        return self.store.itemset(int(self.order[rank]))
+
+
+def max_eclat_store(store, min_sup):
+    """
+    MaxEclat vertical sobre a base em disco: tidsets como bitmaps uint64 e
+    suporte por popcount, sem montar a lista de transações em memória.
+
+    Args:
+        store (TransactionStore): base aberta.
+        min_sup (float): suporte mínimo relativo; precisa ser >= o limiar de
+            bitmaps da base, para que todo item frequente tenha bitmap.
+
+    Returns:
+        list of set: itemsets frequentes maximais.
+    """
+    if min_sup < store.meta['bitmap_min_support']:
+        raise ValueError(f"min_sup {min_sup} abaixo do limiar de bitmaps da base "
+                         f"({store.meta['bitmap_min_support']}); reconstrua a base com um limiar menor")
+    min_count = math.ceil(min_sup * len(store))
+    frequent = sorted((store.items[c], c) for c in range(len(store.items)) if store.support_count(c) >= min_count)
+    candidates = []
+
+    def recurse(prefix, bitmap, tail):
+        extended = False
+        for i, (item, code) in enumerate(tail):
+            new_bitmap = store.bitmap(code) if bitmap is None else bitmap & store.bitmap(code)
+            if popcount(new_bitmap) >= min_count:
+                extended = True
+                recurse(prefix + [item], new_bitmap, tail[i + 1:])
+        if prefix and not extended:
+            candidates.append(frozenset(prefix))
+
+    recurse([], None, frequent)
+
+    # Um candidato sem extensão à direita ainda pode estar contido noutro
+    candidates.sort(key=len, reverse=True)
+    maximal = []
+    for candidate in candidates:
+        if not any(candidate < m for m in maximal):
+            maximal.append(candidate)
+    return [set(m) for m in maximal]
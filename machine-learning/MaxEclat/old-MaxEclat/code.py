@@ -107,26 +107,29 @@ def get_maximal_frequent_itemsets_recursive(
     return maximal_itemsets
 
 
-def max_eclat(transactions, min_support):
+def max_eclat(transactions, min_support, return_support=False):
     """
     Encontra todos os itemsets frequentes maximais usando o algoritmo Max Eclat.
 
     Args:
         transactions (list of set): Lista de transações.
         min_support (float): Suporte mínimo (proporção entre 0 e 1).
+        return_support (bool): Se True, retorna também a contagem de suporte de
+            cada itemset, tirada das TID-lists já calculadas (sem nova varredura).
 
     Returns:
         list: Lista de frozensets, onde cada frozenset é um itemset frequente maximal.
+              Com return_support=True, um dict frozenset -> contagem de suporte.
     """
     num_transactions = len(transactions)
     if num_transactions == 0:
-        return []
+        return {} if return_support else []
     min_support_count = min_support * num_transactions
 
     # 1. Encontrar itens frequentes de tamanho 1 e suas contagens
     frequent_1_itemsets_counts = get_frequent_items(transactions, min_support_count)
     if not frequent_1_itemsets_counts:
-        return []
+        return {} if return_support else []
 
     # 2. Construir TID-lists para itens frequentes de tamanho 1
     tid_lists = build_tid_lists(transactions, frequent_1_itemsets_counts)
@@ -201,6 +204,11 @@ def max_eclat(transactions, min_support):
         if is_maximal:
             maximal_frequent_itemsets.append(itemset_i)
 
+    if return_support:
+        return {
+            itemset: len(collected_frequent_itemsets[itemset])
+            for itemset in maximal_frequent_itemsets
+        }
     return maximal_frequent_itemsets
 
 
@@ -228,16 +236,12 @@ if __name__ == "__main__":
     print(f"Suporte Mínimo: {min_support_threshold * 100}%")
     print("-" * 30)
 
-    maximal_itemsets = max_eclat(transactions_data, min_support_threshold)
+    maximal_itemsets = max_eclat(transactions_data, min_support_threshold, return_support=True)
 
     print("\nItemsets Frequentes Maximais Encontrados:")
     if maximal_itemsets:
-        for idx, itemset in enumerate(maximal_itemsets):
-            # Calcula o suporte real para exibição
-            count = 0
-            for t in transactions_data:
-                if itemset.issubset(t):
-                    count +=1
+        for idx, (itemset, count) in enumerate(maximal_itemsets.items()):
+            # Contagem vinda de max_eclat(..., return_support=True), sem reescanear a base
             support_percentage = (count / len(transactions_data)) * 100
             print(f"  {idx+1}. {sorted(list(itemset))} (Suporte: {support_percentage:.2f}%, Contagem: {count})") # type: ignore
     else:
@@ -247,14 +251,10 @@ if __name__ == "__main__":
     # Exemplo 2: Suporte mais alto para menos resultados
     min_support_threshold_2 = 0.5
     print(f"\nExemplo com Suporte Mínimo: {min_support_threshold_2 * 100}%")
-    maximal_itemsets_2 = max_eclat(transactions_data, min_support_threshold_2)
+    maximal_itemsets_2 = max_eclat(transactions_data, min_support_threshold_2, return_support=True)
     print("\nItemsets Frequentes Maximais Encontrados:")
     if maximal_itemsets_2:
-        for idx, itemset in enumerate(maximal_itemsets_2):
-            count = 0
-            for t in transactions_data:
-                if itemset.issubset(t):
-                    count +=1
+        for idx, (itemset, count) in enumerate(maximal_itemsets_2.items()):
             support_percentage = (count / len(transactions_data)) * 100
             print(f"  {idx+1}. {sorted(list(itemset))} (Suporte: {support_percentage:.2f}%, Contagem: {count})") # type: ignore
     else:
@@ -275,14 +275,10 @@ if __name__ == "__main__":
         print(f"  T{i+1}: {sorted(list(t))}") # type: ignore
     print(f"Suporte Mínimo: {min_support_threshold_3 * 100}%")
     print("-" * 30)
-    maximal_itemsets_3 = max_eclat(transactions_data_2, min_support_threshold_3)
+    maximal_itemsets_3 = max_eclat(transactions_data_2, min_support_threshold_3, return_support=True)
     print("\nItemsets Frequentes Maximais Encontrados:")
     if maximal_itemsets_3:
-        for idx, itemset in enumerate(maximal_itemsets_3):
-            count = 0
-            for t in transactions_data_2:
-                if itemset.issubset(t):
-                    count +=1
+        for idx, (itemset, count) in enumerate(maximal_itemsets_3.items()):
             support_percentage = (count / len(transactions_data_2)) * 100
             print(f"  {idx+1}. {sorted(list(itemset))} (Suporte: {support_percentage:.2f}%, Contagem: {count})") # type: ignore
     else:
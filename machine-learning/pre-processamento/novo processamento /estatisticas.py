@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# Estágio de estatísticas dos gráficos do pré-processamento. Todos os
+# agregados saem de uma única passada vetorizada sobre o DataFrame:
+#   - contagens das colunas de lista ("English, Italian" conta para os dois
+#     idiomas), via explode + factorize + bincount, com o top-k por argpartition;
+#   - histograma das notas em faixas fixas e uma curva de densidade suavizada
+#     calculada sobre um histograma fino (KDE binada: custo pelo número de
+#     faixas, não de filmes).
+# O resultado é um resumo pequeno em JSON; os gráficos são desenhados a partir
+# dele, então podem ser refeitos sem recarregar nem varrer a base:
+#   python estatisticas.py resumo_graficos.json [diretorio_graficos]
+
+TOP_K = 10
+FAIXAS_HISTOGRAMA = 20
+FAIXAS_DENSIDADE = 200
+NOTA_MIN, NOTA_MAX = 0.0, 10.0
+COLUNAS_CONTADAS = ['language', 'director', 'star', 'genre']
+
+
+def explodir(serie):
+    """Uma linha por valor: listas são explodidas, strings separadas por vírgula."""
+    serie = serie.dropna()
+    if len(serie) and isinstance(serie.iloc[0], list):
+        valores = serie.explode()
+    else:
+        valores = serie.astype(str).str.split(',').explode()
+    valores = valores.dropna().astype(str).str.strip()
+    return valores[valores != '']
+
+
+def top_k_contagens(valores, k=TOP_K):
+    """Os k valores mais frequentes, com as contagens, em ordem decrescente."""
+    codigos, unicos = pd.factorize(valores, sort=False)
+    if not len(unicos):
+        return [], []
+    contagens = np.bincount(codigos, minlength=len(unicos))
+    k = min(k, len(unicos))
+    # argpartition separa os k maiores em O(n); só eles são ordenados
+    maiores = np.argpartition(-contagens, k - 1)[:k]
+    maiores = maiores[np.lexsort((maiores, -contagens[maiores]))]
+    return [str(unicos[i]) for i in maiores], contagens[maiores].tolist()
+
+
+def histograma_notas(notas, faixas=FAIXAS_HISTOGRAMA, faixas_densidade=FAIXAS_DENSIDADE):
+    notas = pd.to_numeric(notas, errors='coerce').to_numpy(dtype=float)
+    notas = notas[np.isfinite(notas)]
+    bordas = np.linspace(NOTA_MIN, NOTA_MAX, faixas + 1)
+    contagens, _ = np.histogram(notas, bins=bordas)
+    resultado = {
+        'bordas': bordas.tolist(),
+        'contagens': contagens.tolist(),
+        'n': int(len(notas)),
+        'media': float(notas.mean()) if len(notas) else None,
+        'desvio': float(notas.std()) if len(notas) else None,
+        'densidade_x': [],
+        'densidade_y': [],
+    }
+    if len(notas) < 2 or not notas.std():
+        return resultado
+
+    # KDE gaussiana binada: histograma fino convoluído com o núcleo (banda de Scott)
+    bordas_finas = np.linspace(NOTA_MIN, NOTA_MAX, faixas_densidade + 1)
+    finas, _ = np.histogram(notas, bins=bordas_finas)
+    passo = bordas_finas[1] - bordas_finas[0]
+    banda = notas.std() * len(notas) ** (-1 / 5)
+    raio = max(1, int(np.ceil(4 * banda / passo)))
+    deslocamentos = np.arange(-raio, raio + 1) * passo
+    nucleo = np.exp(-0.5 * (deslocamentos / banda) ** 2)
+    nucleo /= nucleo.sum()
+    # 'full' e o centro: com núcleo maior que o histograma, 'same' devolveria
+    # len(nucleo) amostras em vez de len(finas)
+    densidade = np.convolve(finas, nucleo, mode='full')[raio:raio + len(finas)]
+    assert len(densidade) == len(finas)
+    # Escala da densidade para a mesma unidade do histograma (filmes por faixa grossa)
+    escala = (bordas[1] - bordas[0]) / passo
+    resultado['densidade_x'] = ((bordas_finas[:-1] + bordas_finas[1:]) / 2).tolist()
+    resultado['densidade_y'] = (densidade * escala).tolist()
+    return resultado
+
+
+def calcular_estatisticas(df, k=TOP_K, colunas=COLUNAS_CONTADAS):
+    """
+    Agregados de todos os gráficos numa passada.
+
+    Returns:
+        dict: 'linhas', 'top' (coluna -> {'valores', 'contagens'}) e 'notas'
+        (histograma e densidade de `histograma_notas`).
+    """
+    resumo = {'linhas': int(len(df)), 'top': {}, 'notas': None}
+    for coluna in colunas:
+        if coluna in df.columns:
+            valores, contagens = top_k_contagens(explodir(df[coluna]), k)
+            resumo['top'][coluna] = {'valores': valores, 'contagens': contagens}
+    if 'rating_imdb' in df.columns:
+        resumo['notas'] = histograma_notas(df['rating_imdb'])
+    return resumo
+
+
+def salvar_resumo(resumo, caminho):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=1)
+
+
+def carregar_resumo(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _grafico_top(top, titulo, rotulo_x, paleta, caminho):
+    plt.figure(figsize=(12, 6))
+    sns.barplot(x=top['valores'], y=top['contagens'], hue=top['valores'], palette=paleta, legend=False)
+    plt.title(titulo)
+    plt.ylabel('Quantidade de Filmes')
+    plt.xlabel(rotulo_x)
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def renderizar_graficos(resumo, output_dir_graficos):
+    """Desenha os gráficos a partir do resumo, sem acesso à base."""
+    os.makedirs(output_dir_graficos, exist_ok=True)
+
+    notas = resumo.get('notas')
+    if notas and notas['n']:
+        bordas = np.asarray(notas['bordas'])
+        plt.figure(figsize=(8, 5))
+        plt.bar(bordas[:-1], notas['contagens'], width=np.diff(bordas), align='edge',
+                color='salmon', edgecolor='white', alpha=0.8)
+        if notas['densidade_x']:
+            plt.plot(notas['densidade_x'], notas['densidade_y'], color='salmon')
+        plt.title('Distribuição das notas IMDb')
+        plt.xlabel('Nota IMDb')
+        plt.ylabel('Frequência')
+        plt.grid(True)
+        plt.tight_layout()
+        caminho_grafico1 = os.path.join(output_dir_graficos, "grafico_distribuicao_notas.png")
+        plt.savefig(caminho_grafico1, dpi=300, bbox_inches='tight')
+        plt.close()
+        print(f"\nGráfico 'Distribuição das notas IMDb' salvo como '{caminho_grafico1}'")
+    else:
+        print("\nAviso: Não foi possível gerar o gráfico de distribuição de notas.")
+
+    top = resumo['top']
+    if top.get('language', {}).get('valores'):
+        caminho_grafico2 = os.path.join(output_dir_graficos, "grafico_idiomas_frequentes.png")
+        _grafico_top(top['language'], f"Top {len(top['language']['valores'])} Idiomas Mais Frequentes nos Filmes",
+                     'Idioma', 'pastel', caminho_grafico2)
+        print(f"Gráfico 'Idiomas mais frequentes nos filmes' salvo como '{caminho_grafico2}'")
+    else:
+        print("\nAviso: Não foi possível gerar o gráfico de idiomas mais comuns.")
+
+    if top.get('director', {}).get('valores'):
+        caminho_grafico3 = os.path.join(output_dir_graficos, "grafico_diretores_frequentes.png")
+        _grafico_top(top['director'], f"Top {len(top['director']['valores'])} Diretores Mais Frequentes",
+                     'Diretor', 'muted', caminho_grafico3)
+        print(f"Gráfico 'Diretores mais frequentes' salvo como '{caminho_grafico3}'")
+    else:
+        print("\nAviso: Não foi possível gerar o gráfico de diretores mais frequentes.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python estatisticas.py resumo_graficos.json [diretorio_graficos]")
+        sys.exit(1)
+    renderizar_graficos(carregar_resumo(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else "graficos_imdb")
@@ -0,0 +1,134 @@
+import ast
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+# Estágio de validação dos dados (remoção de "dados incoerentes"). Todas as
+# verificações são máscaras booleanas vetorizadas sobre as colunas inteiras;
+# só os literais de lista que passam no pré-filtro por regex são conferidos um
+# a um, com o mesmo parser do passo de gêneros. Cada linha rejeitada vai para
+# um arquivo de rejeitos com os motivos, e as contagens por motivo são
+# impressas e salvas. Depois deste estágio, as colunas de lista têm sintaxe
+# válida e ano/nota são numéricos, então quem carrega a base não precisa de
+# parsing defensivo linha a linha.
+
+COLUNAS_OBRIGATORIAS = ['title', 'year', 'rating_imdb', 'genre', 'language', 'star', 'director']
+COLUNAS_LISTA = ['genre', 'language', 'star', 'director']
+ANO_MIN, ANO_MAX = 1874, 2100
+NOTA_MIN, NOTA_MAX = 0.0, 10.0
+
+# Lista válida: literal Python de strings ("['A', 'B']", "[]") ou valores
+# separados por vírgula sem colchetes soltos ("A, B"). A regex do literal é só
+# um pré-filtro: escapes como "['Dra\xma']" passam nela e quebram o literal_eval
+_ITEM_LITERAL = r"""\s*(?:'[^']*'|"[^"]*")\s*"""
+LISTA_LITERAL = re.compile(rf"^\[(?:{_ITEM_LITERAL}(?:,{_ITEM_LITERAL})*)?\]$")
+LISTA_SIMPLES = re.compile(r"^[^\[\]]*[^\s\[\],][^\[\]]*$")
+
+
+def literal_valido(texto):
+    """O literal é uma lista de strings para ast.literal_eval (o parser de new-pre-processing.py)?"""
+    try:
+        valor = ast.literal_eval(texto)
+    except (ValueError, SyntaxError):
+        return False
+    return isinstance(valor, list) and all(isinstance(item, str) for item in valor)
+
+
+def validar_esquema(df, colunas=COLUNAS_OBRIGATORIAS):
+    """Colunas esperadas que não existem na base."""
+    return [coluna for coluna in colunas if coluna not in df.columns]
+
+
+def chave_filme(df):
+    """Hash de 64 bits do título normalizado + ano inteiro (mesma normalização de movie_ids)."""
+    titulos = df['title'].astype(str).str.strip().str.lower()
+    anos = pd.to_numeric(df['year'], errors='coerce').astype('Int64').astype(str)
+    return pd.util.hash_pandas_object(titulos + '\x1f' + anos, index=False).to_numpy()
+
+
+def verificar(df):
+    """
+    Máscaras de rejeição por motivo.
+
+    Returns:
+        dict: motivo -> Series booleana (True = linha rejeitada por esse motivo).
+    """
+    # Cada verificação só roda se a coluna existir (o script pode ter descartado colunas ausentes)
+    presentes = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna in df.columns]
+    verificacoes = {'valor_ausente': df[presentes].isna().any(axis=1)}
+
+    if 'year' in df.columns:
+        anos = pd.to_numeric(df['year'], errors='coerce')
+        verificacoes['ano_invalido'] = (
+            df['year'].notna() & (anos.isna() | (anos != anos.round()) | (anos < ANO_MIN) | (anos > ANO_MAX))
+        )
+
+    if 'rating_imdb' in df.columns:
+        notas = pd.to_numeric(df['rating_imdb'], errors='coerce')
+        verificacoes['nota_fora_do_intervalo'] = (
+            df['rating_imdb'].notna() & (notas.isna() | (notas < NOTA_MIN) | (notas > NOTA_MAX))
+        )
+
+    for coluna in COLUNAS_LISTA:
+        if coluna in df.columns:
+            texto = df[coluna].astype(str).str.strip()
+            literal = texto.str.match(LISTA_LITERAL)
+            literal[literal] = texto[literal].map(literal_valido)
+            valida = literal | texto.str.match(LISTA_SIMPLES)
+            verificacoes[f'{coluna}_lista_malformada'] = df[coluna].notna() & ~valida
+
+    # Duplicatas: só entre as linhas que passaram nas outras verificações, mantendo a primeira
+    if 'title' in df.columns and 'year' in df.columns:
+        ok = ~np.logical_or.reduce([mascara.to_numpy() for mascara in verificacoes.values()])
+        chaves = pd.Series(chave_filme(df[ok]), index=df.index[ok])
+        duplicada = pd.Series(False, index=df.index)
+        duplicada[ok] = chaves.duplicated(keep='first')
+        verificacoes['duplicada'] = duplicada
+    return verificacoes
+
+
+def validar(df, caminho_rejeitos=None, caminho_contagens=None):
+    """
+    Separa as linhas válidas das rejeitadas.
+
+    Args:
+        df (DataFrame): base com (algumas das) COLUNAS_OBRIGATORIAS.
+        caminho_rejeitos (str): CSV das linhas rejeitadas, com a coluna 'motivo'.
+        caminho_contagens (str): JSON com as contagens por motivo.
+
+    Returns:
+        tuple: (DataFrame válido com ano int, nota float e listas sem espaços nas
+        pontas, dict de contagens).
+    """
+    verificacoes = verificar(df)
+    motivos = pd.Series('', index=df.index)
+    for motivo, mascara in verificacoes.items():
+        motivos = motivos.mask(mascara, motivos + motivo + ';')
+    rejeitada = motivos != ''
+
+    contagens = {motivo: int(mascara.sum()) for motivo, mascara in verificacoes.items()}
+    contagens['linhas'] = int(len(df))
+    contagens['rejeitadas'] = int(rejeitada.sum())
+    contagens['validas'] = int((~rejeitada).sum())
+
+    if caminho_rejeitos is not None:
+        rejeitos = df[rejeitada].copy()
+        rejeitos['motivo'] = motivos[rejeitada].str.rstrip(';')
+        rejeitos.to_csv(caminho_rejeitos, index=False, encoding='utf-8')
+    if caminho_contagens is not None:
+        with open(caminho_contagens, 'w', encoding='utf-8') as f:
+            json.dump(contagens, f, ensure_ascii=False, indent=1)
+
+    validas = df[~rejeitada].copy()
+    # As listas foram validadas sem os espaços das pontas; o texto gravado é o validado
+    for coluna in COLUNAS_LISTA:
+        if coluna in validas.columns:
+            validas[coluna] = validas[coluna].astype(str).str.strip()
+    if 'year' in validas.columns:
+        validas['year'] = pd.to_numeric(validas['year']).astype(int)
+    if 'rating_imdb' in validas.columns:
+        validas['rating_imdb'] = pd.to_numeric(validas['rating_imdb']).astype(float)
+    validas.reset_index(drop=True, inplace=True)
+    return validas, contagens